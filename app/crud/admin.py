@@ -1,3 +1,4 @@
+from sqlalchemy.orm import defer
 from sqlmodel import Session, select
 
 from app.models.admin import Admin
@@ -57,9 +58,13 @@ def get_admin_by_username(db: Session, username: str) -> Admin | None:
     Mengambil admin berdasarkan username.
 
     Mencari admin dengan username yang spesifik, berguna untuk proses autentikasi
-    dan validasi keunikan username.
+    dan validasi keunikan username. Hash password baru dimuat jika diakses.
     """
-    return db.exec(select(Admin).where(Admin.username == username)).first()
+    return db.exec(
+        select(Admin)
+        .where(Admin.username == username)
+        .options(defer(Admin.password))
+    ).first()
 
 
 def update_admin(db: Session, admin_id: int, admin: AdminUpdate) -> Admin | None:
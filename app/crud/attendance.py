@@ -1,18 +1,32 @@
-from datetime import datetime, time
+from datetime import date, datetime
 import json
 
 from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, selectinload
 
+from app.crud.attendance_summary import attendance_key, record_attendance_change
+from app.crud.sync import filter_updated_since, record_deletion
 from app.models.attendance import Attendance
+from app.models.attendance_image_hash import AttendanceImageHash
+from app.models.course import Course
+from app.models.instructor import Instructor
+from app.models.room import Room
 from app.models.schedule import Schedule
+from app.models.student import Student
 from app.schemas.attendance import (
     AttendanceCreate,
     AttendanceUpdate,
     AttendanceCheckIn,
     MultipleAttendanceCreate,
 )
-from app.utils.time_utils import get_indonesia_date, get_indonesia_time
+from app.services.image_hash_index import image_hash_index
+from app.services.live_feed import live_feed
+from app.services.timeline_service import today_timeline
+from app.utils.time_utils import (
+    get_indonesia_date,
+    get_indonesia_time,
+    parse_schedule_time,
+)
 
 
 def create_attendance(db: Session, attendance: AttendanceCreate) -> Attendance:
@@ -37,8 +51,10 @@ def create_attendance(db: Session, attendance: AttendanceCreate) -> Attendance:
         now=get_indonesia_time(),
     )
     db.add(db_attendance)
+    record_attendance_change(db, None, attendance_key(db_attendance))
     db.commit()
     db.refresh(db_attendance)
+    today_timeline.invalidate()
     return db_attendance
 
 
@@ -68,6 +84,7 @@ def create_multiple_attendances(
             now=get_indonesia_time(),
         )
         db.add(db_attendance)
+        record_attendance_change(db, None, attendance_key(db_attendance))
         created_attendances.append(db_attendance)
 
     db.commit()
@@ -75,6 +92,7 @@ def create_multiple_attendances(
     for attendance in created_attendances:
         db.refresh(attendance)
 
+    today_timeline.invalidate()
     return created_attendances
 
 
@@ -83,16 +101,21 @@ def student_check_in(
     attendance_id: int,
     check_in_data: AttendanceCheckIn,
     image_captured_url: str = None,
+    image_hash: str = None,
 ) -> Attendance | None:
     """
     Memproses check-in siswa pada record kehadiran yang sudah ada.
 
     Mengupdate attendance record dengan waktu check-in, data lokasi, verifikasi wajah,
     deteksi senyum, dan gambar. Menentukan status PRESENT atau LATE berdasarkan jadwal.
+    Hash perseptual gambar (jika ada) disimpan untuk deteksi foto yang dipakai ulang.
+    Ringkasan kehadiran per course diperbarui dalam transaksi yang sama, dan
+    perubahan status dikirim ke live feed jadwal tersebut.
     """
     attendance = db.get(Attendance, attendance_id)
     if attendance is None:
         return None
+    before = attendance_key(attendance)
 
     now = get_indonesia_time()
     attendance.check_in_time = check_in_data.check_in_time or now
@@ -100,13 +123,7 @@ def student_check_in(
     schedule = db.get(Schedule, attendance.schedule_id)
     if schedule:
         today = get_indonesia_date()
-        start_time_parts = schedule.start_time.split(":")
-        schedule_start = time(
-            hour=int(start_time_parts[0]),
-            minute=int(start_time_parts[1]),
-            second=int(start_time_parts[2]) if len(start_time_parts) > 2 else 0,
-        )
-        start_time = datetime.combine(today, schedule_start)
+        start_time = datetime.combine(today, parse_schedule_time(schedule.start_time))
 
         check_in_time = attendance.check_in_time
         if check_in_time.tzinfo is not None:
@@ -133,50 +150,34 @@ def student_check_in(
     if image_captured_url is not None:
         attendance.image_captured_url = image_captured_url
 
+    if image_hash is not None:
+        db_hash = db.get(AttendanceImageHash, attendance_id) or AttendanceImageHash(
+            attendance_id=attendance_id, student_id=attendance.student_id
+        )
+        db_hash.image_hash = image_hash
+        db.add(db_hash)
+        image_hash_index.record(
+            db, attendance_id, attendance.student_id, int(image_hash, 16)
+        )
+
     db.add(attendance)
+    record_attendance_change(db, before, attendance_key(attendance))
+    today_timeline.record_attendance(db, attendance)
     db.commit()
     db.refresh(attendance)
+    live_feed.publish_attendance(attendance)
     return attendance
 
 
-def get_active_student_schedule(db: Session, student_id: int) -> list[Schedule]:
+def get_active_student_schedule(db: Session, student_id: int) -> list[dict]:
     """
-    Mendapatkan jadwal aktif siswa berdasarkan hari dan waktu saat ini.
+    Mendapatkan jadwal aktif siswa berdasarkan tanggal dan waktu saat ini.
 
-    Mencari jadwal yang sedang berlangsung untuk siswa tertentu,
-    memeriksa apakah siswa sudah memiliki record kehadiran untuk jadwal tersebut.
+    Membaca timeline harian yang sudah dihitung sebelumnya dan mengembalikan
+    sesi milik siswa yang sedang berlangsung beserta status kehadirannya.
     """
-    current_day = datetime.today().weekday() + 1
-    current_time = datetime.now().strftime("%H:%M:%S")
-
-    active_schedules = (
-        db.query(Schedule)
-        .filter(
-            Schedule.day_of_week == current_day,
-            Schedule.start_time <= current_time,
-            Schedule.end_time >= current_time,
-        )
-        .all()
-    )
-
-    schedule_ids = [schedule.schedule_id for schedule in active_schedules]
-
-    if schedule_ids:
-        today = datetime.today().date()
-        existing_attendances = (
-            db.query(Attendance)
-            .filter(
-                Attendance.student_id == student_id,
-                Attendance.schedule_id.in_(schedule_ids),
-                Attendance.date == today,
-            )
-            .all()
-        )
-
-        if existing_attendances:
-            return active_schedules
-
-    return active_schedules
+    day = today_timeline.get_student_day(db, student_id)
+    return [session for session in day["sessions"] if session["is_active"]]
 
 
 def process_json_field(data) -> dict | None:
@@ -203,6 +204,157 @@ def process_json_field(data) -> dict | None:
     return {"data": str(data)}
 
 
+# Kolom nested objects, sama persis dengan field StudentBase dan ScheduleRead
+# (beserta CourseResponse, RoomResponse dan InstructorResponse). Password dan
+# face_data tidak pernah dibutuhkan oleh response kehadiran sehingga tidak dibaca.
+NESTED_STUDENT_COLUMNS = (
+    Student.nim,
+    Student.username,
+    Student.full_name,
+    Student.major_name,
+    Student.profile_picture_url,
+    Student.year,
+    Student.is_approved,
+)
+NESTED_SCHEDULE_COLUMNS = (
+    Schedule.schedule_id,
+    Schedule.chapter,
+    Schedule.schedule_date,
+    Schedule.start_time,
+    Schedule.end_time,
+    Schedule.created_at,
+)
+# Foreign key yang dibutuhkan untuk memuat relasi schedule
+SCHEDULE_RELATION_KEYS = (Schedule.course_id, Schedule.instructor_id, Schedule.room_id)
+NESTED_COURSE_COLUMNS = (Course.course_id, Course.course_name)
+NESTED_ROOM_COLUMNS = (
+    Room.room_id,
+    Room.name,
+    Room.latitude,
+    Room.longitude,
+    Room.radius,
+)
+NESTED_INSTRUCTOR_COLUMNS = (Instructor.instructor_id, Instructor.full_name)
+
+
+# Field response kehadiran yang langsung berasal dari kolom attendance
+ATTENDANCE_FIELD_COLUMNS = {
+    "attendance_id": Attendance.attendance_id,
+    "date": Attendance.date,
+    "check_in_time": Attendance.check_in_time,
+    "status": Attendance.status,
+    "location_data": Attendance.location_data,
+    "face_verification_data": Attendance.face_verification_data,
+    "smile_detected": Attendance.smile_detected,
+    "image_captured_url": Attendance.image_captured_url,
+    "created_at": Attendance.created_at,
+    "updated_at": Attendance.updated_at,
+}
+ATTENDANCE_JSON_FIELDS = ("location_data", "face_verification_data")
+
+
+def _wants(fields: frozenset | None, name: str) -> bool:
+    return fields is None or name in fields
+
+
+def _nested_relation_options(fields: frozenset | None = None) -> list:
+    """
+    Opsi loading untuk daftar kehadiran dengan nested objects.
+
+    Setiap relasi hanya memuat kolom yang ditampilkan di response. Jika fields
+    diberikan, hanya kolom attendance dan relasi yang diminta yang dimuat.
+    """
+    options = []
+    if fields is not None:
+        columns = [
+            column
+            for name, column in ATTENDANCE_FIELD_COLUMNS.items()
+            if name in fields
+        ]
+        options.append(
+            load_only(
+                Attendance.attendance_id,
+                Attendance.student_id,
+                Attendance.schedule_id,
+                *columns,
+            )
+        )
+
+    if _wants(fields, "student"):
+        options.append(
+            selectinload(Attendance.student).load_only(*NESTED_STUDENT_COLUMNS)
+        )
+
+    if _wants(fields, "schedule"):
+        schedule = selectinload(Attendance.schedule)
+        options += [
+            schedule.load_only(*NESTED_SCHEDULE_COLUMNS, *SCHEDULE_RELATION_KEYS),
+            schedule.selectinload(Schedule.course).load_only(*NESTED_COURSE_COLUMNS),
+            schedule.selectinload(Schedule.room).load_only(*NESTED_ROOM_COLUMNS),
+            schedule.selectinload(Schedule.instructor).load_only(
+                *NESTED_INSTRUCTOR_COLUMNS
+            ),
+        ]
+    return options
+
+
+def _project(obj, columns) -> dict:
+    """Menyalin kolom yang sudah dimuat dari sebuah object menjadi dict."""
+    return {column.key: getattr(obj, column.key) for column in columns}
+
+
+def _project_optional(obj, columns) -> dict | None:
+    return _project(obj, columns) if obj is not None else None
+
+
+def _attendance_to_nested_dict(
+    attendance: Attendance, fields: frozenset | None = None
+) -> dict:
+    """
+    Menyusun data kehadiran beserta nested objects student dan schedule
+    (dengan course, room dan instructor) dari relasi yang sudah dimuat.
+
+    Hasilnya sudah berbentuk persis AttendanceWithNestedData sehingga bisa
+    langsung diserialisasi tanpa validasi ulang. Jika fields diberikan, hanya
+    field tersebut yang disertakan.
+    """
+    attendance_data = {}
+    for name in ATTENDANCE_FIELD_COLUMNS:
+        if _wants(fields, name):
+            value = getattr(attendance, name)
+            if name in ATTENDANCE_JSON_FIELDS:
+                value = process_json_field(value)
+            elif name == "date" and isinstance(value, datetime):
+                # Kolom date disimpan sebagai datetime, response-nya berupa tanggal
+                value = value.date()
+            attendance_data[name] = value
+
+    if _wants(fields, "student"):
+        student = attendance.student
+        attendance_data["student"] = (
+            {**_project(student, NESTED_STUDENT_COLUMNS), "face_data": None}
+            if student
+            else None
+        )
+
+    if _wants(fields, "schedule"):
+        schedule = attendance.schedule
+        attendance_data["schedule"] = (
+            {
+                **_project(schedule, NESTED_SCHEDULE_COLUMNS),
+                "course": _project_optional(schedule.course, NESTED_COURSE_COLUMNS),
+                "room": _project_optional(schedule.room, NESTED_ROOM_COLUMNS),
+                "instructor": _project_optional(
+                    schedule.instructor, NESTED_INSTRUCTOR_COLUMNS
+                ),
+            }
+            if schedule
+            else None
+        )
+
+    return attendance_data
+
+
 def get_attendances(
     db: Session,
     skip: int = 0,
@@ -210,141 +362,30 @@ def get_attendances(
     student_id: int = None,
     schedule_id: int = None,
     course_id: int = None,
+    fields: frozenset | None = None,
 ) -> list[dict]:
     """
     Mengambil daftar kehadiran dengan relasi lengkap dalam format nested objects.
 
-    Melakukan eager loading untuk semua relasi (student, schedule, course, room, instructor),
-    menerapkan filter berdasarkan parameter, dan mengembalikan data terstruktur dengan pagination.
+    Melakukan eager loading untuk semua relasi (student, schedule, course, room,
+    instructor) dengan hanya kolom yang ditampilkan, menerapkan filter berdasarkan
+    parameter, dan mengembalikan data terstruktur dengan pagination. Jika fields
+    diberikan, kolom dan relasi yang tidak diminta tidak dimuat sama sekali.
     """
-    query = db.query(Attendance).options(
-        selectinload(Attendance.student),
-        selectinload(Attendance.schedule),
-        selectinload(Attendance.schedule).selectinload(Schedule.course),
-        selectinload(Attendance.schedule).selectinload(Schedule.room),
-        selectinload(Attendance.schedule).selectinload(Schedule.instructor),
-    )
+    query = db.query(Attendance).options(*_nested_relation_options(fields))
 
     if student_id:
         query = query.filter(Attendance.student_id == student_id)
     if schedule_id:
         query = query.filter(Attendance.schedule_id == schedule_id)
     if course_id:
-        query = query.filter(Schedule.course_id == course_id)
+        query = query.join(Schedule).filter(Schedule.course_id == course_id)
 
     attendances = query.offset(skip).limit(limit).all()
 
-    result = []
-    for attendance in attendances:
-        attendance_data = {
-            "attendance_id": attendance.attendance_id,
-            "date": attendance.date,
-            "check_in_time": attendance.check_in_time,
-            "status": attendance.status,
-            "location_data": process_json_field(attendance.location_data),
-            "face_verification_data": process_json_field(
-                attendance.face_verification_data
-            ),
-            "smile_detected": attendance.smile_detected,
-            "image_captured_url": attendance.image_captured_url,
-            "created_at": attendance.created_at,
-            "updated_at": attendance.updated_at,
-            "student": {"id": attendance.student_id},
-            "schedule": {"id": attendance.schedule_id},
-        }
-
-        if attendance.student:
-            student_obj = attendance_data["student"]
-            for attr_name in dir(attendance.student):
-                if not attr_name.startswith("_") and attr_name not in [
-                    "metadata",
-                    "registry",
-                    "attendances",
-                ]:
-                    try:
-                        value = getattr(attendance.student, attr_name)
-                        if callable(value):
-                            continue
-                        student_obj[attr_name] = value
-                    except:  # noqa: E722
-                        pass
-
-        if attendance.schedule:
-            schedule_obj = attendance_data["schedule"]
-            for attr_name in dir(attendance.schedule):
-                if not attr_name.startswith("_") and attr_name not in [
-                    "metadata",
-                    "registry",
-                    "course",
-                    "room",
-                    "instructor",
-                    "attendances",
-                ]:
-                    try:
-                        value = getattr(attendance.schedule, attr_name)
-                        if callable(value):
-                            continue
-                        schedule_obj[attr_name] = value
-                    except:  # noqa: E722
-                        pass
-
-            if hasattr(attendance.schedule, "course") and attendance.schedule.course:
-                course_obj = {}
-                for attr_name in dir(attendance.schedule.course):
-                    if not attr_name.startswith("_") and attr_name not in [
-                        "metadata",
-                        "registry",
-                        "schedules",
-                    ]:
-                        try:
-                            value = getattr(attendance.schedule.course, attr_name)
-                            if callable(value):
-                                continue
-                            course_obj[attr_name] = value
-                        except:  # noqa: E722
-                            pass
-                schedule_obj["course"] = course_obj
-
-            if attendance.schedule.room:
-                room_obj = {}
-                for attr_name in dir(attendance.schedule.room):
-                    if not attr_name.startswith("_") and attr_name not in [
-                        "metadata",
-                        "registry",
-                        "schedules",
-                    ]:
-                        try:
-                            value = getattr(attendance.schedule.room, attr_name)
-                            if callable(value):
-                                continue
-                            room_obj[attr_name] = value
-                        except:  # noqa: E722
-                            pass
-                schedule_obj["room"] = room_obj
-
-            if (
-                hasattr(attendance.schedule, "instructor")
-                and attendance.schedule.instructor
-            ):
-                instructor_obj = {}
-                for attr_name in dir(attendance.schedule.instructor):
-                    if not attr_name.startswith("_") and attr_name not in [
-                        "metadata",
-                        "registry",
-                        "schedules",
-                    ]:
-                        try:
-                            value = getattr(attendance.schedule.instructor, attr_name)
-                            if callable(value):
-                                continue
-                            instructor_obj[attr_name] = value
-                        except:  # noqa: E722
-                            pass
-                schedule_obj["instructor"] = instructor_obj
-
-        result.append(attendance_data)
-
-    return result
+    return [
+        _attendance_to_nested_dict(attendance, fields) for attendance in attendances
+    ]
 
 
 def get_day_name(day_number: int) -> str:
@@ -397,141 +438,86 @@ def get_student_attendances(
     schedule_id: int = None,
     skip: int = 0,
     limit: int = 100,
+    fields: frozenset | None = None,
+    updated_since: datetime | None = None,
 ) -> list[dict]:
     """
     Mengambil semua record kehadiran untuk siswa tertentu dengan nested objects.
 
     Melakukan query dengan eager loading untuk semua relasi, menerapkan filter schedule
     jika diperlukan, dan mengembalikan data terstruktur dengan pagination.
+    Dengan updated_since hanya record yang berubah sejak waktu tersebut yang diambil.
     """
     query = (
         db.query(Attendance)
-        .options(
-            selectinload(Attendance.student),
-            selectinload(Attendance.schedule),
-            selectinload(Attendance.schedule).selectinload(Schedule.course),
-            selectinload(Attendance.schedule).selectinload(Schedule.room),
-            selectinload(Attendance.schedule).selectinload(Schedule.instructor),
-        )
+        .options(*_nested_relation_options(fields))
         .filter(Attendance.student_id == student_id)
     )
 
     if schedule_id:
         query = query.filter(Attendance.schedule_id == schedule_id)
+    query = filter_updated_since(query, Attendance, updated_since)
 
     attendances = query.offset(skip).limit(limit).all()
 
-    result = []
-    for attendance in attendances:
-        attendance_data = {
-            "attendance_id": attendance.attendance_id,
-            "date": attendance.date,
-            "check_in_time": attendance.check_in_time,
-            "status": attendance.status,
-            "location_data": process_json_field(attendance.location_data),
-            "face_verification_data": process_json_field(
-                attendance.face_verification_data
-            ),
-            "smile_detected": attendance.smile_detected,
-            "image_captured_url": attendance.image_captured_url,
-            "created_at": attendance.created_at,
-            "updated_at": attendance.updated_at,
-            "student": {"id": attendance.student_id},
-            "schedule": {"id": attendance.schedule_id},
-        }
-
-        if attendance.student:
-            student_obj = attendance_data["student"]
-            for attr_name in dir(attendance.student):
-                if not attr_name.startswith("_") and attr_name not in [
-                    "metadata",
-                    "registry",
-                    "attendances",
-                ]:
-                    try:
-                        value = getattr(attendance.student, attr_name)
-                        if callable(value):
-                            continue
-                        student_obj[attr_name] = value
-                    except:  # noqa: E722
-                        pass
-
-        if attendance.schedule:
-            schedule_obj = attendance_data["schedule"]
-            for attr_name in dir(attendance.schedule):
-                if not attr_name.startswith("_") and attr_name not in [
-                    "metadata",
-                    "registry",
-                    "course",
-                    "room",
-                    "instructor",
-                    "attendances",
-                ]:
-                    try:
-                        value = getattr(attendance.schedule, attr_name)
-                        if callable(value):
-                            continue
-                        schedule_obj[attr_name] = value
-                    except:  # noqa: E722
-                        pass
-
-            if hasattr(attendance.schedule, "course") and attendance.schedule.course:
-                course_obj = {}
-                for attr_name in dir(attendance.schedule.course):
-                    if not attr_name.startswith("_") and attr_name not in [
-                        "metadata",
-                        "registry",
-                        "schedules",
-                    ]:
-                        try:
-                            value = getattr(attendance.schedule.course, attr_name)
-                            if callable(value):
-                                continue
-                            course_obj[attr_name] = value
-                        except:  # noqa: E722
-                            pass
-                schedule_obj["course"] = course_obj
-
-            if attendance.schedule.room:
-                room_obj = {}
-                for attr_name in dir(attendance.schedule.room):
-                    if not attr_name.startswith("_") and attr_name not in [
-                        "metadata",
-                        "registry",
-                        "schedules",
-                    ]:
-                        try:
-                            value = getattr(attendance.schedule.room, attr_name)
-                            if callable(value):
-                                continue
-                            room_obj[attr_name] = value
-                        except:  # noqa: E722
-                            pass
-                schedule_obj["room"] = room_obj
-
-            if (
-                hasattr(attendance.schedule, "instructor")
-                and attendance.schedule.instructor
-            ):
-                instructor_obj = {}
-                for attr_name in dir(attendance.schedule.instructor):
-                    if not attr_name.startswith("_") and attr_name not in [
-                        "metadata",
-                        "registry",
-                        "schedules",
-                    ]:
-                        try:
-                            value = getattr(attendance.schedule.instructor, attr_name)
-                            if callable(value):
-                                continue
-                            instructor_obj[attr_name] = value
-                        except:  # noqa: E722
-                            pass
-                schedule_obj["instructor"] = instructor_obj
-
-        result.append(attendance_data)
-
-    return result
+    return [
+        _attendance_to_nested_dict(attendance, fields) for attendance in attendances
+    ]
+
+
+def get_attendance_export_query(
+    course_id: int = None,
+    schedule_id: int = None,
+    student_id: int = None,
+    date_from: date = None,
+    date_to: date = None,
+    course_ids=None,
+):
+    """
+    Menyusun query flat untuk export kehadiran.
+
+    Setiap baris berisi kolom kehadiran beserta NIM, nama siswa, jadwal dan
+    course hasil join, tanpa kolom JSON, sehingga bisa di-stream per batch
+    tanpa membangun nested objects. Rentang tanggal memfilter schedule_date,
+    misalnya untuk export satu semester. Jika course_ids diberikan (course
+    yang diajar instructor), hanya kehadiran course tersebut yang diexport.
+    """
+    query = (
+        select(
+            Attendance.attendance_id,
+            Attendance.date,
+            Attendance.status,
+            Attendance.check_in_time,
+            Attendance.smile_detected,
+            Attendance.student_id,
+            Student.nim,
+            Student.full_name.label("student_name"),
+            Attendance.schedule_id,
+            Schedule.schedule_date,
+            Schedule.start_time,
+            Schedule.end_time,
+            Schedule.course_id,
+            Course.course_name,
+        )
+        .join(Student, Attendance.student_id == Student.student_id)
+        .join(Schedule, Attendance.schedule_id == Schedule.schedule_id)
+        .join(Course, Schedule.course_id == Course.course_id, isouter=True)
+    )
+
+    if course_id:
+        query = query.where(Schedule.course_id == course_id)
+    if schedule_id:
+        query = query.where(Attendance.schedule_id == schedule_id)
+    if student_id:
+        query = query.where(Attendance.student_id == student_id)
+    if date_from:
+        query = query.where(Schedule.schedule_date >= date_from)
+    if date_to:
+        query = query.where(Schedule.schedule_date <= date_to)
+    if course_ids is not None:
+        query = query.where(Schedule.course_id.in_(list(course_ids)))
+
+    return query.order_by(Attendance.attendance_id)
 
 
 def get_course_attendances(
@@ -580,19 +566,25 @@ def update_attendance(
     Memperbarui record kehadiran yang sudah ada.
 
     Mengambil attendance berdasarkan ID, memperbarui field yang diberikan,
-    memproses JSON fields, dan menyimpan perubahan ke database.
+    memproses JSON fields, dan menyimpan perubahan ke database bersama
+    ringkasan kehadiran dalam transaksi yang sama. Perubahan dikirim ke live
+    feed jadwal tersebut.
     """
     db_attendance = db.get(Attendance, attendance_id)
     if db_attendance is None:
         return None
+    before = attendance_key(db_attendance)
 
     attendance_data = attendance.dict(exclude_unset=True)
     for key, value in attendance_data.items():
         setattr(db_attendance, key, value)
 
     db.add(db_attendance)
+    record_attendance_change(db, before, attendance_key(db_attendance))
+    today_timeline.record_attendance(db, db_attendance)
     db.commit()
     db.refresh(db_attendance)
+    live_feed.publish_attendance(db_attendance)
 
     db_attendance.location_data = process_json_field(db_attendance.location_data)
     db_attendance.face_verification_data = process_json_field(
@@ -613,8 +605,12 @@ def delete_attendance(db: Session, attendance_id: int) -> bool:
     if attendance is None:
         return False
 
+    record_attendance_change(db, attendance_key(attendance), None)
+    record_deletion(db, "attendance", attendance_id)
     db.delete(attendance)
     db.commit()
+    today_timeline.invalidate()
+    image_hash_index.invalidate()
     return True
 
 
@@ -629,10 +625,14 @@ def delete_multiple_attendances(db: Session, attendance_ids: list[int]) -> int:
     for attendance_id in attendance_ids:
         attendance = db.get(Attendance, attendance_id)
         if attendance:
+            record_attendance_change(db, attendance_key(attendance), None)
+            record_deletion(db, "attendance", attendance_id)
             db.delete(attendance)
             deleted_count += 1
 
     db.commit()
+    today_timeline.invalidate()
+    image_hash_index.invalidate()
     return deleted_count
 
 
@@ -670,6 +670,7 @@ def student_direct_check_in(
 
     Mengecek existing attendance record, jika ada maka update, jika tidak ada maka create.
     Menentukan status PRESENT atau LATE berdasarkan waktu jadwal, memproses semua data check-in.
+    Hasil check-in dikirim ke live feed jadwal tersebut.
     """
     today = datetime.today().date()
     existing_attendance = find_student_attendance(db, student_id, schedule_id)
@@ -683,19 +684,14 @@ def student_direct_check_in(
 
     now = datetime.now()
 
-    start_time_parts = schedule.start_time.split(":")
-    schedule_start = time(
-        hour=int(start_time_parts[0]),
-        minute=int(start_time_parts[1]),
-        second=int(start_time_parts[2]) if len(start_time_parts) > 2 else 0,
-    )
-    start_time = datetime.combine(today, schedule_start)
+    start_time = datetime.combine(today, parse_schedule_time(schedule.start_time))
 
     status = "PRESENT"
     if now > start_time:
         status = "LATE"
 
     if existing_attendance:
+        before = attendance_key(existing_attendance)
         existing_attendance.check_in_time = now
         existing_attendance.status = status
         existing_attendance.location_data = location_data
@@ -703,8 +699,11 @@ def student_direct_check_in(
         existing_attendance.smile_detected = smile_detected
         existing_attendance.image_captured_url = image_captured_url
         db.add(existing_attendance)
+        record_attendance_change(db, before, attendance_key(existing_attendance))
+        today_timeline.record_attendance(db, existing_attendance)
         db.commit()
         db.refresh(existing_attendance)
+        live_feed.publish_attendance(existing_attendance)
         return existing_attendance
     else:
         new_attendance = Attendance(
@@ -720,6 +719,9 @@ def student_direct_check_in(
             created_at=now,
         )
         db.add(new_attendance)
+        record_attendance_change(db, None, attendance_key(new_attendance))
         db.commit()
         db.refresh(new_attendance)
+        today_timeline.invalidate()
+        live_feed.publish_attendance(new_attendance)
         return new_attendance
@@ -0,0 +1,218 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, update
+from sqlmodel import Session, select
+
+from app.models.attendance import Attendance
+from app.models.attendance_summary import AttendanceSummary, SessionAttendanceSummary
+from app.models.schedule import Schedule
+
+# Counter column for every attendance status
+STATUS_COLUMNS = {
+    "PRESENT": "present_count",
+    "LATE": "late_count",
+    "ABSENT": "absent_count",
+    "ON_GOING": "on_going_count",
+}
+
+# What an attendance row contributes to the summaries: (schedule_id, student_id,
+# status)
+AttendanceKey = Tuple[int, int, str]
+
+
+def attendance_key(attendance: Attendance) -> AttendanceKey:
+    return attendance.schedule_id, attendance.student_id, attendance.status
+
+
+def _increment(
+    db: Session, model, keys: Dict[str, int], status: str, delta: int, **extra
+) -> None:
+    """
+    Add delta to the total and status counter of one summary row.
+
+    The increment is a single UPDATE so concurrent check-ins cannot overwrite
+    each other's counts; the row is inserted on first use.
+    """
+    column = STATUS_COLUMNS.get(status)
+    values = {"total_count": model.total_count + delta, "updated_at": datetime.utcnow()}
+    if column:
+        values[column] = getattr(model, column) + delta
+
+    conditions = [getattr(model, name) == value for name, value in keys.items()]
+    result = db.exec(update(model).where(*conditions).values(**values))
+    if delta < 0:
+        # Drop rows with no attendance left, as a rebuild would not create them
+        db.exec(delete(model).where(*conditions, model.total_count <= 0))
+    elif result.rowcount == 0:
+        counters = {"total_count": delta}
+        if column:
+            counters[column] = delta
+        db.add(model(**keys, **extra, **counters))
+        db.flush()
+
+
+def record_attendance_change(
+    db: Session,
+    before: Optional[AttendanceKey],
+    after: Optional[AttendanceKey],
+) -> None:
+    """
+    Move one attendance row's contribution from `before` to `after`.
+
+    Pass None as `before` for a new row and as `after` for a deleted one.
+    Runs in the caller's transaction and does not commit, so the summaries
+    are written atomically with the attendance change.
+    """
+    if before == after:
+        return
+
+    for key, delta in ((before, -1), (after, 1)):
+        if key is None:
+            continue
+        schedule_id, student_id, status = key
+        schedule = db.get(Schedule, schedule_id)
+        if schedule is None:
+            continue
+        _increment(
+            db,
+            AttendanceSummary,
+            {"course_id": schedule.course_id, "student_id": student_id},
+            status,
+            delta,
+        )
+        _increment(
+            db,
+            SessionAttendanceSummary,
+            {"schedule_id": schedule_id},
+            status,
+            delta,
+            course_id=schedule.course_id,
+        )
+
+
+def rebuild_attendance_summaries(
+    db: Session, course_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Recompute the summaries from the attendance table.
+
+    Used for backfilling and after changes that move many rows at once
+    (deleting a schedule or student, moving a schedule to another course).
+    Does not commit.
+
+    Args:
+        db (Session): Active database session
+        course_ids (Optional[Iterable[int]]): Courses to rebuild, or None for all
+
+    Returns:
+        int: Number of per-student summary rows written
+    """
+    course_ids = None if course_ids is None else list(set(course_ids))
+
+    student_delete = delete(AttendanceSummary)
+    session_delete = delete(SessionAttendanceSummary)
+    counts_query = (
+        select(
+            Schedule.course_id,
+            Attendance.schedule_id,
+            Attendance.student_id,
+            Attendance.status,
+            func.count(),
+        )
+        .join(Schedule, Attendance.schedule_id == Schedule.schedule_id)
+        .group_by(
+            Schedule.course_id,
+            Attendance.schedule_id,
+            Attendance.student_id,
+            Attendance.status,
+        )
+    )
+    if course_ids is not None:
+        student_delete = student_delete.where(
+            AttendanceSummary.course_id.in_(course_ids)
+        )
+        session_delete = session_delete.where(
+            SessionAttendanceSummary.course_id.in_(course_ids)
+        )
+        counts_query = counts_query.where(Schedule.course_id.in_(course_ids))
+
+    db.exec(student_delete)
+    db.exec(session_delete)
+
+    students: Dict[Tuple[int, int], Dict[str, int]] = defaultdict(
+        lambda: defaultdict(int)
+    )
+    sessions: Dict[Tuple[int, int], Dict[str, int]] = defaultdict(
+        lambda: defaultdict(int)
+    )
+    for course_id, schedule_id, student_id, status, count in db.exec(counts_query):
+        for counters in (
+            students[(course_id, student_id)],
+            sessions[(schedule_id, course_id)],
+        ):
+            counters["total_count"] += count
+            if status in STATUS_COLUMNS:
+                counters[STATUS_COLUMNS[status]] += count
+
+    db.add_all(
+        AttendanceSummary(course_id=course_id, student_id=student_id, **counters)
+        for (course_id, student_id), counters in students.items()
+    )
+    db.add_all(
+        SessionAttendanceSummary(
+            schedule_id=schedule_id, course_id=course_id, **counters
+        )
+        for (schedule_id, course_id), counters in sessions.items()
+    )
+    db.flush()
+    return len(students)
+
+
+def get_course_student_summaries(
+    db: Session, course_id: int
+) -> List[AttendanceSummary]:
+    """Per-student attendance counts of a course, ordered by student ID."""
+    return db.exec(
+        select(AttendanceSummary)
+        .where(AttendanceSummary.course_id == course_id)
+        .order_by(AttendanceSummary.student_id)
+    ).all()
+
+
+def get_student_summary(
+    db: Session, course_id: int, student_id: int
+) -> Optional[AttendanceSummary]:
+    """Attendance counts of one student in one course (a primary key lookup)."""
+    return db.get(AttendanceSummary, (course_id, student_id))
+
+
+def get_student_summaries(db: Session, student_id: int) -> List[AttendanceSummary]:
+    """Attendance counts of a student in every course they have attendance in."""
+    return db.exec(
+        select(AttendanceSummary)
+        .where(AttendanceSummary.student_id == student_id)
+        .order_by(AttendanceSummary.course_id)
+    ).all()
+
+
+def get_course_session_summaries(
+    db: Session, course_id: int
+) -> List[SessionAttendanceSummary]:
+    """Per-session attendance counts of a course, ordered by schedule ID."""
+    return db.exec(
+        select(SessionAttendanceSummary)
+        .where(SessionAttendanceSummary.course_id == course_id)
+        .order_by(SessionAttendanceSummary.schedule_id)
+    ).all()
+
+
+if __name__ == "__main__":
+    from app.dependencies import create_db_and_tables, engine
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        count = rebuild_attendance_summaries(session)
+        session.commit()
+    print(f"Rebuilt attendance summaries for {count} student-course pairs")
@@ -1,19 +1,92 @@
-from sqlmodel import Session, select
+from datetime import datetime
+
+from sqlmodel import Session, func, select
 from fastapi import HTTPException, status
 
+from app.crud.sync import filter_updated_since, record_deletion
+from app.models.attendance_summary import AttendanceSummary
 from app.models.course import Course
+from app.models.instructor_course import InstructorCourse
+from app.models.schedule import Schedule
 from app.schemas.course import CourseCreate, CourseUpdate
+from app.services.course_access import course_access
+from app.services.table_versions import table_versions
 from app.utils.time_utils import get_indonesia_time
 
 
-def get_courses(db: Session, skip: int = 0, limit: int = 100) -> list[Course]:
+def get_courses(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    updated_since: datetime | None = None,
+) -> list[Course]:
     """
     Mengambil daftar course dengan pagination.
 
     Menjalankan query untuk mendapatkan semua course dengan offset dan limit
     untuk mendukung pagination, mengembalikan list course yang tersedia.
+    Dengan updated_since hanya course yang berubah sejak waktu tersebut.
+    """
+    query = filter_updated_since(select(Course), Course, updated_since)
+    return db.exec(query.offset(skip).limit(limit)).all()
+
+
+def get_instructor_course_list(
+    db: Session,
+    instructor_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    updated_since: datetime | None = None,
+) -> list[Course]:
+    """
+    Mengambil daftar course yang diajar oleh instructor dengan pagination.
+
+    Filter dilakukan di database melalui JOIN dengan InstructorCourse sehingga
+    offset dan limit berlaku pada course milik instructor, bukan pada seluruh
+    course.
+    """
+    query = (
+        select(Course)
+        .join(InstructorCourse, InstructorCourse.course_id == Course.course_id)
+        .where(InstructorCourse.instructor_id == instructor_id)
+        .distinct()
+    )
+    query = filter_updated_since(query, Course, updated_since)
+    return db.exec(query.order_by(Course.course_id).offset(skip).limit(limit)).all()
+
+
+def get_course_stats(db: Session, course_ids: list[int]) -> dict[int, dict]:
+    """
+    Menghitung jumlah sesi dan jumlah student untuk beberapa course sekaligus.
+
+    Jumlah sesi dihitung dari Schedule dan jumlah student dari tabel ringkasan
+    kehadiran (satu baris per student per course), masing-masing dengan satu
+    query GROUP BY untuk seluruh course_ids.
     """
-    return db.exec(select(Course).offset(skip).limit(limit)).all()
+    stats = {
+        course_id: {"session_count": 0, "enrolled_count": 0}
+        for course_id in course_ids
+    }
+    if not course_ids:
+        return stats
+
+    session_counts = db.exec(
+        select(Schedule.course_id, func.count())
+        .where(Schedule.course_id.in_(course_ids))
+        .group_by(Schedule.course_id)
+    ).all()
+    for course_id, count in session_counts:
+        stats[course_id]["session_count"] = count
+
+    enrolled_counts = db.exec(
+        select(AttendanceSummary.course_id, func.count())
+        .where(AttendanceSummary.course_id.in_(course_ids))
+        .group_by(AttendanceSummary.course_id)
+    ).all()
+    for course_id, count in enrolled_counts:
+        stats[course_id]["enrolled_count"] = count
+
+    return stats
 
 
 def get_course_by_id(db: Session, course_id: int) -> Course:
@@ -45,6 +118,7 @@ def create_course(db: Session, course: CourseCreate) -> Course:
     db.add(db_course)
     db.commit()
     db.refresh(db_course)
+    table_versions.bump(Course)
     return db_course
 
 
@@ -64,6 +138,7 @@ def update_course(db: Session, course_id: int, course: CourseUpdate) -> Course:
     db.add(db_course)
     db.commit()
     db.refresh(db_course)
+    table_versions.bump(Course)
     return db_course
 
 
@@ -83,5 +158,9 @@ def delete_course(db: Session, course_id: int) -> Course:
         )
 
     db.delete(db_course)
+    record_deletion(db, "course", course_id)
     db.commit()
+    # Assignments go with the course; its ID may be reused by a new course
+    course_access.invalidate()
+    table_versions.bump(Course, InstructorCourse)
     return db_course
@@ -0,0 +1,124 @@
+from typing import Optional, Tuple
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.models.face_template import FaceTemplate
+from app.utils.time_utils import get_indonesia_time
+
+# Templates are stored at half precision; cosine similarity is unaffected in practice
+TEMPLATE_STORAGE_DTYPE = "float16"
+
+
+def upsert_face_template(
+    db: Session,
+    student_id: int,
+    template: np.ndarray,
+    model_id: str,
+    photos_used: int = 0,
+    dtype: str = TEMPLATE_STORAGE_DTYPE,
+) -> FaceTemplate:
+    """
+    Store a student's face template as a packed binary vector.
+
+    Replaces any existing template for the student and bumps its version, so
+    consumers can tell a re-enrollment from the template they have cached.
+
+    Args:
+        db (Session): Active database session for executing queries
+        student_id (int): Student the template belongs to
+        template (np.ndarray): One-dimensional embedding vector
+        model_id (str): Identifier of the model that produced the embedding
+        photos_used (int): Number of photos averaged into the template
+        dtype (str): Storage dtype, float16 or float32
+
+    Returns:
+        FaceTemplate: The stored template row
+    """
+    vector = np.ascontiguousarray(template, dtype=dtype).reshape(-1)
+
+    db_template = db.exec(
+        select(FaceTemplate).where(FaceTemplate.student_id == student_id)
+    ).first()
+    if db_template is None:
+        db_template = FaceTemplate(
+            student_id=student_id, model_id=model_id, dim=0, data=b""
+        )
+    else:
+        db_template.version += 1
+
+    db_template.model_id = model_id
+    db_template.dim = int(vector.shape[0])
+    db_template.dtype = dtype
+    db_template.data = vector.tobytes()
+    db_template.photos_used = photos_used
+    db_template.updated_at = get_indonesia_time()
+
+    db.add(db_template)
+    db.commit()
+    db.refresh(db_template)
+    return db_template
+
+
+def get_face_template(
+    db: Session, student_id: int, model_id: Optional[str] = None
+) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    Load a student's face template directly into a NumPy vector.
+
+    Only the template columns are read, and the stored bytes are wrapped with
+    `np.frombuffer` without any parsing.
+
+    Args:
+        db (Session): Active database session for executing queries
+        student_id (int): Student whose template is requested
+        model_id (Optional[str]): If given, only a template produced by this
+                                  model is returned
+
+    Returns:
+        Optional[Tuple[np.ndarray, int]]: Float32 template vector and template
+                                          version, None if the student has no
+                                          (matching) template
+    """
+    row = db.exec(
+        select(
+            FaceTemplate.version,
+            FaceTemplate.model_id,
+            FaceTemplate.dim,
+            FaceTemplate.dtype,
+            FaceTemplate.data,
+        ).where(FaceTemplate.student_id == student_id)
+    ).first()
+    if row is None:
+        return None
+
+    version, stored_model_id, dim, dtype, data = row
+    if model_id is not None and stored_model_id != model_id:
+        return None
+
+    return np.frombuffer(data, dtype=dtype, count=dim).astype(np.float32), version
+
+
+def delete_face_template(db: Session, student_id: int, commit: bool = True) -> bool:
+    """
+    Remove a student's face template.
+
+    Args:
+        db (Session): Active database session for executing queries
+        student_id (int): Student whose template is removed
+        commit (bool): Commit the deletion; callers that delete the template as
+                       part of a larger change commit it themselves
+
+    Returns:
+        bool: True if a template was deleted, False if none existed
+    """
+    db_template = db.exec(
+        select(FaceTemplate).where(FaceTemplate.student_id == student_id)
+    ).first()
+    if db_template is None:
+        return False
+
+    db.delete(db_template)
+    if commit:
+        db.commit()
+    return True
@@ -1,7 +1,11 @@
+from sqlalchemy.orm import defer, load_only
 from sqlmodel import Session, select
 
 from app.models.instructor import Instructor
+from app.models.instructor_course import InstructorCourse
 from app.schemas.instructor import InstructorCreate, InstructorUpdate
+from app.services.course_access import course_access
+from app.services.table_versions import table_versions
 from app.utils.authentication import get_password_hash, verify_password
 from app.utils.time_utils import get_indonesia_time
 
@@ -41,6 +45,7 @@ def create_instructor(db: Session, instructor: InstructorCreate) -> Instructor:
     db.add(db_instructor)
     db.commit()
     db.refresh(db_instructor)
+    table_versions.bump(Instructor)
     return db_instructor
 
 
@@ -74,22 +79,34 @@ def get_next_instructor(db: Session, current_instructor_id: int) -> Instructor |
     return next_instructor
 
 
-def get_instructors(db: Session, skip: int = 0, limit: int = 100) -> list[Instructor]:
+def get_instructors(
+    db: Session, skip: int = 0, limit: int = 100, fields: frozenset | None = None
+) -> list[Instructor]:
     """
     Retrieve a paginated list of instructors.
 
     Fetches instructors with pagination support for efficient data loading.
     Results are ordered by default database ordering (typically by ID).
+    The password hash is deferred since listings never return it; with a
+    sparse fieldset only the requested columns are loaded.
 
     Args:
         db: Database session for query execution
         skip: Number of records to skip for pagination (default: 0)
         limit: Maximum number of records to return (default: 100)
+        fields: Columns to load, or None for every column except the password
 
     Returns:
         list[Instructor]: List of instructor records
     """
-    return db.exec(select(Instructor).offset(skip).limit(limit)).all()
+    if fields is None:
+        option = defer(Instructor.password)
+    else:
+        option = load_only(
+            Instructor.instructor_id,
+            *(getattr(Instructor, name) for name in fields if name != "password"),
+        )
+    return db.exec(select(Instructor).options(option).offset(skip).limit(limit)).all()
 
 
 def get_instructor(db: Session, instructor_id: int) -> Instructor | None:
@@ -114,7 +131,8 @@ def get_instructor_by_username(db: Session, username: str) -> Instructor | None:
     Retrieve an instructor by username.
 
     Finds instructor using unique username field, commonly used for
-    authentication and user lookup operations.
+    authentication and user lookup operations. The password hash is deferred
+    and only loaded if accessed.
 
     Args:
         db: Database session for query execution
@@ -123,7 +141,11 @@ def get_instructor_by_username(db: Session, username: str) -> Instructor | None:
     Returns:
         Instructor | None: The instructor with matching username or None if not found
     """
-    return db.exec(select(Instructor).where(Instructor.username == username)).first()
+    return db.exec(
+        select(Instructor)
+        .where(Instructor.username == username)
+        .options(defer(Instructor.password))
+    ).first()
 
 
 def update_instructor(
@@ -164,6 +186,7 @@ def update_instructor(
     db.add(db_instructor)
     db.commit()
     db.refresh(db_instructor)
+    table_versions.bump(Instructor)
     return db_instructor
 
 
@@ -190,6 +213,8 @@ def delete_instructor(db: Session, instructor_id: int) -> bool:
 
     db.delete(instructor)
     db.commit()
+    course_access.invalidate(instructor_id)
+    table_versions.bump(Instructor, InstructorCourse)
     return True
 
 
@@ -230,4 +255,5 @@ def change_instructor_password(
     db.add(db_instructor)
     db.commit()
     db.refresh(db_instructor)
+    table_versions.bump(Instructor)
     return db_instructor
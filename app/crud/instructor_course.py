@@ -4,6 +4,8 @@ from sqlalchemy.orm import joinedload
 
 from app.models.instructor_course import InstructorCourse
 from app.schemas.instructor_course import InstructorCourseCreate, InstructorCourseUpdate
+from app.services.course_access import course_access
+from app.services.table_versions import table_versions
 from app.utils.time_utils import get_indonesia_time
 
 
@@ -34,6 +36,8 @@ def create_instructor_course(
     db.add(db_instructor_course)
     db.commit()
     db.refresh(db_instructor_course)
+    course_access.invalidate(db_instructor_course.instructor_id)
+    table_versions.bump(InstructorCourse)
     return db_instructor_course
 
 
@@ -117,6 +121,7 @@ def update_instructor_course(
         SQLAlchemyError: If database operation fails
     """
     db_instructor_course = get_instructor_course_by_id(db, instructor_course_id)
+    previous_instructor_id = db_instructor_course.instructor_id
 
     instructor_course_data = instructor_course.dict(exclude_unset=True)
     for key, value in instructor_course_data.items():
@@ -125,6 +130,10 @@ def update_instructor_course(
     db.add(db_instructor_course)
     db.commit()
     db.refresh(db_instructor_course)
+    course_access.invalidate(
+        previous_instructor_id, db_instructor_course.instructor_id
+    )
+    table_versions.bump(InstructorCourse)
     return db_instructor_course
 
 
@@ -151,4 +160,6 @@ def delete_instructor_course(
     db_instructor_course = get_instructor_course_by_id(db, instructor_course_id)
     db.delete(db_instructor_course)
     db.commit()
+    course_access.invalidate(db_instructor_course.instructor_id)
+    table_versions.bump(InstructorCourse)
     return db_instructor_course
@@ -1,8 +1,13 @@
+from datetime import datetime
+
 from fastapi import HTTPException, status
 from sqlmodel import Session, select
 
+from app.crud.sync import filter_updated_since, record_deletion
 from app.models.room import Room
 from app.schemas.room import RoomCreate, RoomUpdate
+from app.services.geofence_service import room_index
+from app.services.table_versions import table_versions
 
 
 def create_room(db: Session, room: RoomCreate) -> Room:
@@ -34,12 +39,18 @@ def create_room(db: Session, room: RoomCreate) -> Room:
     db.add(db_room)
     db.commit()
     db.refresh(db_room)
+    room_index.invalidate()
+    table_versions.bump(Room)
 
     return db_room
 
 
 def get_rooms(
-    db: Session, skip: int = 0, limit: int = 100, name: str | None = None
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    name: str | None = None,
+    updated_since: datetime | None = None,
 ) -> list[Room]:
     """
     Retrieve rooms with pagination and optional name filtering.
@@ -53,6 +64,8 @@ def get_rooms(
         skip: Number of records to skip for pagination (default: 0)
         limit: Maximum number of records to return (default: 100)
         name: Optional partial name filter for room search
+        updated_since: Only return rooms created or changed since this time,
+            oldest change first
 
     Returns:
         list[Room]: List of rooms matching criteria
@@ -61,6 +74,7 @@ def get_rooms(
 
     if name:
         query = query.where(Room.name.ilike(f"%{name}%"))
+    query = filter_updated_since(query, Room, updated_since)
 
     rooms = db.exec(query.offset(skip).limit(limit)).all()
     return rooms
@@ -122,6 +136,8 @@ def update_room(db: Session, room_id: int, room: RoomUpdate) -> Room:
     db.add(db_room)
     db.commit()
     db.refresh(db_room)
+    room_index.invalidate()
+    table_versions.bump(Room)
 
     return db_room
 
@@ -153,5 +169,8 @@ def delete_room(db: Session, room_id: int) -> Room:
             detail=f"Room with ID {room_id} cannot be deleted because it is currently in use (has associated schedules)",
         )
     db.delete(db_room)
+    record_deletion(db, "room", room_id)
     db.commit()
+    room_index.invalidate()
+    table_versions.bump(Room)
     return db_room
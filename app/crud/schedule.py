@@ -1,17 +1,90 @@
-from datetime import date
-from typing import List, Optional
+from datetime import date, datetime
+from typing import FrozenSet, List, Optional
 
 from fastapi import HTTPException
+from sqlalchemy import select as sa_select
 from sqlmodel import Session, select
 
+from app.crud.attendance_summary import rebuild_attendance_summaries
+from app.crud.sync import filter_updated_since, record_deletion
 from app.models.course import Course
 from app.models.instructor import Instructor
 from app.models.room import Room
 from app.models.schedule import Schedule
 from app.schemas.schedule import ScheduleCreate, ScheduleUpdate
+from app.services.table_versions import table_versions
+from app.services.timeline_service import today_timeline
 from app.utils.time_utils import get_indonesia_time
 
 
+# Schedule fields served directly from schedule columns
+SCHEDULE_FIELD_COLUMNS = {
+    "schedule_id": Schedule.schedule_id,
+    "chapter": Schedule.chapter,
+    "schedule_date": Schedule.schedule_date,
+    "start_time": Schedule.start_time,
+    "end_time": Schedule.end_time,
+    "created_at": Schedule.created_at,
+}
+
+# Nested relations: joined model, join condition and the columns returned
+SCHEDULE_RELATIONS = {
+    "course": (
+        Course,
+        Schedule.course_id == Course.course_id,
+        (Course.course_id, Course.course_name),
+    ),
+    "instructor": (
+        Instructor,
+        Schedule.instructor_id == Instructor.instructor_id,
+        (Instructor.instructor_id, Instructor.full_name),
+    ),
+    "room": (
+        Room,
+        Schedule.room_id == Room.room_id,
+        (Room.room_id, Room.name, Room.latitude, Room.longitude, Room.radius),
+    ),
+}
+
+
+def _wants(fields: Optional[FrozenSet[str]], name: str) -> bool:
+    return fields is None or name in fields
+
+
+def _format_course(row) -> dict:
+    if row.course_course_id is None:
+        return {"course_id": 0, "course_name": "Unknown Course"}
+    return {"course_id": row.course_course_id, "course_name": row.course_course_name}
+
+
+def _format_instructor(row) -> dict:
+    if row.instructor_instructor_id is None:
+        return {"instructor_id": 0, "full_name": "Unknown Instructor"}
+    return {
+        "instructor_id": row.instructor_instructor_id,
+        "full_name": row.instructor_full_name,
+    }
+
+
+def _format_room(row) -> Optional[dict]:
+    if row.room_room_id is None:
+        return None
+    return {
+        "room_id": row.room_room_id,
+        "name": row.room_name,
+        "latitude": row.room_latitude,
+        "longitude": row.room_longitude,
+        "radius": row.room_radius,
+    }
+
+
+_RELATION_FORMATTERS = {
+    "course": _format_course,
+    "instructor": _format_instructor,
+    "room": _format_room,
+}
+
+
 def create_schedule(db: Session, schedule: ScheduleCreate) -> Schedule:
     """
     Create a new schedule entry with comprehensive validation.
@@ -66,6 +139,8 @@ def create_schedule(db: Session, schedule: ScheduleCreate) -> Schedule:
     db.add(db_schedule)
     db.commit()
     db.refresh(db_schedule)
+    today_timeline.invalidate()
+    table_versions.bump(Schedule)
 
     return db_schedule
 
@@ -78,6 +153,8 @@ def get_schedules(
     instructor_id: Optional[int] = None,
     room_id: Optional[int] = None,
     schedule_date: Optional[date] = None,
+    fields: Optional[FrozenSet[str]] = None,
+    updated_since: Optional[datetime] = None,
 ) -> List[dict]:
     """
     Retrieve schedules with comprehensive filtering and joined entity details.
@@ -86,6 +163,8 @@ def get_schedules(
     along with related course, instructor, and room information. It supports
     multiple filter options and pagination. The result is formatted as a list
     of dictionaries containing all relevant details for easy consumption.
+    Only the columns each field needs are selected, and when a sparse fieldset
+    is requested, relations outside it are not joined at all.
 
     Args:
         db (Session): Active database session for executing queries
@@ -95,20 +174,30 @@ def get_schedules(
         instructor_id (Optional[int]): Filter schedules by specific instructor ID
         room_id (Optional[int]): Filter schedules by specific room ID
         schedule_date (Optional[date]): Filter schedules by specific date
+        fields (Optional[FrozenSet[str]]): Top-level fields to return, or None
+                                           for all of them
+        updated_since (Optional[datetime]): Only return schedules created or
+                                            changed since this time, oldest
+                                            change first
 
     Returns:
         List[dict]: List of formatted schedule dictionaries containing schedule
                    details with nested course, instructor, and room information
     """
-    query = (
-        select(Schedule, Course, Instructor, Room)
-        .join(Course, Schedule.course_id == Course.course_id, isouter=True)
-        .join(
-            Instructor, Schedule.instructor_id == Instructor.instructor_id, isouter=True
-        )
-        .join(Room, Schedule.room_id == Room.room_id, isouter=True)
+    wanted = [name for name in SCHEDULE_FIELD_COLUMNS if _wants(fields, name)]
+    # schedule_id is always selected so the FROM clause starts at Schedule;
+    # SQLAlchemy's select keeps rows as tuples even for a single column
+    query = sa_select(Schedule.schedule_id).add_columns(
+        *(SCHEDULE_FIELD_COLUMNS[name] for name in wanted if name != "schedule_id")
     )
 
+    relations = [name for name in SCHEDULE_RELATIONS if _wants(fields, name)]
+    for name in relations:
+        model, on_clause, relation_columns = SCHEDULE_RELATIONS[name]
+        query = query.add_columns(
+            *(column.label(f"{name}_{column.key}") for column in relation_columns)
+        ).join(model, on_clause, isouter=True)
+
     if course_id is not None:
         query = query.where(Schedule.course_id == course_id)
     if instructor_id is not None:
@@ -117,40 +206,16 @@ def get_schedules(
         query = query.where(Schedule.room_id == room_id)
     if schedule_date is not None:
         query = query.where(Schedule.schedule_date == schedule_date)
+    query = filter_updated_since(query, Schedule, updated_since)
 
-    results = db.exec(query.offset(skip).limit(limit)).all()
+    rows = db.exec(query.offset(skip).limit(limit)).all()
 
     schedules = []
-    for schedule, course, instructor, room in results:
-        schedules.append(
-            {
-                "schedule_id": schedule.schedule_id,
-                "chapter": schedule.chapter,
-                "schedule_date": schedule.schedule_date,
-                "start_time": schedule.start_time,
-                "end_time": schedule.end_time,
-                "created_at": schedule.created_at,
-                "course": {
-                    "course_id": course.course_id if course else 0,
-                    "course_name": course.course_name if course else "Unknown Course",
-                },
-                "instructor": {
-                    "instructor_id": instructor.instructor_id if instructor else 0,
-                    "full_name": instructor.full_name
-                    if instructor
-                    else "Unknown Instructor",
-                },
-                "room": {
-                    "room_id": room.room_id if room else 0,
-                    "name": room.name if room else "Unknown Room",
-                    "latitude": room.latitude if room else 0.0,
-                    "longitude": room.longitude if room else 0.0,
-                    "radius": room.radius if room else 0.0,
-                }
-                if room
-                else None,
-            }
-        )
+    for row in rows:
+        schedule = {name: getattr(row, name) for name in wanted}
+        for name in relations:
+            schedule[name] = _RELATION_FORMATTERS[name](row)
+        schedules.append(schedule)
 
     return schedules
 
@@ -227,13 +292,22 @@ def update_schedule(
                 status_code=404, detail=f"Room with ID {schedule.room_id} not found"
             )
 
+    previous_course_id = db_schedule.course_id
     schedule_data = schedule.model_dump(exclude_unset=True)
     for key, value in schedule_data.items():
         setattr(db_schedule, key, value)
 
     db.add(db_schedule)
+    if db_schedule.course_id != previous_course_id:
+        # The session's attendance now counts towards another course
+        db.flush()
+        rebuild_attendance_summaries(
+            db, [previous_course_id, db_schedule.course_id]
+        )
     db.commit()
     db.refresh(db_schedule)
+    today_timeline.invalidate()
+    table_versions.bump(Schedule)
 
     return db_schedule
 
@@ -259,7 +333,12 @@ def delete_schedule(db: Session, schedule_id: int) -> Schedule:
     """
     db_schedule = get_schedule(db, schedule_id)
     db.delete(db_schedule)
+    record_deletion(db, "schedule", schedule_id)
+    db.flush()
+    rebuild_attendance_summaries(db, [db_schedule.course_id])
     db.commit()
+    today_timeline.invalidate()
+    table_versions.bump(Schedule)
     return db_schedule
 
 
@@ -1,23 +1,59 @@
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, FrozenSet, List, Optional
 
+from sqlalchemy import inspect
+from sqlalchemy.orm import defer, load_only
 from sqlmodel import Session, delete, select
 
+from app.crud.attendance_summary import rebuild_attendance_summaries
+from app.crud.face_template import delete_face_template
+from app.models.attendance_summary import AttendanceSummary
 from app.models.schedule import Schedule
 from app.models.student import Student
 from app.schemas.student import StudentCreate, StudentUpdate
 from app.utils.authentication import get_password_hash
 from app.utils.time_utils import get_indonesia_time
 
+# Columns returned by student listings; the password hash and face data are
+# never part of a list response and are left unread
+STUDENT_LIST_COLUMNS = (
+    Student.student_id,
+    Student.nim,
+    Student.username,
+    Student.full_name,
+    Student.major_name,
+    Student.profile_picture_url,
+    Student.year,
+    Student.is_approved,
+    Student.created_at,
+    Student.updated_at,
+)
+
+
+def _decode_legacy_face_data(student: Student) -> None:
+    """
+    Repair face_data written by older versions, which JSON-encoded it twice.
+
+    Such rows hold a JSON string inside the JSON column; it is decoded in place
+    (and rewritten as a plain object on the next commit). Current rows, and
+    rows whose face_data was deferred, are left untouched.
+    """
+    if "face_data" in inspect(student).unloaded:
+        return
+    if isinstance(student.face_data, str):
+        try:
+            student.face_data = json.loads(student.face_data)
+        except json.JSONDecodeError:
+            student.face_data = None
+
 
 def create_student(db: Session, student: StudentCreate) -> Student:
     """
-    Create a new student account with secure password hashing and face data serialization.
+    Create a new student account with secure password hashing.
 
     This function handles the complete student registration process including password
-    security through hashing, face recognition data serialization for biometric features,
-    and database persistence. The face data is stored as JSON string for compatibility
-    with various database systems while maintaining data structure integrity.
+    security through hashing and database persistence. Face data is stored as a plain
+    object in the JSON column; face templates live in the FaceTemplate table.
 
     Args:
         db (Session): Active database session for executing queries
@@ -32,9 +68,6 @@ def create_student(db: Session, student: StudentCreate) -> Student:
     student_data = student.model_dump()
     student_data["password"] = hashed_password
 
-    if student_data.get("face_data"):
-        student_data["face_data"] = json.dumps(student_data["face_data"])
-
     db_student = Student(**student_data)
     db.add(db_student)
     db.commit()
@@ -43,43 +76,50 @@ def create_student(db: Session, student: StudentCreate) -> Student:
     return db_student
 
 
-def get_students(db: Session, skip: int = 0, limit: int = 100) -> List[Student]:
+def get_students(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[FrozenSet[str]] = None,
+) -> List[Student]:
     """
-    Retrieve a paginated list of students with deserialized face recognition data.
+    Retrieve a paginated list of students.
 
-    This function fetches student records with pagination support and automatically
-    deserializes face recognition data from JSON strings back to Python objects.
-    It includes error handling for corrupted face data to ensure system stability
-    when biometric data becomes invalid or corrupted.
+    This function fetches student records with pagination support. Only the
+    columns in STUDENT_LIST_COLUMNS are read, so password hashes and face data
+    are not loaded for listings; accessing them on a returned object issues a
+    separate query per student. A sparse fieldset narrows the columns further.
 
     Args:
         db (Session): Active database session for executing queries
         skip (int): Number of records to skip for pagination (default: 0)
         limit (int): Maximum number of records to return (default: 100)
+        fields (Optional[FrozenSet[str]]): Listing fields to load, or None for
+                                           all of STUDENT_LIST_COLUMNS
 
     Returns:
-        List[Student]: List of student objects with deserialized face data
+        List[Student]: List of student objects with list columns loaded
     """
-    students = db.exec(select(Student).offset(skip).limit(limit)).all()
-
-    for student in students:
-        if student.face_data:
-            try:
-                student.face_data = json.loads(student.face_data)
-            except json.JSONDecodeError:
-                student.face_data = None
-
-    return students
+    columns = [
+        column
+        for column in STUDENT_LIST_COLUMNS
+        if fields is None or column.key in fields or column.key == "student_id"
+    ]
+    return db.exec(
+        select(Student)
+        .options(load_only(*columns))
+        .offset(skip)
+        .limit(limit)
+    ).all()
 
 
 def get_student(db: Session, student_id: int) -> Optional[Student]:
     """
-    Retrieve a specific student by ID with face data deserialization.
+    Retrieve a specific student by ID.
 
-    This function fetches a single student record and handles the deserialization
-    of face recognition data from JSON format. It provides safe handling of
-    corrupted biometric data to prevent system failures during authentication
-    or profile access operations.
+    This function fetches a single student record. Legacy twice-encoded face
+    data is decoded, and corrupted biometric data is replaced by None to prevent
+    system failures during authentication or profile access operations.
 
     Args:
         db (Session): Active database session for executing queries
@@ -90,23 +130,19 @@ def get_student(db: Session, student_id: int) -> Optional[Student]:
     """
     student = db.get(Student, student_id)
 
-    if student and student.face_data:
-        try:
-            student.face_data = json.loads(student.face_data)
-        except json.JSONDecodeError:
-            student.face_data = None
+    if student:
+        _decode_legacy_face_data(student)
 
     return student
 
 
 def get_student_by_username(db: Session, username: str) -> Optional[Student]:
     """
-    Retrieve a student by their unique username for authentication purposes.
+    Retrieve a student by their unique username.
 
-    This function is primarily used during login and authentication processes
-    where the username serves as the primary identifier. It includes face data
-    deserialization to support biometric authentication features alongside
-    traditional username/password authentication methods.
+    This function fetches the full student record, e.g. for profile lookups
+    and registration checks. Legacy twice-encoded face data is decoded as in
+    get_student.
 
     Args:
         db (Session): Active database session for executing queries
@@ -117,15 +153,34 @@ def get_student_by_username(db: Session, username: str) -> Optional[Student]:
     """
     student = db.exec(select(Student).where(Student.username == username)).first()
 
-    if student and student.face_data:
-        try:
-            student.face_data = json.loads(student.face_data)
-        except json.JSONDecodeError:
-            student.face_data = None
+    if student:
+        _decode_legacy_face_data(student)
 
     return student
 
 
+def get_student_for_auth(db: Session, username: str) -> Optional[Student]:
+    """
+    Retrieve a student by username for authentication purposes.
+
+    This function runs on every authenticated student request, so the password
+    hash and face data are deferred and only loaded if the caller accesses
+    them. Use get_student_by_username for a record that is returned to clients.
+
+    Args:
+        db (Session): Active database session for executing queries
+        username (str): Unique username of the student account
+
+    Returns:
+        Optional[Student]: Student object if username exists, None otherwise
+    """
+    return db.exec(
+        select(Student)
+        .where(Student.username == username)
+        .options(defer(Student.password), defer(Student.face_data))
+    ).first()
+
+
 def get_student_by_nim(db: Session, nim: str) -> Optional[Student]:
     """
     Retrieve a student by their unique student identification number (NIM).
@@ -144,11 +199,8 @@ def get_student_by_nim(db: Session, nim: str) -> Optional[Student]:
     """
     student = db.exec(select(Student).where(Student.nim == nim)).first()
 
-    if student and student.face_data:
-        try:
-            student.face_data = json.loads(student.face_data)
-        except json.JSONDecodeError:
-            student.face_data = None
+    if student:
+        _decode_legacy_face_data(student)
 
     return student
 
@@ -191,8 +243,8 @@ def update_student(
     Update student information with selective field modification and security handling.
 
     This function supports partial updates of student records while maintaining
-    data security through password re-hashing when changed and proper serialization
-    of face recognition data. It automatically updates the modification timestamp
+    data security through password re-hashing when changed. It automatically
+    updates the modification timestamp
     and preserves existing data for fields not included in the update request.
 
     Args:
@@ -201,8 +253,7 @@ def update_student(
         student (StudentUpdate): Partial student data with fields to modify
 
     Returns:
-        Optional[Student]: Updated student object with deserialized face data,
-                          None if student not found
+        Optional[Student]: Updated student object, None if student not found
     """
     db_student = db.get(Student, student_id)
     if db_student is None:
@@ -213,9 +264,6 @@ def update_student(
     if "password" in student_data and student_data["password"]:
         student_data["password"] = get_password_hash(student_data["password"])
 
-    if "face_data" in student_data and student_data["face_data"]:
-        student_data["face_data"] = json.dumps(student_data["face_data"])
-
     student_data["updated_at"] = get_indonesia_time()
 
     for key, value in student_data.items():
@@ -225,12 +273,6 @@ def update_student(
     db.commit()
     db.refresh(db_student)
 
-    if db_student.face_data:
-        try:
-            db_student.face_data = json.loads(db_student.face_data)
-        except json.JSONDecodeError:
-            db_student.face_data = None
-
     return db_student
 
 
@@ -262,7 +304,17 @@ def delete_student(db: Session, student_id: int) -> bool:
         except AttributeError:
             pass
 
+    delete_face_template(db, student_id, commit=False)
+
+    course_ids = db.exec(
+        select(AttendanceSummary.course_id).where(
+            AttendanceSummary.student_id == student_id
+        )
+    ).all()
+
     db.delete(student)
+    db.flush()
+    rebuild_attendance_summaries(db, course_ids)
     db.commit()
 
     return True
@@ -275,9 +327,8 @@ def update_face_data(
     Update biometric face recognition data for enhanced security authentication.
 
     This function specifically handles updates to face recognition data used for
-    biometric authentication systems. It serializes the complex face data structure
-    to JSON format for database storage while maintaining data integrity and
-    automatically updating the modification timestamp for audit purposes.
+    biometric authentication systems. The face data structure is stored as is in
+    the JSON column, and the modification timestamp is updated for audit purposes.
 
     Args:
         db (Session): Active database session for executing queries
@@ -293,16 +344,11 @@ def update_face_data(
     if db_student is None:
         return None
 
-    db_student.face_data = json.dumps(face_data)
+    db_student.face_data = face_data
     db_student.updated_at = get_indonesia_time()
 
     db.add(db_student)
     db.commit()
     db.refresh(db_student)
 
-    try:
-        db_student.face_data = json.loads(db_student.face_data)
-    except json.JSONDecodeError:
-        db_student.face_data = None
-
     return db_student
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, inspect, update
+from sqlmodel import Session, select
+
+from app.models.attendance import Attendance
+from app.models.course import Course
+from app.models.room import Room
+from app.models.schedule import Schedule
+from app.models.tombstone import Tombstone
+from app.utils.time_utils import get_indonesia_time, indonesia_tz
+
+# Entities that support updated_since and tombstones
+SYNC_ENTITIES = {
+    "attendance": Attendance,
+    "schedule": Schedule,
+    "course": Course,
+    "room": Room,
+}
+
+SYNC_TIMESTAMP_HEADER = "X-Sync-Timestamp"
+
+# updated_at is stamped at flush time, before commit, so a row can become
+# visible after a sync that started later than its timestamp. The timestamp
+# handed to clients is moved back by this margin to pick such rows up on the
+# next sync; clients de-duplicate by ID.
+SYNC_TIMESTAMP_MARGIN = timedelta(seconds=5)
+
+
+def sync_timestamp() -> datetime:
+    """
+    Timestamp a client should send as updated_since on its next sync.
+
+    Take it before running the sync query.
+    """
+    return get_indonesia_time() - SYNC_TIMESTAMP_MARGIN
+
+
+def normalize_since(updated_since: datetime) -> datetime:
+    """
+    Mengubah updated_since ke waktu Indonesia tanpa timezone.
+
+    updated_at disimpan sebagai waktu Indonesia (WIB) tanpa offset, sehingga
+    nilai dengan timezone dikonversi dulu; nilai tanpa timezone dianggap WIB.
+    """
+    if updated_since.tzinfo is not None:
+        updated_since = updated_since.astimezone(indonesia_tz)
+    return updated_since.replace(tzinfo=None)
+
+
+def filter_updated_since(query, model, updated_since: datetime | None):
+    """
+    Membatasi query ke baris yang berubah sejak updated_since.
+
+    Hasil diurutkan berdasarkan updated_at agar pagination tetap stabil selama
+    sinkronisasi. Query dikembalikan apa adanya jika updated_since kosong.
+    """
+    if updated_since is None:
+        return query
+    primary_key = inspect(model).primary_key[0]
+    return query.where(model.updated_at >= normalize_since(updated_since)).order_by(
+        model.updated_at, primary_key
+    )
+
+
+def record_deletion(db: Session, entity: str, entity_id: int) -> None:
+    """
+    Mencatat tombstone untuk baris yang dihapus.
+
+    Dijalankan dalam transaksi pemanggil tanpa commit, sehingga tombstone
+    tersimpan bersamaan dengan penghapusannya.
+    """
+    db.add(Tombstone(entity=entity, entity_id=entity_id))
+
+
+def get_tombstones(
+    db: Session,
+    entity: str,
+    updated_since: datetime | None = None,
+    skip: int = 0,
+    limit: int = 1000,
+) -> list[Tombstone]:
+    """
+    Mengambil daftar baris yang dihapus untuk satu entity, urut waktu hapus.
+    """
+    query = select(Tombstone).where(Tombstone.entity == entity)
+    if updated_since is not None:
+        query = query.where(Tombstone.deleted_at >= normalize_since(updated_since))
+    query = query.order_by(Tombstone.deleted_at, Tombstone.tombstone_id)
+    return db.exec(query.offset(skip).limit(limit)).all()
+
+
+def backfill_updated_at(connection) -> None:
+    """
+    Mengisi updated_at yang masih kosong pada tabel yang mendukung sinkronisasi.
+
+    Baris lama (sebelum updated_at dipelihara otomatis) diisi dengan created_at
+    jika ada, atau waktu saat ini.
+    """
+    now = get_indonesia_time().replace(tzinfo=None)
+    for model in SYNC_ENTITIES.values():
+        created_at = getattr(model, "created_at", None)
+        value = now if created_at is None else func.coalesce(created_at, now)
+        connection.execute(
+            update(model).where(model.updated_at.is_(None)).values(updated_at=value)
+        )
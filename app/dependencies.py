@@ -1,13 +1,16 @@
 from typing import Generator, Optional, Dict, Any, List
 from fastapi import Depends, HTTPException, status, Query, Path
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session, SQLModel, create_engine, select
+from sqlalchemy import inspect, text
+from sqlmodel import Session, SQLModel, create_engine
 from jose import JWTError, jwt
 import os
 from pydantic import BaseModel
 
 # Import these from authentication.py
 from app.crud.admin import get_admin
+from app.crud.sync import backfill_updated_at
+from app.services.course_access import course_access
 from app.utils.authentication import SECRET_KEY, ALGORITHM
 
 # Database configuration
@@ -35,9 +38,31 @@ class TokenData(BaseModel):
     user_type: Optional[str] = None
 
 
+def _add_missing_columns(connection):
+    """Add nullable columns declared after a table was first created."""
+    inspector = inspect(connection)
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(
+                text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+            )
+
+
 def create_db_and_tables():
     """Create database and tables if they don't exist"""
     SQLModel.metadata.create_all(engine)
+    # create_all skips tables that already exist, so also add columns and
+    # indexes declared after a table was first created
+    with engine.begin() as connection:
+        _add_missing_columns(connection)
+        backfill_updated_at(connection)
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -81,9 +106,9 @@ async def get_current_user_data(
     # Get user based on type
     if token_data.user_type == "student":
         # Import here to avoid circular imports
-        from app.crud.student import get_student_by_username
+        from app.crud.student import get_student_for_auth
 
-        user = get_student_by_username(db, username=token_data.username)
+        user = get_student_for_auth(db, username=token_data.username)
     elif token_data.user_type == "instructor":
         # Import here to avoid circular imports
         from app.crud.instructor import get_instructor_by_username
@@ -163,17 +188,7 @@ async def get_instructor_courses(
     Returns:
         List of course IDs the instructor has access to
     """
-    # Import the InstructorCourse model here to avoid circular imports
-    from app.models.instructor_course import InstructorCourse
-
-    # Query to get all course IDs assigned to this instructor
-    query = select(InstructorCourse.course_id).where(
-        InstructorCourse.instructor_id == instructor_id
-    )
-    result = db.execute(query).fetchall()
-
-    # Extract course IDs from the query result
-    return [row[0] for row in result]
+    return sorted(course_access.course_ids(db, instructor_id))
 
 
 async def validate_instructor_course_access(
@@ -195,11 +210,8 @@ async def validate_instructor_course_access(
     Raises:
         HTTPException if the instructor does not have access to the course
     """
-    # Get the courses this instructor has access to
-    accessible_courses = await get_instructor_courses(instructor.instructor_id, db)
-
-    # Check if the requested course is in the accessible courses
-    if course_id not in accessible_courses:
+    # Check the requested course against the instructor's cached assignments
+    if not course_access.can_access(db, instructor.instructor_id, course_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"You don't have access to course with ID {course_id}",
@@ -237,9 +249,7 @@ async def validate_admin_instructor_course_access(
 
     # For instructors, check their course assignments
     if user_type == "instructor":
-        accessible_courses = await get_instructor_courses(user.instructor_id, db)
-
-        if course_id not in accessible_courses:
+        if not course_access.can_access(db, user.instructor_id, course_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"You don't have access to course with ID {course_id}",
@@ -1,22 +1,33 @@
 # Import all models to make them available from app.models
 from app.models.admin import Admin
 from app.models.attendance import Attendance
+from app.models.attendance_image_hash import AttendanceImageHash
+from app.models.attendance_summary import AttendanceSummary, SessionAttendanceSummary
 from app.models.course import Course
+from app.models.face_template import FaceTemplate
 from app.models.instructor_course import InstructorCourse
 from app.models.instructor import Instructor
+from app.models.invalidation_event import InvalidationEvent
 from app.models.schedule import Schedule
 from app.models.student import Student
 from app.models.room import Room
+from app.models.tombstone import Tombstone
 
 
 # Export all models
 __all__ = [
     "Admin",
     "Attendance",
+    "AttendanceImageHash",
+    "AttendanceSummary",
     "Course",
+    "FaceTemplate",
     "InstructorCourse",
     "Instructor",
+    "InvalidationEvent",
     "Schedule",
+    "SessionAttendanceSummary",
     "Student",
     "Room",
+    "Tombstone",
 ]
@@ -2,6 +2,8 @@ from sqlmodel import JSON, Column, SQLModel, Field, Relationship
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime
 
+from app.utils.time_utils import get_indonesia_time
+
 if TYPE_CHECKING:
     from app.models.student import Student
     from app.models.schedule import Schedule
@@ -19,7 +21,12 @@ class Attendance(SQLModel, table=True):
     smile_detected: bool = Field(default=False)
     image_captured_url: Optional[str] = Field(default=None)  
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: Optional[datetime] = Field(default=None)
+    # Maintained on every insert and update; indexed for updated_since sync
+    updated_at: Optional[datetime] = Field(
+        default_factory=get_indonesia_time,
+        index=True,
+        sa_column_kwargs={"onupdate": get_indonesia_time},
+    )
 
     student: Optional["Student"] = Relationship(back_populates="attendances")
     schedule: Optional["Schedule"] = Relationship(back_populates="attendances")
\ No newline at end of file
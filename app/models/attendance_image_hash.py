@@ -0,0 +1,12 @@
+# app/models/attendance_image_hash.py
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+class AttendanceImageHash(SQLModel, table=True):
+    attendance_id: int = Field(
+        foreign_key="attendance.attendance_id", primary_key=True, ondelete="CASCADE"
+    )
+    student_id: int = Field(foreign_key="student.student_id", ondelete="CASCADE")
+    image_hash: str = Field(max_length=16, index=True, description="64-bit dHash as hex")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
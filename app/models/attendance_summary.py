@@ -0,0 +1,38 @@
+# app/models/attendance_summary.py
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+class AttendanceSummary(SQLModel, table=True):
+    """Attendance counts of one student in one course, kept in step with check-ins."""
+
+    course_id: int = Field(
+        foreign_key="course.course_id", primary_key=True, ondelete="CASCADE"
+    )
+    student_id: int = Field(
+        foreign_key="student.student_id",
+        primary_key=True,
+        index=True,
+        ondelete="CASCADE",
+    )
+    present_count: int = Field(default=0)
+    late_count: int = Field(default=0)
+    absent_count: int = Field(default=0)
+    on_going_count: int = Field(default=0)
+    total_count: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SessionAttendanceSummary(SQLModel, table=True):
+    """Attendance counts of one schedule (class session)."""
+
+    schedule_id: int = Field(
+        foreign_key="schedule.schedule_id", primary_key=True, ondelete="CASCADE"
+    )
+    course_id: int = Field(foreign_key="course.course_id", index=True)
+    present_count: int = Field(default=0)
+    late_count: int = Field(default=0)
+    absent_count: int = Field(default=0)
+    on_going_count: int = Field(default=0)
+    total_count: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
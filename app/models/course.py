@@ -2,6 +2,8 @@ from sqlmodel import SQLModel, Field, Relationship
 from typing import TYPE_CHECKING, Optional, List
 from datetime import datetime
 
+from app.utils.time_utils import get_indonesia_time
+
 if TYPE_CHECKING:
     from app.models.instructor_course import InstructorCourse
     from app.models.schedule import Schedule
@@ -12,6 +14,11 @@ class Course(SQLModel, table=True):
     course_name: str = Field(max_length=100)
     sks: int = Field(gt=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = Field(
+        default_factory=get_indonesia_time,
+        index=True,
+        sa_column_kwargs={"onupdate": get_indonesia_time},
+    )
 
     instructors: List["InstructorCourse"] = Relationship(back_populates="course")
     schedules: Optional[List["Schedule"]] = Relationship(back_populates="course")
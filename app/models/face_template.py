@@ -0,0 +1,21 @@
+# app/models/face_template.py
+from sqlmodel import Column, LargeBinary, SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class FaceTemplate(SQLModel, table=True):
+    template_id: Optional[int] = Field(default=None, primary_key=True)
+    student_id: int = Field(
+        foreign_key="student.student_id", unique=True, index=True, ondelete="CASCADE"
+    )
+    model_id: str = Field(
+        max_length=255, description="Model the template was embedded with"
+    )
+    version: int = Field(default=1, description="Incremented on every re-enrollment")
+    dim: int = Field()
+    dtype: str = Field(default="float16", max_length=16)
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    photos_used: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from typing import TYPE_CHECKING, Optional
 from datetime import datetime
@@ -8,6 +9,11 @@ if TYPE_CHECKING:
 
 
 class InstructorCourse(SQLModel, table=True):
+    # Instructor-scoped course listings and access checks filter on both columns
+    __table_args__ = (
+        Index("ix_instructorcourse_instructor_course", "instructor_id", "course_id"),
+    )
+
     instructor_course_id: Optional[int] = Field(default=None, primary_key=True)
     instructor_id: int = Field(
         foreign_key="instructor.instructor_id", ondelete="CASCADE"
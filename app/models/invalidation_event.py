@@ -0,0 +1,17 @@
+# app/models/invalidation_event.py
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+from app.utils.time_utils import get_indonesia_time
+
+
+class InvalidationEvent(SQLModel, table=True):
+    """Cache invalidation published by one worker for every other worker."""
+
+    __tablename__ = "invalidation_event"
+
+    event_id: Optional[int] = Field(default=None, primary_key=True)
+    topic: str = Field(max_length=40)
+    key: Optional[str] = Field(default=None, max_length=80)
+    created_at: datetime = Field(default_factory=get_indonesia_time, index=True)
@@ -1,7 +1,10 @@
 # app/models/room.py
 from sqlmodel import SQLModel, Field, Relationship
+from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
 
+from app.utils.time_utils import get_indonesia_time
+
 if TYPE_CHECKING:
     from app.models.schedule import Schedule
 
@@ -11,6 +14,11 @@ class Room(SQLModel, table=True):
     latitude: float = Field()
     longitude: float = Field()
     radius: float = Field(description="Radius in meters")
+    updated_at: Optional[datetime] = Field(
+        default_factory=get_indonesia_time,
+        index=True,
+        sa_column_kwargs={"onupdate": get_indonesia_time},
+    )
     
     # Relationship to schedules
     schedules: List["Schedule"] = Relationship(back_populates="room")
\ No newline at end of file
@@ -3,6 +3,8 @@ from sqlmodel import SQLModel, Field, Relationship
 from typing import TYPE_CHECKING, Optional, List
 from datetime import datetime, date
 
+from app.utils.time_utils import get_indonesia_time
+
 if TYPE_CHECKING:
     from app.models.instructor import Instructor
     from app.models.course import Course
@@ -27,7 +29,13 @@ class Schedule(SQLModel, table=True):
     start_time: str = Field()
     end_time: str = Field()
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    
+    # Set by the ORM on insert and on every update (see Attendance.updated_at)
+    updated_at: Optional[datetime] = Field(
+        default_factory=get_indonesia_time,
+        index=True,
+        sa_column_kwargs={"onupdate": get_indonesia_time},
+    )
+
     instructor: Optional["Instructor"] = Relationship(back_populates="schedules")
     course: Optional["Course"] = Relationship(back_populates="schedules")
     room: Optional["Room"] = Relationship(back_populates="schedules")
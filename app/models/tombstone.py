@@ -0,0 +1,18 @@
+# app/models/tombstone.py
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+from app.utils.time_utils import get_indonesia_time
+
+
+class Tombstone(SQLModel, table=True):
+    """Record of a deleted row, so delta-syncing clients can drop it too."""
+
+    __table_args__ = (Index("ix_tombstone_entity_deleted_at", "entity", "deleted_at"),)
+
+    tombstone_id: Optional[int] = Field(default=None, primary_key=True)
+    entity: str = Field(max_length=20)
+    entity_id: int
+    deleted_at: datetime = Field(default_factory=get_indonesia_time)
@@ -4,6 +4,10 @@ from .attendance import router as attendance_router
 from .course import router as course_router
 from .instructor_course import router as instructor_course_router
 from .instructor import router as instructor_router
+from .me import router as me_router
+from .metrics import router as metrics_router
+from .report import router as report_router
+from .sync import router as sync_router
 from .schedule import router as schedule_router
 from .student import router as student_router
 from .room import router as room_router
@@ -15,6 +19,10 @@ router.include_router(attendance_router)
 router.include_router(course_router)
 router.include_router(instructor_course_router)  # Hapus duplikasi admin_router
 router.include_router(instructor_router)
+router.include_router(me_router)
+router.include_router(metrics_router)
+router.include_router(report_router)
+router.include_router(sync_router)
 router.include_router(schedule_router)
 router.include_router(student_router)
 router.include_router(room_router)
\ No newline at end of file
@@ -1,16 +1,20 @@
-import os
-from datetime import datetime
-from typing import List
+from datetime import date, datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import parse_obj_as
 from sqlmodel import Session
 
 from app.dependencies import (
+    engine,
     get_current_admin_or_instructor,
     get_current_user,
+    get_current_user_data,
     get_db,
 )
+from app.models.attendance import Attendance
 from app.schemas.attendance import (
     AttendanceCreate,
     AttendanceRead,
@@ -20,6 +24,7 @@ from app.schemas.attendance import (
     MultipleAttendanceCreate,
     MultipleAttendanceDelete,
 )
+from app.schemas.timeline import TodaySessionRead
 from app.crud.attendance import (
     create_attendance,
     create_multiple_attendances,
@@ -27,30 +32,36 @@ from app.crud.attendance import (
     get_active_student_schedule,
     get_attendances,
     get_attendance,
+    get_attendance_export_query,
     get_student_attendances,
     update_attendance,
     delete_attendance,
     delete_multiple_attendances,
     process_json_field,
 )
-from app.crud.instructor_course import get_instructor_courses
 from app.crud.schedule import get_schedule
+from app.crud.sync import SYNC_TIMESTAMP_HEADER, sync_timestamp
+from app.utils.fieldsets import FIELDS_QUERY, parse_fields
+from app.utils.responses import TrustedJSONResponse
 from app.utils.time_utils import get_indonesia_time
-from app.services.face_verification_service import student_check_in_with_verification
-
-# Fix: Use absolute path or relative path from the app directory
-# Get the directory where this file is located
-current_dir = os.path.dirname(os.path.abspath(__file__))
-# Go up one level to app directory, then to services
-MODEL_PATH = os.path.join(
-    current_dir,
-    "..",
-    "services",
-    "model_face_recognition",
-    "model_eksperimen_3.keras",
+from app.services.check_in_pipeline import (
+    CHECK_IN_PIPELINE,
+    CheckInContext,
+    build_face_verification_data,
+    choose_check_in_upload,
+    save_attendance_image,
 )
-# Normalize the path
-MODEL_PATH = os.path.normpath(MODEL_PATH)
+from app.services.attendance_export import (
+    EXPORT_MEDIA_TYPES,
+    ExportFormatUnavailable,
+    check_export_format,
+    stream_attendance_export,
+)
+from app.services.course_access import course_access
+from app.services.face_verification_service import DEFAULT_MODEL_PATH
+from app.services.image_hash_index import format_hash
+
+MODEL_PATH = DEFAULT_MODEL_PATH
 
 router = APIRouter(
     prefix="/attendances",
@@ -83,8 +94,8 @@ def create_attendance_endpoint(
         if not schedule:
             raise HTTPException(status_code=404, detail="Schedule not found")
 
-        if not get_instructor_courses(
-            db, current_user.instructor_id, schedule.course_id
+        if not course_access.can_access(
+            db, current_user["user"].instructor_id, schedule.course_id
         ):
             raise HTTPException(
                 status_code=403,
@@ -124,8 +135,8 @@ def create_multiple_attendances_endpoint(
         if not schedule:
             raise HTTPException(status_code=404, detail="Schedule not found")
 
-        if not get_instructor_courses(
-            db, current_user.instructor_id, schedule.course_id
+        if not course_access.can_access(
+            db, current_user["user"].instructor_id, schedule.course_id
         ):
             raise HTTPException(
                 status_code=403,
@@ -145,51 +156,100 @@ def create_multiple_attendances_endpoint(
     return db_attendances
 
 
-@router.post("/{attendance_id}/check-in", response_model=AttendanceRead)
-async def student_check_in_endpoint(
-    attendance_id: int,
-    location_data: str = Form(None),
-    face_verification_data: str = Form(None),
-    smile_detected: bool = Form(False),
-    image_captured_url: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    """
-    Process student check-in with face verification and location data.
-    Students can only check in to their own attendance records with face verification.
-    Admin and instructors can check in without verification for any student.
-    Requires image upload for face verification process.
-    """
-    user_type = getattr(current_user, "role", None)
-
+def _authorise_check_in(
+    db: Session, attendance_id: int, current_user, user_type: str
+) -> Attendance:
     attendance = get_attendance(db, attendance_id=attendance_id)
     if attendance is None:
         raise HTTPException(status_code=404, detail="Attendance record not found")
 
-    if hasattr(current_user, "student_id"):
+    if user_type == "student":
         if current_user.student_id != attendance.student_id:
             raise HTTPException(
                 status_code=403,
                 detail="You can only check in to your own attendance records",
             )
-    elif user_type not in ["ADMIN", "INSTRUCTOR"]:
+    elif user_type not in ["admin", "instructor"]:
         raise HTTPException(
             status_code=403, detail="Unauthorized to check in for this attendance"
         )
 
-    if hasattr(current_user, "instructor_id"):
+    if user_type == "instructor":
         schedule = attendance.schedule
         if not schedule:
             raise HTTPException(status_code=404, detail="Schedule not found")
 
-        if not get_instructor_courses(
+        if not course_access.can_access(
             db, current_user.instructor_id, schedule.course_id
         ):
             raise HTTPException(
                 status_code=403,
                 detail="You can only manage attendance for courses you are teaching",
             )
+    return attendance
+
+
+def _store_check_in(
+    ctx: CheckInContext, check_in_data: AttendanceCheckIn
+) -> Optional[Attendance]:
+    image_url = save_attendance_image(ctx)
+    return student_check_in(
+        db=ctx.db,
+        attendance_id=ctx.attendance.attendance_id,
+        check_in_data=check_in_data,
+        image_captured_url=image_url,
+        image_hash=(
+            format_hash(ctx.image_hash) if ctx.image_hash is not None else None
+        ),
+    )
+
+
+@router.post("/{attendance_id}/check-in", response_model=AttendanceRead)
+async def student_check_in_endpoint(
+    attendance_id: int,
+    location_data: str = Form(None),
+    face_verification_data: str = Form(None),
+    smile_detected: bool = Form(False),
+    image_captured_url: UploadFile = File(None),
+    face_crop: UploadFile = File(None),
+    face_box: str = Form(None),
+    burst_frames: List[UploadFile] = File(None),
+    db: Session = Depends(get_db),
+    current_user_data=Depends(get_current_user_data),
+):
+    """
+    Process student check-in with face verification and location data.
+    Students can only check in to their own attendance records with face verification.
+    Admin and instructors can check in without verification for any student.
+    Runs the staged check-in pipeline: cheap disqualifiers (already checked in,
+    time window, geofence, upload size) run before decoding and face inference.
+    Photos that look like an earlier check-in photo are flagged as replays in
+    face_verification_data.
+
+    Clients that already detect the face may send `face_crop` (a pre-cropped face
+    of at most 512 KB) with `face_box` ([x, y, width, height] in the full frame)
+    instead of the full photo; the server then skips full-frame decoding and
+    face detection. `image_captured_url` remains the full-frame fallback. When
+    both are sent, a sample of check-ins is verified from the full frame and the
+    crop is compared with the face detected in it; mismatches are flagged in
+    face_verification_data.
+
+    Clients may instead send up to 5 frames as `burst_frames`; each frame is
+    scored on sharpness, face size and frontalness and only the best two are
+    passed to the recogniser, in a single batched call.
+
+    For students, `smile_detected` is determined server-side on the detected
+    face; the submitted value is only recorded for comparison.
+
+    Database access, OpenCV work and the image write run in the threadpool,
+    never on the event loop.
+    """
+    current_user = current_user_data["user"]
+    user_type = current_user_data["user_type"]
+
+    attendance = await run_in_threadpool(
+        _authorise_check_in, db, attendance_id, current_user, user_type
+    )
 
     location_data_str = str(location_data) if location_data is not None else None
     face_verification_data_str = (
@@ -202,78 +262,42 @@ async def student_check_in_endpoint(
         smile_detected=smile_detected,
     )
 
-    if image_captured_url and image_captured_url.filename:
-        valid_content_types = ["image/jpeg", "image/png", "image/jpg"]
-        if image_captured_url.content_type not in valid_content_types:
-            raise HTTPException(
-                status_code=400,
-                detail="File must be an image (JPEG, PNG, or JPG)",
-            )
-    else:
-        raise HTTPException(
-            status_code=400,
-            detail="An image is required for face verification",
-        )
-
-    # Verify model file exists before proceeding
-    if not os.path.exists(MODEL_PATH):
-        raise HTTPException(
-            status_code=500,
-            detail=f"Face recognition model not found at {MODEL_PATH}. Please ensure the model file exists.",
-        )
-
-    if hasattr(current_user, "student_id"):
-        result = await student_check_in_with_verification(
-            db=db,
-            attendance_id=attendance_id,
-            check_in_data=check_in_data,
-            image_file=image_captured_url,
-            current_user=current_user,
-            model_path=MODEL_PATH,
-        )
-
-        if not result["success"]:
-            raise HTTPException(status_code=403, detail=result["message"])
-
-        return result["attendance"]
-
-    else:
-        image_url = None
-        if image_captured_url and image_captured_url.filename:
-            upload_dir = "uploads/attendance_images"
-            os.makedirs(upload_dir, exist_ok=True)
-
-            if attendance.image_captured_url:
-                old_file_path = attendance.image_captured_url.replace(
-                    "/uploads/", "uploads/"
-                )
-                if os.path.exists(old_file_path):
-                    os.remove(old_file_path)
-
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            file_extension = os.path.splitext(image_captured_url.filename)[1]
-            filename = f"attendance_{attendance_id}_{timestamp}{file_extension}"
-            file_path = os.path.join(upload_dir, filename)
-
-            content = await image_captured_url.read()
-            with open(file_path, "wb") as buffer:
-                buffer.write(content)
+    upload, mode = choose_check_in_upload(image_captured_url, face_crop, burst_frames)
+    ctx = CheckInContext(
+        db=db,
+        attendance=attendance,
+        current_user=current_user,
+        user_type=user_type,
+        check_in_data=check_in_data,
+        upload=upload,
+        model_path=MODEL_PATH,
+        mode=mode,
+        face_box=face_box,
+        face_crop=face_crop,
+        burst=burst_frames or [],
+    )
+    outcome = await CHECK_IN_PIPELINE.run(ctx)
+    if not outcome.accepted:
+        rejection = outcome.rejection
+        detail = rejection.message
+        if user_type == "student" and rejection.status_code == 403:
+            detail = f"Check-in denied: {rejection.message}"
+        raise HTTPException(status_code=rejection.status_code, detail=detail)
 
-            image_url = f"/uploads/attendance_images/{filename}"
+    if ctx.is_student:
+        check_in_data.face_verification_data = build_face_verification_data(ctx)
+        # The server-side result replaces the client's claim; the claim is kept
+        # in face_verification_data for comparison
+        check_in_data.smile_detected = check_in_data.face_verification_data[
+            "smile_detected"
+        ]
 
-        updated_attendance = student_check_in(
-            db=db,
-            attendance_id=attendance_id,
-            check_in_data=check_in_data,
-            image_captured_url=image_url,
-        )
+    updated_attendance = await run_in_threadpool(_store_check_in, ctx, check_in_data)
 
-        if updated_attendance is None:
-            raise HTTPException(
-                status_code=404, detail="Failed to update attendance record"
-            )
+    if updated_attendance is None:
+        raise HTTPException(status_code=404, detail="Failed to update attendance record")
 
-        return updated_attendance
+    return updated_attendance
 
 
 @router.get("/", response_model=List[AttendanceWithNestedData])
@@ -283,14 +307,19 @@ def read_attendances_endpoint(
     student_id: int = None,
     schedule_id: int = None,
     course_id: int = None,
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_admin_or_instructor),
 ):
     """
     Retrieve all attendance records with nested related data and filtering options.
     Supports pagination and filtering by student_id, schedule_id, or course_id.
+    `fields` limits the response (and the query) to the listed top-level fields.
+    The CRUD layer builds the items in the response model's shape, so they are
+    serialised directly without re-validation.
     Only accessible by admin and instructor users.
     """
+    selected = parse_fields(fields, AttendanceWithNestedData)
     attendances = get_attendances(
         db,
         skip=skip,
@@ -298,8 +327,85 @@ def read_attendances_endpoint(
         student_id=student_id,
         schedule_id=schedule_id,
         course_id=course_id,
+        fields=selected,
+    )
+    return TrustedJSONResponse(attendances)
+
+
+@router.get("/export")
+def export_attendances_endpoint(
+    export_format: Literal["csv", "ndjson", "parquet"] = Query("csv", alias="format"),
+    course_id: int = None,
+    schedule_id: int = None,
+    student_id: int = None,
+    date_from: date = None,
+    date_to: date = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_admin_or_instructor),
+):
+    """
+    Export attendance records as CSV, NDJSON or Parquet.
+    Rows are streamed from a database cursor in batches, so whole courses or
+    semesters (date_from/date_to on the schedule date) can be exported with
+    flat memory use. Declared before the /{attendance_id} route so it is not
+    shadowed by it.
+    Only accessible by admin and instructor users.
+    Instructors can only export attendance for courses they are teaching.
+    """
+    try:
+        check_export_format(export_format)
+    except ExportFormatUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    course_ids = None
+    if current_user["user_type"] == "instructor":
+        course_ids = course_access.course_ids(db, current_user["user"].instructor_id)
+        schedule = get_schedule(db, schedule_id) if schedule_id else None
+        if (course_id and course_id not in course_ids) or (
+            schedule is not None and schedule.course_id not in course_ids
+        ):
+            raise HTTPException(
+                status_code=403,
+                detail="You can only export attendance for courses you are teaching",
+            )
+
+    query = get_attendance_export_query(
+        course_id=course_id,
+        schedule_id=schedule_id,
+        student_id=student_id,
+        date_from=date_from,
+        date_to=date_to,
+        course_ids=course_ids,
+    )
+    return StreamingResponse(
+        stream_attendance_export(engine, query, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="attendances.{export_format}"'
+            )
+        },
     )
-    return attendances
+
+
+@router.get("/active-schedules", response_model=List[TodaySessionRead])
+def get_active_schedules_endpoint(
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Retrieve active schedules for the current authenticated student.
+    Only accessible by student users for their own active schedules.
+    Served from the precomputed daily timeline; declared before the
+    /{attendance_id} route so it is not shadowed by it.
+    """
+    if not hasattr(current_user, "student_id"):
+        raise HTTPException(
+            status_code=403, detail="Only students can view their active schedules"
+        )
+
+    active_schedules = get_active_student_schedule(db, current_user.student_id)
+    return active_schedules
 
 
 @router.get("/{attendance_id}", response_model=AttendanceRead)
@@ -337,6 +443,7 @@ def read_student_attendances_endpoint(
     schedule_id: int = None,
     skip: int = 0,
     limit: int = 100,
+    updated_since: datetime = None,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
@@ -345,6 +452,9 @@ def read_student_attendances_endpoint(
     Students can only view their own attendance records.
     Admin and instructors can view any student's attendance records.
     Supports filtering by schedule_id and pagination.
+    With `updated_since`, only records changed since then are returned; the
+    X-Sync-Timestamp response header is the value to send on the next sync,
+    and deletions are listed by GET /sync/deleted?entity=attendance.
     """
     is_admin = getattr(current_user, "role", None) in ["ADMIN", "INSTRUCTOR"]
     is_own_student = (
@@ -356,11 +466,19 @@ def read_student_attendances_endpoint(
             status_code=403, detail="You can only view your own attendance records"
         )
 
+    server_time = sync_timestamp()
     attendances = get_student_attendances(
-        db, student_id=student_id, schedule_id=schedule_id, skip=skip, limit=limit
+        db,
+        student_id=student_id,
+        schedule_id=schedule_id,
+        skip=skip,
+        limit=limit,
+        updated_since=updated_since,
     )
 
-    return attendances
+    return TrustedJSONResponse(
+        attendances, headers={SYNC_TIMESTAMP_HEADER: server_time.isoformat()}
+    )
 
 
 @router.patch("/{attendance_id}", response_model=AttendanceRead)
@@ -373,8 +491,21 @@ def update_attendance_endpoint(
     """
     Update an existing attendance record.
     Only admin and instructor users can update attendance records.
+    Instructors can only update attendance for courses they are teaching.
     Automatically adds updated timestamp and processes JSON fields.
     """
+    if current_user["user_type"] == "instructor":
+        existing = get_attendance(db, attendance_id=attendance_id)
+        if existing is None:
+            raise HTTPException(status_code=404, detail="Attendance not found")
+        if not course_access.can_access(
+            db, current_user["user"].instructor_id, existing.schedule.course_id
+        ):
+            raise HTTPException(
+                status_code=403,
+                detail="You can only manage attendance for courses you are teaching",
+            )
+
     attendance_dict = attendance.dict(exclude_unset=True)
     attendance_dict["updated_at"] = get_indonesia_time()
 
@@ -436,21 +567,3 @@ def delete_multiple_attendances_endpoint(
         "message": f"Successfully deleted {deleted_count} attendance records",
         "deleted_count": deleted_count,
 }
-
-
-@router.get("/active-schedules", response_model=List)
-def get_active_schedules_endpoint(
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    """
-    Retrieve active schedules for the current authenticated student.
-    Only accessible by student users for their own active schedules.
-    """
-    if not hasattr(current_user, "student_id"):
-        raise HTTPException(
-            status_code=403, detail="Only students can view their active schedules"
-        )
-
-    active_schedules = get_active_student_schedule(db, current_user.student_id)
-    return active_schedules
@@ -1,22 +1,37 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Request, Response, status, HTTPException
 from sqlmodel import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 
 from app.dependencies import (
     get_current_admin,
     get_current_admin_or_instructor,
     get_db,
-    get_instructor_courses,
     course_access_from_path,
 )
-from app.schemas.course import CourseCreate, CourseUpdate, CourseRead
+from app.schemas.course import (
+    CourseAttendanceMatrix,
+    CourseCreate,
+    CourseUpdate,
+    CourseRead,
+    CourseWithStatsRead,
+)
 from app.crud.course import (
     get_courses,
     get_course_by_id,
+    get_course_stats,
+    get_instructor_course_list,
     create_course,
     update_course,
     delete_course,
 )
+from app.crud.sync import SYNC_TIMESTAMP_HEADER, sync_timestamp
+from app.models.course import Course
+from app.models.instructor_course import InstructorCourse
+from app.services.attendance_matrix import build_attendance_matrix
+from app.services.response_cache import access_scope, response_cache
+from app.utils.conditional import check_not_modified
+from app.utils.responses import model_list_response
 
 
 router = APIRouter(
@@ -26,10 +41,14 @@ router = APIRouter(
 )
 
 
-@router.get("/", response_model=List[CourseRead])
+@router.get("/", response_model=List[CourseWithStatsRead])
 async def read_courses(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    include_stats: bool = False,
+    updated_since: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user_data=Depends(get_current_admin_or_instructor),
 ):
@@ -40,36 +59,83 @@ async def read_courses(
     - Admins can view all courses in the system
     - Instructors can only view courses they have been assigned to teach
 
+    The instructor filter is applied in the database, so skip and limit page
+    through the instructor's own courses.
+
+    Answers 304 Not Modified when If-None-Match holds the current ETag, and
+    serves repeated listings from the response cache until a course or an
+    assignment changes. Listings with include_stats depend on schedules and
+    enrolments as well and are neither tagged nor cached.
+
     Args:
+        request: Incoming request, used for the ETag and the cache key
+        response: Response used to set the X-Sync-Timestamp header
         skip: Number of records to skip for pagination (default: 0)
         limit: Maximum number of records to return (default: 100)
+        include_stats: Add session_count and enrolled_count to each course
+        updated_since: Only return courses changed since this time; send the
+            previous response's X-Sync-Timestamp header
         db: Database session dependency
         current_user_data: Current authenticated user data with role information
 
     Returns:
-        List[CourseRead]: List of courses accessible to the current user
+        List[CourseWithStatsRead]: List of courses accessible to the current user
 
     Access Level: ADMIN | INSTRUCTOR
     """
     user = current_user_data["user"]
     user_type = current_user_data["user_type"]
 
-    if user_type == "admin":
-        return get_courses(db, skip=skip, limit=limit)
-
-    elif user_type == "instructor":
-        accessible_course_ids = await get_instructor_courses(user.instructor_id, db)
-        all_courses = get_courses(db, skip=skip, limit=limit)
-        instructor_courses = [
-            course
-            for course in all_courses
-            if course.course_id in accessible_course_ids
-        ]
-        return instructor_courses
+    def load_courses():
+        if user_type == "admin":
+            return get_courses(
+                db, skip=skip, limit=limit, updated_since=updated_since
+            )
+        return get_instructor_course_list(
+            db,
+            user.instructor_id,
+            skip=skip,
+            limit=limit,
+            updated_since=updated_since,
+        )
+
+    if not include_stats:
+        etag = check_not_modified(request, Course, InstructorCourse)
+
+        def build():
+            server_time = sync_timestamp()
+            return model_list_response(
+                load_courses(),
+                CourseWithStatsRead,
+                headers={SYNC_TIMESTAMP_HEADER: server_time.isoformat()},
+            )
+
+        # The build runs in the threadpool, so identical concurrent listings
+        # can share it instead of queueing on the event loop
+        result = await response_cache.afetch(
+            request,
+            access_scope(current_user_data),
+            (Course, InstructorCourse),
+            build,
+        )
+        result.headers["ETag"] = etag
+        return result
+
+    response.headers[SYNC_TIMESTAMP_HEADER] = sync_timestamp().isoformat()
+    courses = load_courses()
+    stats = get_course_stats(db, [course.course_id for course in courses])
+    return [
+        CourseWithStatsRead.model_validate(course).model_copy(
+            update=stats[course.course_id]
+        )
+        for course in courses
+    ]
 
 
 @router.get("/{course_id}", response_model=CourseRead)
 async def read_course(
+    request: Request,
+    response: Response,
     course_id: int,
     db: Session = Depends(get_db),
     current_user=Depends(course_access_from_path()),
@@ -82,6 +148,8 @@ async def read_course(
     been assigned to teach the course.
 
     Args:
+        request: Incoming request, used for the ETag
+        response: Response used to set the ETag header
         course_id: Unique identifier of the course to retrieve
         db: Database session dependency
         current_user: Current authenticated user with course access validation
@@ -90,16 +158,50 @@ async def read_course(
         CourseRead: Detailed course information
 
     Raises:
+        HTTPException: 304 if If-None-Match holds the current ETag
         HTTPException: 404 if course is not found
 
     Access Level: ADMIN | INSTRUCTOR (with course access)
     """
+    response.headers["ETag"] = check_not_modified(request, Course)
     course = get_course_by_id(db, course_id=course_id)
     if course is None:
         raise HTTPException(status_code=404, detail="Course not found")
     return course
 
 
+@router.get("/{course_id}/attendance-matrix", response_model=CourseAttendanceMatrix)
+async def read_course_attendance_matrix(
+    course_id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(course_access_from_path()),
+):
+    """
+    Retrieve the students × sessions attendance grid of a course.
+
+    Each student is one string with a single-character status code per
+    session, in the order of the sessions header, which keeps the grid of a
+    full semester compact (500 students × 32 sessions is about 16 KB of
+    codes).
+
+    Args:
+        course_id: Unique identifier of the course
+        db: Database session dependency
+        current_user: Current authenticated user with course access validation
+
+    Returns:
+        CourseAttendanceMatrix: Status legend, student and session headers
+        and one row of status codes per student
+
+    Raises:
+        HTTPException: 404 if course is not found
+
+    Access Level: ADMIN | INSTRUCTOR (with course access)
+    """
+    get_course_by_id(db, course_id=course_id)
+    return build_attendance_matrix(db, course_id)
+
+
 @router.post("/", response_model=CourseRead, status_code=status.HTTP_201_CREATED)
 def create_course_endpoint(
     course: CourseCreate,
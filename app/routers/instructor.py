@@ -1,8 +1,8 @@
 import os
 from datetime import datetime
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
 from sqlmodel import Session
-from typing import List
+from typing import List, Optional
 
 from app.dependencies import (
     get_current_user_data,
@@ -26,6 +26,11 @@ from app.crud.instructor import (
     update_instructor,
     delete_instructor,
 )
+from app.models.instructor import Instructor
+from app.services.response_cache import access_scope, response_cache
+from app.services.table_versions import table_versions
+from app.utils.fieldsets import FIELDS_QUERY, fieldset_response, parse_fields
+from app.utils.responses import model_list_response
 from app.utils.time_utils import get_indonesia_time
 
 
@@ -71,8 +76,10 @@ def create_instructor_endpoint(
 
 @router.get("/", response_model=List[InstructorRead])
 def read_instructors_endpoint(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_admin_or_instructor),
 ):
@@ -83,9 +90,14 @@ def read_instructors_endpoint(
     - Admins can view all instructors in the system
     - Instructors can only view their own profile information
 
+    Repeated listings are served from the response cache until an instructor
+    changes.
+
     Args:
+        request: Incoming request, used for the cache key
         skip: Number of records to skip for pagination (default: 0)
         limit: Maximum number of records to return (default: 100)
+        fields: Comma-separated fields to return (default: all)
         db: Database session dependency
         current_user: Current authenticated user with role information
 
@@ -94,15 +106,25 @@ def read_instructors_endpoint(
 
     Access Level: ADMIN | INSTRUCTOR
     """
+    selected = parse_fields(fields, InstructorRead)
     user = current_user["user"]
     user_type = current_user["user_type"]
 
-    if user_type == "admin":
-        instructors = get_instructors(db, skip=skip, limit=limit)
-    else:
-        instructors = [get_instructor(db, instructor_id=user.instructor_id)]
+    def build():
+        if user_type == "admin":
+            instructors = get_instructors(
+                db, skip=skip, limit=limit, fields=selected
+            )
+        else:
+            instructors = [get_instructor(db, instructor_id=user.instructor_id)]
+
+        if selected is not None:
+            return fieldset_response(instructors, InstructorRead, selected)
+        return model_list_response(instructors, InstructorRead)
 
-    return instructors
+    return response_cache.fetch(
+        request, access_scope(current_user), (Instructor,), build
+    )
 
 
 @router.get("/{instructor_id}", response_model=InstructorRead)
@@ -321,6 +343,7 @@ async def upload_instructor_profile_picture_endpoint(
     db.add(db_instructor)
     db.commit()
     db.refresh(db_instructor)
+    table_versions.bump(Instructor)
 
     return db_instructor
 
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+
+from app.dependencies import get_current_student, get_db
+from app.schemas.timeline import StudentTodayRead
+from app.services.timeline_service import today_timeline
+
+# HAK AKSES: STUDENT
+router = APIRouter(
+    prefix="/me",
+    tags=["me"],
+)
+
+
+@router.get("/today", response_model=StudentTodayRead)
+def read_my_today_endpoint(
+    db: Session = Depends(get_db),
+    current_student=Depends(get_current_student),
+):
+    """
+    Retrieve today's sessions for the authenticated student.
+
+    Served from the precomputed per-day timeline, so polling this endpoint
+    does not query the database once the timeline has been built. Each session
+    carries its attendance state and whether it is currently in progress.
+
+    Args:
+        db: Database session dependency (only used to rebuild the timeline)
+        current_student: Authenticated student
+
+    Returns:
+        StudentTodayRead: Today's sessions with the active and next schedule IDs
+
+    Access Level: STUDENT
+    """
+    return today_timeline.get_student_day(db, current_student.student_id)
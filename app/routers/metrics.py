@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+
+from app.dependencies import get_current_admin
+from app.services.metrics import metrics
+
+# HAK AKSES: ADMIN
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+)
+
+
+@router.get("/")
+def read_metrics_endpoint(current_admin=Depends(get_current_admin)):
+    """
+    Retrieve in-process counters and stage timings.
+
+    Includes the check-in pipeline's per-stage timings and its rejection-reason
+    breakdown, and the face verification cache's hit, miss, expiration and
+    eviction counters. Values are collected per worker process since its start.
+
+    Args:
+        current_admin: Current authenticated admin user
+
+    Returns:
+        dict: Counters and timing summaries keyed by metric name
+
+    Access Level: ADMIN only
+    """
+    return metrics.snapshot()
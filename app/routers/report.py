@@ -0,0 +1,175 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import Session
+
+from app.crud.attendance_summary import (
+    get_course_session_summaries,
+    get_course_student_summaries,
+    get_student_summaries,
+    get_student_summary,
+)
+from app.dependencies import (
+    course_access_from_path,
+    get_current_user_data,
+    get_db,
+)
+from app.schemas.report import (
+    SessionAttendanceSummaryRead,
+    StudentAttendanceSummaryRead,
+)
+from app.services.course_access import course_access
+
+# HAK AKSES: ADMIN | INSTRUCTOR
+# - Student hanya dapat melihat ringkasan kehadirannya sendiri
+router = APIRouter(
+    prefix="/reports",
+    tags=["reports"],
+)
+
+
+def _ensure_own_student(current_user_data, student_id: int) -> None:
+    if (
+        current_user_data["user_type"] == "student"
+        and current_user_data["user"].student_id != student_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only view your own attendance summary",
+        )
+
+
+def _ensure_course_access(db: Session, current_user_data, course_id: int) -> None:
+    if current_user_data["user_type"] == "instructor" and not course_access.can_access(
+        db, current_user_data["user"].instructor_id, course_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"You don't have access to course with ID {course_id}",
+        )
+
+
+@router.get(
+    "/courses/{course_id}/students",
+    response_model=List[StudentAttendanceSummaryRead],
+)
+def read_course_student_summaries_endpoint(
+    course_id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(course_access_from_path()),
+):
+    """
+    Retrieve attendance counts and rate for every student of a course.
+
+    Read from the summary table maintained alongside check-ins, so the cost
+    does not depend on how many sessions the course has had.
+
+    Args:
+        course_id: Course to report on
+        db: Database session dependency
+        current_user: Current authenticated user with course access validation
+
+    Returns:
+        List[StudentAttendanceSummaryRead]: One entry per student with attendance
+
+    Access Level: ADMIN | INSTRUCTOR (with course access)
+    """
+    return get_course_student_summaries(db, course_id)
+
+
+@router.get(
+    "/courses/{course_id}/students/{student_id}",
+    response_model=StudentAttendanceSummaryRead,
+)
+def read_student_summary_endpoint(
+    course_id: int,
+    student_id: int,
+    db: Session = Depends(get_db),
+    current_user_data=Depends(get_current_user_data),
+):
+    """
+    Retrieve one student's attendance counts and rate in a course.
+
+    Args:
+        course_id: Course to report on
+        student_id: Student to report on
+        db: Database session dependency
+        current_user_data: Authenticated user with role information
+
+    Returns:
+        StudentAttendanceSummaryRead: The student's counts in the course
+
+    Raises:
+        HTTPException: 403 if a student requests another student's summary or
+            an instructor a course they do not teach, 404 if the student has
+            no attendance in the course
+
+    Access Level: ADMIN | INSTRUCTOR (with course access) | STUDENT (own summary)
+    """
+    _ensure_own_student(current_user_data, student_id)
+    _ensure_course_access(db, current_user_data, course_id)
+    summary = get_student_summary(db, course_id, student_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Attendance summary not found")
+    return summary
+
+
+@router.get(
+    "/courses/{course_id}/sessions",
+    response_model=List[SessionAttendanceSummaryRead],
+)
+def read_course_session_summaries_endpoint(
+    course_id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(course_access_from_path()),
+):
+    """
+    Retrieve attendance totals for every session (schedule) of a course.
+
+    Args:
+        course_id: Course to report on
+        db: Database session dependency
+        current_user: Current authenticated user with course access validation
+
+    Returns:
+        List[SessionAttendanceSummaryRead]: One entry per session with attendance
+
+    Access Level: ADMIN | INSTRUCTOR (with course access)
+    """
+    return get_course_session_summaries(db, course_id)
+
+
+@router.get(
+    "/students/{student_id}",
+    response_model=List[StudentAttendanceSummaryRead],
+)
+def read_student_summaries_endpoint(
+    student_id: int,
+    db: Session = Depends(get_db),
+    current_user_data=Depends(get_current_user_data),
+):
+    """
+    Retrieve a student's attendance counts and rate in each of their courses.
+
+    Args:
+        student_id: Student to report on
+        db: Database session dependency
+        current_user_data: Authenticated user with role information
+
+    Returns:
+        List[StudentAttendanceSummaryRead]: One entry per course; for
+            instructors only the courses they teach
+
+    Raises:
+        HTTPException: 403 if a student requests another student's summaries
+
+    Access Level: ADMIN | INSTRUCTOR (courses they teach) | STUDENT (own summaries)
+    """
+    _ensure_own_student(current_user_data, student_id)
+    summaries = get_student_summaries(db, student_id)
+    if current_user_data["user_type"] == "instructor":
+        course_ids = course_access.course_ids(
+            db, current_user_data["user"].instructor_id
+        )
+        summaries = [s for s in summaries if s.course_id in course_ids]
+    return summaries
@@ -1,10 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlmodel import Session
 from typing import List, Optional
+from datetime import datetime
 
 from app.dependencies import get_db, get_current_admin
-from app.schemas.room import RoomCreate, RoomResponse, RoomUpdate
+from app.schemas.room import (
+    NearestRoomResponse,
+    RoomCreate,
+    RoomResponse,
+    RoomUpdate,
+)
 from app.crud.room import create_room, get_rooms, get_room, update_room, delete_room
+from app.crud.sync import SYNC_TIMESTAMP_HEADER, sync_timestamp
+from app.models.room import Room
+from app.services.geofence_service import room_index
+from app.services.response_cache import response_cache
+from app.utils.conditional import check_not_modified
+from app.utils.responses import model_list_response
 
 
 router = APIRouter(
@@ -42,9 +54,11 @@ def create_room_endpoint(
 
 @router.get("/", response_model=List[RoomResponse])
 def read_rooms_endpoint(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     name: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
     db: Session = Depends(get_db),
 ):
     """
@@ -54,10 +68,16 @@ def read_rooms_endpoint(
     It supports filtering by room name and pagination for large datasets.
     Useful for room selection during scheduling or reservation processes.
 
+    Answers 304 Not Modified when If-None-Match holds the current ETag, and
+    serves repeated listings from the response cache until a room changes.
+
     Args:
+        request: Incoming request, used for the ETag and the cache key
         skip: Number of records to skip for pagination (default: 0)
         limit: Maximum number of records to return (default: 100)
         name: Optional filter to search rooms by name
+        updated_since: Only return rooms changed since this time; send the
+            previous response's X-Sync-Timestamp header
         db: Database session dependency
 
     Returns:
@@ -65,12 +85,66 @@ def read_rooms_endpoint(
 
     Access Level: PUBLIC
     """
-    rooms = get_rooms(db, skip=skip, limit=limit, name=name)
-    return rooms
+    etag = check_not_modified(request, Room)
+
+    def build():
+        server_time = sync_timestamp()
+        rooms = get_rooms(
+            db, skip=skip, limit=limit, name=name, updated_since=updated_since
+        )
+        return model_list_response(
+            rooms,
+            RoomResponse,
+            headers={SYNC_TIMESTAMP_HEADER: server_time.isoformat()},
+        )
+
+    response = response_cache.fetch(request, "public", (Room,), build)
+    response.headers["ETag"] = etag
+    return response
+
+
+@router.get("/nearest", response_model=NearestRoomResponse)
+def read_nearest_room_endpoint(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    db: Session = Depends(get_db),
+):
+    """
+    Find the room closest to a geographic point.
+
+    Uses the in-memory spatial grid over all rooms, so only rooms in the cells
+    around the point are measured. Useful for suggesting the room a user is
+    standing in and for diagnosing rejected geofence check-ins.
+
+    Args:
+        latitude: Latitude of the query point in degrees
+        longitude: Longitude of the query point in degrees
+        db: Database session dependency
+
+    Returns:
+        NearestRoomResponse: Closest room with its distance from the point
+
+    Raises:
+        HTTPException: 404 if no rooms exist
+
+    Access Level: PUBLIC
+    """
+    result = room_index.nearest(db, latitude, longitude)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No rooms found")
+
+    room, distance = result
+    return {
+        **room,
+        "distance_m": round(distance, 2),
+        "within_radius": distance <= room["radius"],
+    }
 
 
 @router.get("/{room_id}", response_model=RoomResponse)
 def read_room_endpoint(
+    request: Request,
+    response: Response,
     room_id: int,
     db: Session = Depends(get_db),
 ):
@@ -82,6 +156,8 @@ def read_room_endpoint(
     users who need to verify room specifications before making reservations.
 
     Args:
+        request: Incoming request, used for the ETag
+        response: Response used to set the ETag header
         room_id: Unique identifier of the room to retrieve
         db: Database session dependency
 
@@ -89,10 +165,12 @@ def read_room_endpoint(
         RoomResponse: Detailed room information and specifications
 
     Raises:
+        HTTPException: 304 if If-None-Match holds the current ETag
         HTTPException: 404 if room is not found (handled by CRUD layer)
 
     Access Level: PUBLIC
     """
+    response.headers["ETag"] = check_not_modified(request, Room)
     room = get_room(db, room_id=room_id)
     return room
 
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
 
-from app.dependencies import get_db, get_current_admin_or_instructor
+from app.dependencies import engine, get_db, get_current_admin_or_instructor
 from app.schemas.schedule import ScheduleCreate, ScheduleRead, ScheduleUpdate
 from app.crud.schedule import (
     create_schedule,
@@ -13,6 +14,17 @@ from app.crud.schedule import (
     delete_schedule,
     check_schedule_conflict,
 )
+from app.crud.sync import SYNC_TIMESTAMP_HEADER, sync_timestamp
+from app.models.course import Course
+from app.models.instructor import Instructor
+from app.models.room import Room
+from app.models.schedule import Schedule
+from app.services.course_access import course_access
+from app.services.live_feed import live_feed, load_live_snapshot
+from app.services.response_cache import access_scope, response_cache
+from app.utils.conditional import check_not_modified
+from app.utils.fieldsets import FIELDS_QUERY, parse_fields
+from app.utils.responses import TrustedJSONResponse
 
 # Access Control: ADMIN | INSTRUCTOR
 # - Instructor can only manage their own schedules
@@ -24,6 +36,9 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Tables a schedule response is built from, including its nested relations
+SCHEDULE_MODELS = (Schedule, Course, Instructor, Room)
+
 
 @router.post("/", response_model=ScheduleRead, status_code=status.HTTP_201_CREATED)
 def create_schedule_endpoint(
@@ -80,12 +95,15 @@ def create_schedule_endpoint(
 
 @router.get("/", response_model=List[ScheduleRead])
 def read_schedules_endpoint(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     course_id: Optional[int] = None,
     instructor_id: Optional[int] = None,
     room_id: Optional[int] = None,
     schedule_date: Optional[date] = None,
+    fields: Optional[str] = FIELDS_QUERY,
+    updated_since: Optional[datetime] = None,
     db: Session = Depends(get_db),
     user_data=Depends(get_current_admin_or_instructor),
 ):
@@ -95,14 +113,21 @@ def read_schedules_endpoint(
     This endpoint provides filtered access to schedule data based on user role.
     Instructors can only view their own schedules, while admins can view all
     schedules. Multiple filters can be applied simultaneously for refined results.
+    Answers 304 Not Modified when If-None-Match holds the current ETag, and
+    serves repeated listings from the response cache until a schedule or one
+    of its relations changes.
 
     Args:
+        request: Incoming request, used for the ETag and the cache key
         skip: Number of records to skip for pagination
         limit: Maximum number of records to return
         course_id: Filter by specific course ID
         instructor_id: Filter by specific instructor ID
         room_id: Filter by specific room ID
         schedule_date: Filter by specific date
+        fields: Comma-separated top-level fields to return (default: all)
+        updated_since: Only return schedules changed since this time; send the
+            previous response's X-Sync-Timestamp header
         db: Database session dependency
         user_data: Current authenticated user information
 
@@ -110,8 +135,10 @@ def read_schedules_endpoint(
         List[ScheduleRead]: List of schedules matching the criteria
 
     Raises:
+        HTTPException: 304 if If-None-Match holds the current ETag
         HTTPException: 403 if instructor tries to access other instructor's schedules
     """
+    selected = parse_fields(fields, ScheduleRead)
     user = user_data["user"]
     user_type = user_data["user_type"]
 
@@ -126,20 +153,38 @@ def read_schedules_endpoint(
         # Force filter to show only instructor's own schedules
         instructor_id = user.instructor_id
 
-    schedules = get_schedules(
-        db,
-        skip=skip,
-        limit=limit,
-        course_id=course_id,
-        instructor_id=instructor_id,
-        room_id=room_id,
-        schedule_date=schedule_date,
+    etag = check_not_modified(request, *SCHEDULE_MODELS)
+
+    def build():
+        server_time = sync_timestamp()
+        schedules = get_schedules(
+            db,
+            skip=skip,
+            limit=limit,
+            course_id=course_id,
+            instructor_id=instructor_id,
+            room_id=room_id,
+            schedule_date=schedule_date,
+            fields=selected,
+            updated_since=updated_since,
+        )
+        # get_schedules builds items in ScheduleRead's shape, so skip
+        # re-validation
+        return TrustedJSONResponse(
+            schedules, headers={SYNC_TIMESTAMP_HEADER: server_time.isoformat()}
+        )
+
+    response = response_cache.fetch(
+        request, access_scope(user_data), SCHEDULE_MODELS, build
     )
-    return schedules
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.get("/{schedule_id}", response_model=ScheduleRead)
 def read_schedule_endpoint(
+    request: Request,
+    response: Response,
     schedule_id: int,
     db: Session = Depends(get_db),
     user_data=Depends(get_current_admin_or_instructor),
@@ -152,6 +197,8 @@ def read_schedule_endpoint(
     while admins have unrestricted access to all schedule records.
 
     Args:
+        request: Incoming request, used for the ETag
+        response: Response used to set the ETag header
         schedule_id: Unique identifier of the schedule to retrieve
         db: Database session dependency
         user_data: Current authenticated user information
@@ -160,9 +207,13 @@ def read_schedule_endpoint(
         ScheduleRead: Complete schedule information
 
     Raises:
+        HTTPException: 304 if If-None-Match holds the current ETag
         HTTPException: 404 if schedule not found
         HTTPException: 403 if instructor tries to access other instructor's schedule
     """
+    # The tag is scoped to the caller's credentials and changes whenever the
+    # schedule is reassigned, so it is safe to answer before the access check
+    response.headers["ETag"] = check_not_modified(request, *SCHEDULE_MODELS)
     schedule = get_schedule(db, schedule_id=schedule_id)
     if schedule is None:
         raise HTTPException(status_code=404, detail="Schedule not found")
@@ -180,6 +231,64 @@ def read_schedule_endpoint(
     return schedule
 
 
+@router.get("/{schedule_id}/live")
+def live_schedule_attendance_endpoint(
+    schedule_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    user_data=Depends(get_current_admin_or_instructor),
+):
+    """
+    Stream check-ins of a schedule as server-sent events.
+
+    The stream opens with a `snapshot` event listing the schedule's current
+    attendance, followed by an `attendance` event (attendance_id, student_id,
+    status, check_in_time, smile_detected) for every check-in or update, so
+    one connection replaces polling GET /attendances/?schedule_id=. Idle
+    streams receive a keep-alive comment every 15 seconds.
+
+    Args:
+        schedule_id: Unique identifier of the schedule to follow
+        request: Incoming request, used to detect client disconnects
+        db: Database session dependency
+        user_data: Current authenticated user information
+
+    Returns:
+        StreamingResponse: text/event-stream of attendance events
+
+    Raises:
+        HTTPException: 404 if schedule not found
+        HTTPException: 403 if instructor neither owns the schedule nor
+            teaches its course
+
+    Access Level: ADMIN | INSTRUCTOR (own schedules or course access)
+    """
+    schedule = get_schedule(db, schedule_id=schedule_id)
+    if schedule is None:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    user = user_data["user"]
+    if (
+        user_data["user_type"] == "instructor"
+        and schedule.instructor_id != user.instructor_id
+        and not course_access.can_access(db, user.instructor_id, schedule.course_id)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only follow schedules of courses you are teaching",
+        )
+
+    return StreamingResponse(
+        live_feed.stream(
+            schedule_id,
+            lambda: load_live_snapshot(engine, schedule_id),
+            request.is_disconnected,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.patch("/{schedule_id}", response_model=ScheduleRead)
 def update_schedule_endpoint(
     schedule_id: int,
@@ -1,20 +1,47 @@
-import json
+import io
 import os
+import zipfile
 from datetime import datetime
-from typing import List, Dict, Any
-
-from fastapi import APIRouter, Depends, HTTPException, Body, UploadFile, File, status
+from typing import List, Dict, Any, Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Body,
+    UploadFile,
+    File,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 
 from app.dependencies import (
+    engine,
     get_current_admin,
     get_current_admin_or_instructor,
     get_current_user_data,
     get_db,
     get_current_user,
 )
-from app.schemas.student import StudentCreate, StudentRead, StudentUpdate
+from app.schemas.enrollment import EnrollmentJobRead
+from app.schemas.student import (
+    StudentCreate,
+    StudentListRead,
+    StudentRead,
+    StudentUpdate,
+)
 import app.crud.student as crud
+from app.services.enrollment_service import (
+    MAX_ARCHIVE_BYTES,
+    MAX_PHOTO_BYTES,
+    MAX_PHOTOS_PER_STUDENT,
+    enrollment_service,
+    group_archive_photos,
+)
+from app.services.face_verification_service import DEFAULT_MODEL_PATH
+from app.utils.fieldsets import FIELDS_QUERY, fieldset_response, parse_fields
 from app.utils.time_utils import get_indonesia_time
 
 # Router configuration with access control information
@@ -65,10 +92,11 @@ def create_student_endpoint(
     return crud.create_student(db=db, student=student)
 
 
-@router.get("/", response_model=List[StudentRead])
+@router.get("/", response_model=List[StudentListRead])
 def read_students_endpoint(
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db),
     current_instructor=Depends(get_current_admin_or_instructor),
 ):
@@ -76,18 +104,23 @@ def read_students_endpoint(
     Retrieve a paginated list of all students.
 
     Requires admin or instructor authentication. Supports pagination through
-    skip and limit parameters for efficient data retrieval.
+    skip and limit parameters for efficient data retrieval. Face data is not
+    included in listings; fetch a single student to read it.
 
     Args:
         skip: Number of records to skip (default: 0)
         limit: Maximum number of records to return (default: 100)
+        fields: Comma-separated fields to return (default: all)
         db: Database session dependency
         current_instructor: Authentication dependency for admin/instructor access
 
     Returns:
-        List[StudentRead]: List of student records
+        List[StudentListRead]: List of student records
     """
-    students = crud.get_students(db, skip=skip, limit=limit)
+    selected = parse_fields(fields, StudentListRead)
+    students = crud.get_students(db, skip=skip, limit=limit, fields=selected)
+    if selected is not None:
+        return fieldset_response(students, StudentListRead, selected)
     return students
 
 
@@ -280,13 +313,6 @@ async def upload_profile_picture_endpoint(
     db.commit()
     db.refresh(db_student)
 
-    # Parse face_data JSON for response if exists
-    if db_student.face_data:
-        try:
-            db_student.face_data = json.loads(db_student.face_data)
-        except json.JSONDecodeError:
-            db_student.face_data = None
-
     return db_student
 
 
@@ -453,3 +479,172 @@ def read_student_by_username_endpoint(
     if student is None:
         raise HTTPException(status_code=404, detail="Student not found")
     return student
+
+
+@router.post(
+    "/face/enroll-batch",
+    response_model=EnrollmentJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def enroll_class_faces_endpoint(
+    background_tasks: BackgroundTasks,
+    archive: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_admin),
+):
+    """
+    Enroll the faces of a whole class from a zip archive of photos.
+
+    Photos are matched to students by NIM, either from a folder per student
+    (`{nim}/photo.jpg`) or from a filename prefix (`{nim}_photo.jpg`). Faces are
+    detected, cropped and embedded in a background process pool; poll
+    `GET /students/face/enroll/{job_id}` for progress.
+
+    Args:
+        background_tasks: FastAPI background task runner
+        archive: Zip archive containing the photos
+        db: Database session dependency
+        current_user: Admin user authentication dependency
+
+    Returns:
+        EnrollmentJobRead: The queued enrollment job
+
+    Raises:
+        HTTPException: 400 if the archive is invalid or matches no student,
+                       413 if it is too large
+
+    Access Level: ADMIN only
+    """
+    content = await archive.read(MAX_ARCHIVE_BYTES + 1)
+    if len(content) > MAX_ARCHIVE_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Archive must be at most {MAX_ARCHIVE_BYTES // (1024 * 1024)} MB",
+        )
+
+    try:
+        photos_by_student, unknown_nims = await run_in_threadpool(
+            group_archive_photos, db, io.BytesIO(content)
+        )
+    except zipfile.BadZipFile:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="File must be a zip archive"
+        )
+
+    if not photos_by_student:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No photos in the archive match a registered student NIM",
+        )
+
+    job = enrollment_service.create_job(photos_by_student, unknown_nims)
+    background_tasks.add_task(
+        enrollment_service.run_job, job, photos_by_student, DEFAULT_MODEL_PATH, engine
+    )
+    return job.to_dict()
+
+
+@router.get("/face/enroll/{job_id}", response_model=EnrollmentJobRead)
+def read_enrollment_job_endpoint(
+    job_id: str,
+    current_user_data=Depends(get_current_user_data),
+):
+    """
+    Poll the progress of a face enrollment job.
+
+    Args:
+        job_id: ID returned when the enrollment was submitted
+        current_user_data: Current user information for authorization
+
+    Returns:
+        EnrollmentJobRead: Current job status and progress counters
+
+    Raises:
+        HTTPException: 404 if the job is unknown or not visible to the user
+
+    Access Level: ADMIN | STUDENT (own enrollment only)
+    """
+    job = enrollment_service.get_job(job_id)
+    user = current_user_data["user"]
+    user_type = current_user_data["user_type"]
+
+    is_visible = job is not None and (
+        user_type == "admin"
+        or (user_type == "student" and job.student_ids == [user.student_id])
+    )
+    if not is_visible:
+        raise HTTPException(status_code=404, detail="Enrollment job not found")
+    return job.to_dict()
+
+
+@router.post(
+    "/{student_id}/face/enroll",
+    response_model=EnrollmentJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def enroll_student_face_endpoint(
+    student_id: int,
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+    current_user_data=Depends(get_current_user_data),
+):
+    """
+    Enroll a student's face from several photos.
+
+    Each photo is face-detected, cropped and embedded in a background process
+    pool, and the embeddings are averaged into a compact template stored with
+    the student. Poll `GET /students/face/enroll/{job_id}` for progress.
+
+    Args:
+        student_id: ID of the student to enroll
+        background_tasks: FastAPI background task runner
+        files: Photos of the student's face (JPEG or PNG, up to 10 are used)
+        db: Database session dependency
+        current_user_data: Current user information for authorization
+
+    Returns:
+        EnrollmentJobRead: The queued enrollment job
+
+    Raises:
+        HTTPException: 403 if unauthorized, 404 if student not found,
+                       400 if a file is not an image, 413 if a photo is too large
+
+    Access Level: ADMIN | STUDENT (own record only)
+    """
+    user = current_user_data["user"]
+    user_type = current_user_data["user_type"]
+
+    is_admin = user_type == "admin"
+    is_same_student = user_type == "student" and user.student_id == student_id
+    if not is_admin and not is_same_student:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only enroll your own face or you need admin privileges",
+        )
+
+    if crud.get_student(db, student_id=student_id) is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    photos = []
+    for file in files[:MAX_PHOTOS_PER_STUDENT]:
+        if file.content_type not in ["image/jpeg", "image/png", "image/jpg"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File must be an image (JPEG, PNG, or JPG)",
+            )
+        content = await file.read(MAX_PHOTO_BYTES + 1)
+        if len(content) > MAX_PHOTO_BYTES:
+            limit = MAX_PHOTO_BYTES // (1024 * 1024)
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Each photo must be at most {limit} MB",
+            )
+        photos.append(content)
+
+    photos_by_student = {student_id: photos}
+    job = enrollment_service.create_job(photos_by_student)
+    background_tasks.add_task(
+        enrollment_service.run_job, job, photos_by_student, DEFAULT_MODEL_PATH, engine
+    )
+    return job.to_dict()
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Response
+from sqlmodel import Session
+
+from app.crud.sync import SYNC_TIMESTAMP_HEADER, get_tombstones, sync_timestamp
+from app.dependencies import get_current_user, get_db
+from app.schemas.sync import TombstoneRead
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["sync"],
+)
+
+
+@router.get("/deleted", response_model=List[TombstoneRead])
+def read_deleted_endpoint(
+    response: Response,
+    entity: Literal["attendance", "schedule", "course", "room"],
+    updated_since: Optional[datetime] = None,
+    skip: int = 0,
+    limit: int = 1000,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Retrieve rows of an entity deleted since the last sync.
+
+    Delta-syncing clients call this next to the list endpoint of the same
+    entity with the same updated_since, and drop the returned IDs from their
+    local copy.
+
+    Args:
+        response: Response used to set the X-Sync-Timestamp header
+        entity: Entity whose deletions to list
+        updated_since: Only return deletions since this time
+        skip: Number of records to skip for pagination (default: 0)
+        limit: Maximum number of records to return (default: 1000)
+        db: Database session dependency
+        current_user: Current authenticated user
+
+    Returns:
+        List[TombstoneRead]: Deleted entity IDs, oldest deletion first
+
+    Access Level: ADMIN | INSTRUCTOR | STUDENT
+    """
+    response.headers[SYNC_TIMESTAMP_HEADER] = sync_timestamp().isoformat()
+    return get_tombstones(
+        db, entity, updated_since=updated_since, skip=skip, limit=limit
+    )
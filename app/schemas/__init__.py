@@ -8,7 +8,7 @@ from .instructor_course import (
 )
 from .instructor import InstructorCreate, InstructorUpdate
 from .schedule import ScheduleBase, ScheduleCreate, ScheduleRead, ScheduleUpdate
-from .student import StudentCreate, StudentRead, StudentUpdate
+from .student import StudentCreate, StudentListRead, StudentRead, StudentUpdate
 from .room import RoomBase, RoomCreate, RoomResponse, RoomUpdate
 
 __all__ = [
@@ -35,6 +35,7 @@ __all__ = [
     "ScheduleRead",
     "ScheduleUpdate",
     "StudentCreate",
+    "StudentListRead",
     "StudentRead",
     "StudentUpdate",
 ]
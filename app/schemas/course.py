@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, ConfigDict, Field
-from datetime import datetime
+from datetime import date, datetime
 
 
 class CourseBase(BaseModel):
@@ -23,7 +23,41 @@ class CourseRead(CourseBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CourseWithStatsRead(CourseRead):
+    # Only filled in when the listing is requested with include_stats
+    session_count: Optional[int] = None
+    enrolled_count: Optional[int] = None
+
+
 class CourseResponse(BaseModel):
     course_id: int
     course_name: Optional[str] = None
 
+
+
+class AttendanceMatrixStudent(BaseModel):
+    student_id: int
+    nim: str
+    full_name: str
+
+
+class AttendanceMatrixSession(BaseModel):
+    schedule_id: int
+    schedule_date: date
+    start_time: str
+    end_time: str
+
+
+class CourseAttendanceMatrix(BaseModel):
+    """
+    Students × sessions attendance grid of a course.
+
+    rows[i][j] is the status code of students[i] in sessions[j]; legend maps
+    codes to statuses and "-" means no attendance record.
+    """
+
+    course_id: int
+    legend: Dict[str, str]
+    students: List[AttendanceMatrixStudent]
+    sessions: List[AttendanceMatrixSession]
+    rows: List[str]
@@ -0,0 +1,18 @@
+# app/schemas/enrollment.py
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class EnrollmentJobRead(BaseModel):
+    job_id: str
+    status: str
+    total_students: int
+    total_photos: int
+    processed_students: int
+    enrolled_students: int
+    failures: List[Dict[str, Any]] = []
+    unknown_nims: List[str] = []
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
@@ -0,0 +1,32 @@
+# app/schemas/report.py
+from pydantic import BaseModel, ConfigDict, computed_field
+from datetime import datetime
+
+
+class AttendanceCountsRead(BaseModel):
+    present_count: int
+    late_count: int
+    absent_count: int
+    on_going_count: int
+    total_count: int
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def attendance_rate(self) -> float:
+        """Share of sessions attended (present or late), from 0 to 1."""
+        if not self.total_count:
+            return 0.0
+        return round((self.present_count + self.late_count) / self.total_count, 4)
+
+
+class StudentAttendanceSummaryRead(AttendanceCountsRead):
+    course_id: int
+    student_id: int
+
+
+class SessionAttendanceSummaryRead(AttendanceCountsRead):
+    schedule_id: int
+    course_id: int
@@ -20,4 +20,9 @@ class RoomUpdate(BaseModel):
 class RoomResponse(RoomBase):
     room_id: int
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class NearestRoomResponse(RoomResponse):
+    distance_m: float = Field(description="Distance from the query point in meters")
+    within_radius: bool
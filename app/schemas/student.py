@@ -37,6 +37,23 @@ class StudentRead(StudentBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class StudentListRead(BaseModel):
+    """Student listing entry; face data is only returned for single students."""
+
+    student_id: int
+    nim: str
+    username: str
+    full_name: str
+    major_name: str
+    profile_picture_url: Optional[str] = None
+    year: str
+    is_approved: bool
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class StudentLogin(BaseModel):
     username: str
     password: str
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+
+
+class TombstoneRead(BaseModel):
+    entity: str
+    entity_id: int
+    deleted_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
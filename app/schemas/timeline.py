@@ -0,0 +1,27 @@
+# app/schemas/timeline.py
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date, datetime
+
+
+class TodaySessionRead(BaseModel):
+    attendance_id: int
+    schedule_id: int
+    course_id: Optional[int] = None
+    course_name: Optional[str] = None
+    chapter: Optional[str] = None
+    room_id: Optional[int] = None
+    room_name: Optional[str] = None
+    start_time: str
+    end_time: str
+    status: str
+    check_in_time: Optional[datetime] = None
+    is_active: bool
+
+
+class StudentTodayRead(BaseModel):
+    date: date
+    now: datetime
+    active_schedule_id: Optional[int] = None
+    next_schedule_id: Optional[int] = None
+    sessions: List[TodaySessionRead]
@@ -0,0 +1,179 @@
+# app/services/attendance_export.py
+
+import csv
+import io
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+import pydantic_core
+from sqlalchemy.sql import Select
+from sqlmodel import Session
+
+# Rows fetched from the database cursor per batch; each batch becomes one chunk
+EXPORT_BATCH_SIZE = 2000
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_COLUMNS = (
+    "attendance_id",
+    "date",
+    "status",
+    "check_in_time",
+    "smile_detected",
+    "student_id",
+    "nim",
+    "student_name",
+    "schedule_id",
+    "schedule_date",
+    "start_time",
+    "end_time",
+    "course_id",
+    "course_name",
+)
+
+
+class ExportFormatUnavailable(Exception):
+    """Raised when an export format needs an optional package that is missing."""
+
+
+def _batches(engine, query: Select) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Stream export rows from the database in batches of EXPORT_BATCH_SIZE.
+
+    Uses its own session since the request's session is closed before a
+    streaming response body is sent. yield_per keeps only one batch of rows
+    in memory at a time.
+    """
+    with Session(engine) as db:
+        result = db.exec(
+            query.execution_options(yield_per=EXPORT_BATCH_SIZE, stream_results=True)
+        )
+        for partition in result.partitions():
+            rows = []
+            for row in partition:
+                item = dict(row._mapping)
+                # Attendance.date is stored as a datetime at midnight
+                if isinstance(item["date"], datetime):
+                    item["date"] = item["date"].date()
+                rows.append(item)
+            yield rows
+
+
+def _csv_chunks(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson_chunks(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    for rows in batches:
+        yield b"".join(pydantic_core.to_json(row) + b"\n" for row in rows)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands out what was written since last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_chunks(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("attendance_id", pa.int64()),
+            ("date", pa.date32()),
+            ("status", pa.string()),
+            ("check_in_time", pa.timestamp("us")),
+            ("smile_detected", pa.bool_()),
+            ("student_id", pa.int64()),
+            ("nim", pa.string()),
+            ("student_name", pa.string()),
+            ("schedule_id", pa.int64()),
+            ("schedule_date", pa.date32()),
+            ("start_time", pa.string()),
+            ("end_time", pa.string()),
+            ("course_id", pa.int64()),
+            ("course_name", pa.string()),
+        ]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        # One row group per batch, sent as soon as it is written
+        for rows in batches:
+            for row in rows:
+                if row["check_in_time"] is not None:
+                    row["check_in_time"] = row["check_in_time"].replace(tzinfo=None)
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def check_export_format(export_format: str) -> None:
+    """
+    Raises:
+        ExportFormatUnavailable: If the format needs pyarrow and it is not
+            installed
+    """
+    if export_format == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ExportFormatUnavailable(
+                "Parquet export requires the pyarrow package"
+            ) from None
+
+
+def stream_attendance_export(
+    engine, query: Select, export_format: str
+) -> Iterator[bytes]:
+    """
+    Encode the rows of an attendance export query as a stream of chunks.
+
+    Args:
+        engine: Engine to open the streaming session on
+        query: Flat export query (see get_attendance_export_query)
+        export_format: One of EXPORT_MEDIA_TYPES
+
+    Returns:
+        Iterator of encoded chunks, one per database batch
+    """
+    encoders = {
+        "csv": _csv_chunks,
+        "ndjson": _ndjson_chunks,
+        "parquet": _parquet_chunks,
+    }
+    return encoders[export_format](_batches(engine, query))
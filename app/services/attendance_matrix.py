@@ -0,0 +1,106 @@
+# app/services/attendance_matrix.py
+
+from typing import Any, Dict, List
+
+import numpy as np
+from sqlalchemy import select
+from sqlmodel import Session
+
+from app.models.attendance import Attendance
+from app.models.schedule import Schedule
+from app.models.student import Student
+
+# One character per cell; a student without a record for a session gets "-"
+STATUS_CODES = {
+    "PRESENT": "P",
+    "LATE": "L",
+    "ABSENT": "A",
+    "ON_GOING": "O",
+}
+NO_RECORD_CODE = "-"
+
+
+def _positions(sorted_keys: np.ndarray, order: np.ndarray, ids: np.ndarray):
+    """Map ids to their index in the header, given the header's argsort."""
+    return order[np.searchsorted(sorted_keys, ids)]
+
+
+def build_attendance_matrix(db: Session, course_id: int) -> Dict[str, Any]:
+    """
+    Build the students × sessions attendance grid of a course.
+
+    Attendance is fetched as three flat columns (student_id, schedule_id,
+    status) and scattered into a dense character matrix with NumPy, so the
+    cost is a few array operations rather than a Python loop over every
+    cell.
+
+    Args:
+        db: Database session
+        course_id: Course whose schedules make up the columns
+
+    Returns:
+        Dict with the status legend, the student (row) and session (column)
+        headers, and one string per student holding a status code per session
+    """
+    sessions = db.execute(
+        select(
+            Schedule.schedule_id,
+            Schedule.schedule_date,
+            Schedule.start_time,
+            Schedule.end_time,
+        )
+        .where(Schedule.course_id == course_id)
+        .order_by(Schedule.schedule_date, Schedule.start_time, Schedule.schedule_id)
+    ).all()
+    cells = db.execute(
+        select(Attendance.student_id, Attendance.schedule_id, Attendance.status)
+        .join(Schedule, Attendance.schedule_id == Schedule.schedule_id)
+        .where(Schedule.course_id == course_id)
+    ).all()
+    students = db.execute(
+        select(Student.student_id, Student.nim, Student.full_name)
+        .where(
+            Student.student_id.in_(
+                select(Attendance.student_id)
+                .join(Schedule, Attendance.schedule_id == Schedule.schedule_id)
+                .where(Schedule.course_id == course_id)
+            )
+        )
+        .order_by(Student.nim)
+    ).all()
+
+    matrix = np.full(
+        (len(students), len(sessions)), ord(NO_RECORD_CODE), dtype=np.uint8
+    )
+    if cells:
+        student_ids, schedule_ids, statuses = (np.asarray(c) for c in zip(*cells))
+
+        student_keys = np.array([row.student_id for row in students])
+        student_order = np.argsort(student_keys)
+        session_keys = np.array([row.schedule_id for row in sessions])
+        session_order = np.argsort(session_keys)
+
+        rows = _positions(student_keys[student_order], student_order, student_ids)
+        columns = _positions(session_keys[session_order], session_order, schedule_ids)
+
+        # Translate each distinct status once, then broadcast by inverse index
+        distinct, inverse = np.unique(statuses, return_inverse=True)
+        codes = np.array(
+            [ord(STATUS_CODES.get(status, NO_RECORD_CODE)) for status in distinct],
+            dtype=np.uint8,
+        )
+        matrix[rows, columns] = codes[inverse]
+
+    width = len(sessions)
+    encoded = matrix.tobytes().decode("ascii")
+    row_strings: List[str] = [
+        encoded[index * width : (index + 1) * width] for index in range(len(students))
+    ]
+
+    return {
+        "course_id": course_id,
+        "legend": {code: status for status, code in STATUS_CODES.items()},
+        "students": [row._asdict() for row in students],
+        "sessions": [row._asdict() for row in sessions],
+        "rows": row_strings,
+    }
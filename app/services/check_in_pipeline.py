@@ -0,0 +1,840 @@
+# app/services/check_in_pipeline.py
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+
+from app.crud.face_template import get_face_template
+from app.models.attendance import Attendance
+from app.schemas.attendance import AttendanceCheckIn
+from app.services.face_verification_service import get_face_verification_service
+from app.services.geofence_service import check_geofence, room_index
+from app.services.image_hash_index import (
+    dhash,
+    format_hash,
+    hamming_distance,
+    image_hash_index,
+)
+from app.services.image_quality import (
+    MIN_FACE_AREA_RATIO,
+    face_area_ratio,
+    frame_quality_problem,
+    frame_score,
+    frontalness,
+    measure_frame,
+)
+from app.services.metrics import metrics
+from app.services.verification_cache import (
+    CacheKey,
+    CachedVerification,
+    verification_cache,
+)
+from app.utils.time_utils import get_indonesia_time, parse_schedule_time
+
+logger = logging.getLogger(__name__)
+
+# Students may check in from this many minutes before the session starts
+CHECK_IN_OPENS_BEFORE_MINUTES = 15
+
+# Uploads larger than this are rejected before they are decoded
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+
+# Client-cropped face uploads are bounded much tighter than full frames
+MAX_FACE_CROP_BYTES = 512 * 1024
+FACE_CROP_MIN_SIDE = 80
+FACE_CROP_MAX_SIDE = 1024
+FACE_CROP_MAX_ASPECT_RATIO = 1.6
+
+# Fraction of face-crop check-ins that are verified from the full frame instead,
+# when the client also sent one, to audit client-side cropping
+FACE_CROP_AUDIT_RATE = 0.05
+
+# An audited crop is flagged unless face_box overlaps the face detected in the
+# full frame by at least this IoU and the crop's dHash is within this many bits
+# of the full frame's region at face_box
+FACE_CROP_AUDIT_MIN_IOU = 0.5
+FACE_CROP_AUDIT_MAX_DISTANCE = 10
+
+MODE_FULL_FRAME = "full_frame"
+MODE_FACE_CROP = "face_crop"
+MODE_FULL_FRAME_AUDIT = "full_frame_audit"
+MODE_BURST = "burst"
+
+# Burst check-ins: at most this many frames, and only the best few reach the model
+MAX_BURST_FRAMES = 5
+MAX_BURST_BYTES = 8 * 1024 * 1024
+BURST_RECOGNISED_FRAMES = 2
+
+VALID_IMAGE_CONTENT_TYPES = ["image/jpeg", "image/png", "image/jpg"]
+
+ATTENDANCE_UPLOAD_DIR = "uploads/attendance_images"
+
+CONFIDENCE_THRESHOLD = 0.5
+
+# Minimum cosine similarity between a check-in face and the student's enrolled
+# template; students without a template are verified by the classifier
+TEMPLATE_SIMILARITY_THRESHOLD = 0.7
+
+
+@dataclass
+class Rejection:
+    """Short-circuit result returned by a stage that disqualifies the check-in."""
+
+    reason: str
+    message: str
+    status_code: int = 403
+
+
+# (frame index, decoded frame, face crop, face coordinates, frame scores)
+FrameCandidate = Tuple[int, np.ndarray, np.ndarray, List[int], Dict[str, Any]]
+
+
+@dataclass
+class CheckInContext:
+    """State shared by the stages of a single check-in request."""
+
+    db: Session
+    attendance: Attendance
+    current_user: Any
+    user_type: str
+    check_in_data: AttendanceCheckIn
+    upload: Optional[UploadFile]
+    model_path: str
+    mode: str = MODE_FULL_FRAME
+    face_box: Optional[str] = None
+    face_box_coords: Optional[List[int]] = None
+    face_crop: Optional[UploadFile] = None
+    face_crop_content: Optional[bytes] = None
+    crop_audit: Optional[Dict[str, Any]] = None
+    burst: List[UploadFile] = field(default_factory=list)
+    frame_contents: List[bytes] = field(default_factory=list)
+    frame_scores: List[Dict[str, Any]] = field(default_factory=list)
+    frame_index: Optional[int] = None
+    candidates: List[FrameCandidate] = field(default_factory=list)
+    now: datetime = field(default_factory=get_indonesia_time)
+    content: Optional[bytes] = None
+    content_sha256: Optional[str] = None
+    cache_hit: bool = False
+    image: Optional[np.ndarray] = None
+    image_hash: Optional[int] = None
+    quality: Dict[str, float] = field(default_factory=dict)
+    near_duplicates: List[Dict[str, int]] = field(default_factory=list)
+    face: Optional[np.ndarray] = None
+    face_coords: Optional[List[int]] = None
+    template: Optional[np.ndarray] = None
+    template_version: Optional[int] = None
+    verification: Optional[Dict[str, Any]] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def is_student(self) -> bool:
+        return self.user_type == "student"
+
+    @property
+    def cache_key(self) -> CacheKey:
+        # A re-enrollment changes the template version, so results computed
+        # against the previous template are not reused
+        face_service = get_face_verification_service(self.model_path)
+        model = f"{face_service.model_version}:{self.template_version or 0}"
+        return (self.content_sha256, self.current_user.nim, model)
+
+
+StageResult = Optional[Rejection]
+
+
+@dataclass
+class Stage:
+    """
+    A named pipeline step, skipped when `applies` returns False.
+
+    Blocking stages do CPU-bound OpenCV work or query the database and run in
+    the threadpool so they do not stall the event loop.
+    """
+
+    name: str
+    run: Callable[[CheckInContext], Union[StageResult, Awaitable[StageResult]]]
+    applies: Callable[[CheckInContext], bool] = lambda ctx: True
+    blocking: bool = False
+
+
+@dataclass
+class CheckInOutcome:
+    accepted: bool
+    stage: Optional[str] = None
+    rejection: Optional[Rejection] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class CheckInPipeline:
+    """
+    Ordered list of check-in stages, cheapest first.
+
+    Each stage either returns None to let the request continue or a Rejection
+    that ends the pipeline immediately, so the OpenCV and model stages only run
+    for check-ins that could still succeed. Stage durations and rejection
+    reasons are recorded in the metrics registry.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+
+    async def run(self, ctx: CheckInContext) -> CheckInOutcome:
+        for stage in self.stages:
+            if not stage.applies(ctx):
+                continue
+
+            started = time.perf_counter()
+            if stage.blocking:
+                result = await run_in_threadpool(stage.run, ctx)
+            else:
+                result = stage.run(ctx)
+                if inspect.isawaitable(result):
+                    result = await result
+            elapsed = time.perf_counter() - started
+
+            ctx.timings[stage.name] = round(elapsed, 6)
+            metrics.observe("check_in.stage_seconds", elapsed, stage=stage.name)
+
+            if result is not None:
+                metrics.increment(
+                    "check_in.rejections", stage=stage.name, reason=result.reason
+                )
+                logger.info(
+                    f"Check-in for attendance {ctx.attendance.attendance_id} rejected "
+                    f"at stage '{stage.name}': {result.reason}"
+                )
+                return CheckInOutcome(
+                    accepted=False,
+                    stage=stage.name,
+                    rejection=result,
+                    timings=ctx.timings,
+                )
+
+        metrics.increment("check_in.accepted", user_type=ctx.user_type)
+        return CheckInOutcome(accepted=True, timings=ctx.timings)
+
+
+def _is_student(ctx: CheckInContext) -> bool:
+    return ctx.is_student
+
+
+def _needs_face_stages(ctx: CheckInContext) -> bool:
+    return ctx.is_student and not ctx.cache_hit
+
+
+def _needs_single_image_stages(ctx: CheckInContext) -> bool:
+    return _needs_face_stages(ctx) and ctx.mode != MODE_BURST
+
+
+def _needs_full_frame_stages(ctx: CheckInContext) -> bool:
+    return _needs_single_image_stages(ctx) and ctx.mode != MODE_FACE_CROP
+
+
+def _needs_face_crop_stages(ctx: CheckInContext) -> bool:
+    return _needs_face_stages(ctx) and ctx.mode == MODE_FACE_CROP
+
+
+def _needs_burst_stages(ctx: CheckInContext) -> bool:
+    return _needs_face_stages(ctx) and ctx.mode == MODE_BURST
+
+
+def _needs_crop_audit(ctx: CheckInContext) -> bool:
+    return (
+        ctx.is_student
+        and ctx.mode == MODE_FULL_FRAME_AUDIT
+        and ctx.face_coords is not None
+    )
+
+
+def _has_image_hash(ctx: CheckInContext) -> bool:
+    return ctx.is_student and ctx.image_hash is not None
+
+
+def check_not_already_checked_in(ctx: CheckInContext) -> StageResult:
+    if ctx.attendance.status in ("PRESENT", "LATE"):
+        return Rejection(
+            reason="already_checked_in",
+            message=f"Already checked in with status {ctx.attendance.status}",
+            status_code=409,
+        )
+    return None
+
+
+def check_time_window(ctx: CheckInContext) -> StageResult:
+    schedule = ctx.attendance.schedule
+    if schedule is None:
+        return Rejection(
+            reason="schedule_not_found", message="Schedule not found", status_code=404
+        )
+
+    now = ctx.now.replace(tzinfo=None)
+    opens_at = datetime.combine(
+        schedule.schedule_date, parse_schedule_time(schedule.start_time)
+    ) - timedelta(minutes=CHECK_IN_OPENS_BEFORE_MINUTES)
+    closes_at = datetime.combine(
+        schedule.schedule_date, parse_schedule_time(schedule.end_time)
+    )
+
+    if not (opens_at <= now <= closes_at):
+        return Rejection(
+            reason="outside_time_window",
+            message=(
+                f"Check-in is only open from {opens_at.strftime('%Y-%m-%d %H:%M')} "
+                f"to {closes_at.strftime('%Y-%m-%d %H:%M')}"
+            ),
+        )
+    return None
+
+
+def check_location(ctx: CheckInContext) -> StageResult:
+    schedule = ctx.attendance.schedule
+    room = (
+        room_index.get_room(ctx.db, schedule.room_id)
+        if schedule and schedule.room_id
+        else None
+    )
+    if room is None:
+        return None
+
+    geofence = check_geofence(room, ctx.check_in_data.location_data)
+    if not geofence["within_radius"]:
+        return Rejection(reason="outside_geofence", message=geofence["message"])
+
+    ctx.check_in_data.location_data = {
+        **(ctx.check_in_data.location_data or {}),
+        "geofence": geofence,
+    }
+    return None
+
+
+def _parse_face_box(value: Optional[str]) -> Optional[List[int]]:
+    if not value:
+        return None
+    try:
+        box = [int(coord) for coord in json.loads(value)]
+    except (TypeError, ValueError):
+        return None
+    if len(box) != 4 or min(box) < 0 or box[2] == 0 or box[3] == 0:
+        return None
+    return box
+
+
+async def _read_image(
+    upload: Optional[UploadFile], max_bytes: int, limit: str
+) -> Tuple[Optional[bytes], StageResult]:
+    if upload is None or not upload.filename:
+        return None, Rejection(
+            reason="missing_image",
+            message="An image is required for face verification",
+            status_code=400,
+        )
+
+    if upload.content_type not in VALID_IMAGE_CONTENT_TYPES:
+        return None, Rejection(
+            reason="invalid_content_type",
+            message="File must be an image (JPEG, PNG, or JPG)",
+            status_code=400,
+        )
+
+    content = await upload.read(max_bytes + 1)
+    if len(content) > max_bytes:
+        return None, Rejection(
+            reason="image_too_large",
+            message=f"Image must be at most {limit}",
+            status_code=413,
+        )
+    if not content:
+        return None, Rejection(
+            reason="empty_image", message="Uploaded image is empty", status_code=400
+        )
+    return content, None
+
+
+async def read_upload(ctx: CheckInContext) -> StageResult:
+    if ctx.mode == MODE_BURST:
+        return await read_burst(ctx)
+
+    if ctx.mode in (MODE_FACE_CROP, MODE_FULL_FRAME_AUDIT) and ctx.face_box:
+        ctx.face_box_coords = _parse_face_box(ctx.face_box)
+        if ctx.face_box_coords is None:
+            return Rejection(
+                reason="invalid_face_box",
+                message="face_box must be a JSON array [x, y, width, height]",
+                status_code=400,
+            )
+
+    if ctx.mode == MODE_FACE_CROP:
+        max_bytes, limit = MAX_FACE_CROP_BYTES, f"{MAX_FACE_CROP_BYTES // 1024} KB"
+    else:
+        max_bytes, limit = MAX_IMAGE_BYTES, f"{MAX_IMAGE_BYTES // (1024 * 1024)} MB"
+
+    content, rejection = await _read_image(ctx.upload, max_bytes, limit)
+    if rejection is not None:
+        return rejection
+
+    if ctx.mode == MODE_FULL_FRAME_AUDIT:
+        # The crop is not verified, only compared with the full frame
+        ctx.face_crop_content, rejection = await _read_image(
+            ctx.face_crop, MAX_FACE_CROP_BYTES, f"{MAX_FACE_CROP_BYTES // 1024} KB"
+        )
+        if rejection is not None:
+            return rejection
+
+    ctx.content = content
+    ctx.content_sha256 = hashlib.sha256(content).hexdigest()
+    return None
+
+
+async def read_burst(ctx: CheckInContext) -> StageResult:
+    if len(ctx.burst) > MAX_BURST_FRAMES:
+        return Rejection(
+            reason="too_many_frames",
+            message=f"A burst may contain at most {MAX_BURST_FRAMES} frames",
+            status_code=400,
+        )
+
+    digest = hashlib.sha256()
+    total_bytes = 0
+    for upload in ctx.burst:
+        content, rejection = await _read_image(
+            upload, MAX_IMAGE_BYTES, f"{MAX_IMAGE_BYTES // (1024 * 1024)} MB"
+        )
+        if rejection is not None:
+            return rejection
+
+        total_bytes += len(content)
+        if total_bytes > MAX_BURST_BYTES:
+            limit = f"{MAX_BURST_BYTES // (1024 * 1024)} MB"
+            return Rejection(
+                reason="image_too_large",
+                message=f"A burst must be at most {limit} in total",
+                status_code=413,
+            )
+
+        ctx.frame_contents.append(content)
+        digest.update(hashlib.sha256(content).digest())
+
+    # Until the best frame is chosen, the first frame stands in for the upload
+    ctx.upload, ctx.content = ctx.burst[0], ctx.frame_contents[0]
+    ctx.content_sha256 = digest.hexdigest()
+    return None
+
+
+def _remember(
+    ctx: CheckInContext,
+    verification: Dict[str, Any],
+    rejection: Optional[Rejection] = None,
+) -> Optional[Rejection]:
+    """Cache the outcome of the face stages for identical re-uploads."""
+    verification_cache.put(
+        ctx.cache_key,
+        CachedVerification(
+            verification=verification,
+            face_coords=ctx.face_coords,
+            image_hash=ctx.image_hash,
+            quality=ctx.quality,
+            frame_index=ctx.frame_index,
+            rejection_reason=rejection.reason if rejection else None,
+            rejection_message=rejection.message if rejection else None,
+        ),
+    )
+    return rejection
+
+
+def load_face_template(ctx: CheckInContext) -> StageResult:
+    face_service = get_face_verification_service(ctx.model_path)
+    stored = get_face_template(
+        ctx.db, ctx.current_user.student_id, model_id=face_service.model_version
+    )
+    if stored is not None:
+        ctx.template, ctx.template_version = stored
+    return None
+
+
+def lookup_cached_verification(ctx: CheckInContext) -> StageResult:
+    cached = verification_cache.get(ctx.cache_key)
+    if cached is None:
+        return None
+
+    ctx.cache_hit = True
+    ctx.face_coords = cached.face_coords
+    ctx.image_hash = cached.image_hash
+    if cached.frame_index is not None:
+        ctx.frame_index = cached.frame_index
+        ctx.upload = ctx.burst[cached.frame_index]
+        ctx.content = ctx.frame_contents[cached.frame_index]
+    ctx.quality = dict(cached.quality or {})
+    ctx.verification = dict(cached.verification, cached=True)
+    if cached.rejection_reason is not None:
+        return Rejection(
+            reason=cached.rejection_reason, message=cached.rejection_message
+        )
+    return None
+
+
+def decode_image(ctx: CheckInContext) -> StageResult:
+    face_service = get_face_verification_service(ctx.model_path)
+    image = face_service.decode_image(ctx.content)
+    if image is None or image.ndim != 3:
+        return Rejection(
+            reason="undecodable_image",
+            message="Invalid image data format",
+            status_code=400,
+        )
+    ctx.image = image
+    return None
+
+
+def check_frame_quality(ctx: CheckInContext) -> StageResult:
+    ctx.quality = measure_frame(ctx.image)
+    problem = frame_quality_problem(ctx.quality)
+    if problem is None:
+        return None
+    return _remember(
+        ctx,
+        {"verified": False, "message": problem},
+        Rejection(reason="poor_image_quality", message=problem),
+    )
+
+
+def detect_face(ctx: CheckInContext) -> StageResult:
+    face_service = get_face_verification_service(ctx.model_path)
+    face_result = face_service.detect_face(ctx.image)
+    if face_result is None:
+        message = "No face detected in the image"
+        return _remember(
+            ctx,
+            {"verified": False, "message": message},
+            Rejection(reason="no_face_detected", message=message),
+        )
+    ctx.face, coords = face_result
+    ctx.face_coords = [int(value) for value in coords]
+    # Replays are matched on the face region in every mode, so full frames,
+    # client crops and burst frames of the same photo hash alike
+    ctx.image_hash = dhash(ctx.face)
+    return None
+
+
+def accept_face_crop(ctx: CheckInContext) -> StageResult:
+    height, width = ctx.image.shape[:2]
+    aspect_ratio = max(width, height) / float(min(width, height))
+    if (
+        min(width, height) < FACE_CROP_MIN_SIDE
+        or max(width, height) > FACE_CROP_MAX_SIDE
+        or aspect_ratio > FACE_CROP_MAX_ASPECT_RATIO
+    ):
+        return Rejection(
+            reason="invalid_face_crop",
+            message=(
+                f"Face crop must be between {FACE_CROP_MIN_SIDE} and "
+                f"{FACE_CROP_MAX_SIDE} pixels per side and roughly square"
+            ),
+            status_code=400,
+        )
+
+    # The client already located the face, so the crop goes to the model as is
+    ctx.face = ctx.image
+    ctx.face_coords = ctx.face_box_coords or [0, 0, int(width), int(height)]
+    ctx.image_hash = dhash(ctx.face)
+    return None
+
+
+def check_face_size(ctx: CheckInContext) -> StageResult:
+    ctx.quality["face_area_ratio"] = face_area_ratio(ctx.image, ctx.face_coords)
+    if ctx.quality["face_area_ratio"] >= MIN_FACE_AREA_RATIO:
+        return None
+    message = "Face is too small in the photo; hold the camera closer to your face"
+    return _remember(
+        ctx,
+        {"verified": False, "message": message},
+        Rejection(reason="face_too_small", message=message),
+    )
+
+
+def select_burst_frames(ctx: CheckInContext) -> StageResult:
+    face_service = get_face_verification_service(ctx.model_path)
+    usable = []
+    problem = "No face detected in the image"
+    for index, content in enumerate(ctx.frame_contents):
+        image = face_service.decode_image(content)
+        if image is None or image.ndim != 3:
+            ctx.frame_scores.append({"frame": index, "problem": "undecodable"})
+            continue
+
+        scores = measure_frame(image)
+        frame_problem = frame_quality_problem(scores)
+        face_result = None if frame_problem else face_service.detect_face(image)
+        if face_result is None:
+            problem = frame_problem or problem
+            ctx.frame_scores.append(
+                {"frame": index, **scores, "problem": frame_problem or "no_face"}
+            )
+            continue
+
+        face, coords = face_result
+        coords = [int(value) for value in coords]
+        scores["face_area_ratio"] = face_area_ratio(image, coords)
+        scores["frontalness"] = frontalness(face)
+        scores["score"] = frame_score(scores)
+        ctx.frame_scores.append({"frame": index, **scores})
+        usable.append((scores["score"], index, image, face, coords, scores))
+
+    if not usable:
+        return _remember(
+            ctx,
+            {"verified": False, "message": problem},
+            Rejection(reason="no_usable_frame", message=problem),
+        )
+
+    usable.sort(key=lambda frame: frame[0], reverse=True)
+    ctx.candidates = [frame[1:] for frame in usable[:BURST_RECOGNISED_FRAMES]]
+    _use_frame(ctx, ctx.candidates[0])
+    return None
+
+
+def _use_frame(ctx: CheckInContext, candidate: FrameCandidate) -> None:
+    index, image, face, coords, scores = candidate
+    ctx.image, ctx.face, ctx.face_coords, ctx.quality = image, face, coords, scores
+    ctx.image_hash = dhash(face)
+    ctx.frame_index = index
+    ctx.upload, ctx.content = ctx.burst[index], ctx.frame_contents[index]
+
+
+async def recognise_face(ctx: CheckInContext) -> StageResult:
+    face_service = get_face_verification_service(ctx.model_path)
+    faces = [candidate[2] for candidate in ctx.candidates] or [ctx.face]
+    try:
+        # Burst candidates are embedded or classified together in a single
+        # model call, and smiles are detected on the same face crops in the
+        # same worker call
+        if ctx.template is not None:
+            verifications = await run_in_threadpool(
+                face_service.match_template,
+                faces,
+                ctx.template,
+                ctx.current_user.nim,
+                TEMPLATE_SIMILARITY_THRESHOLD,
+            )
+        else:
+            verifications = await run_in_threadpool(
+                face_service.analyse_faces,
+                faces,
+                ctx.current_user.nim,
+                CONFIDENCE_THRESHOLD,
+            )
+    except FileNotFoundError as e:
+        return Rejection(reason="model_unavailable", message=str(e), status_code=500)
+
+    position = max(
+        range(len(verifications)),
+        key=lambda i: (verifications[i]["verified"], verifications[i]["confidence"]),
+    )
+    verification = verifications[position]
+    if position != 0:
+        _use_frame(ctx, ctx.candidates[position])
+
+    verification["face_coords"] = ctx.face_coords
+    ctx.verification = verification
+
+    rejection = None
+    if not verification["verified"]:
+        rejection = Rejection(reason="face_mismatch", message=verification["message"])
+    return _remember(ctx, verification, rejection)
+
+
+def _box_iou(a: List[int], b: List[int]) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    width = min(ax + aw, bx + bw) - max(ax, bx)
+    height = min(ay + ah, by + bh) - max(ay, by)
+    if width <= 0 or height <= 0:
+        return 0.0
+    intersection = width * height
+    return intersection / float(aw * ah + bw * bh - intersection)
+
+
+def audit_face_crop(ctx: CheckInContext) -> StageResult:
+    # Mismatches are flagged for review rather than rejected: the check-in
+    # itself was verified from the full frame
+    face_service = get_face_verification_service(ctx.model_path)
+    if ctx.image is None:
+        # Verification result came from the cache
+        ctx.image = face_service.decode_image(ctx.content)
+
+    audit: Dict[str, Any] = {
+        "face_box": ctx.face_box_coords,
+        "detected_box": ctx.face_coords,
+    }
+    crop = face_service.decode_image(ctx.face_crop_content)
+    x, y, width, height = ctx.face_box_coords or ctx.face_coords
+    region = ctx.image[y : y + height, x : x + width]
+    if crop is None or crop.ndim != 3:
+        audit["problem"] = "undecodable_crop"
+    elif region.size == 0:
+        audit["problem"] = "face_box_outside_frame"
+    else:
+        audit["crop_distance"] = hamming_distance(dhash(crop), dhash(region))
+        if ctx.face_box_coords is not None:
+            audit["face_box_iou"] = round(
+                _box_iou(ctx.face_box_coords, ctx.face_coords), 4
+            )
+
+    audit["mismatch"] = (
+        "problem" in audit
+        or audit["crop_distance"] > FACE_CROP_AUDIT_MAX_DISTANCE
+        or audit.get("face_box_iou", 1.0) < FACE_CROP_AUDIT_MIN_IOU
+    )
+    ctx.crop_audit = audit
+    metrics.increment(
+        "check_in.crop_audits", result="mismatch" if audit["mismatch"] else "match"
+    )
+    if audit["mismatch"]:
+        logger.warning(
+            f"Face crop audit mismatch for attendance "
+            f"{ctx.attendance.attendance_id}: {audit}"
+        )
+    return None
+
+
+def flag_replayed_photo(ctx: CheckInContext) -> StageResult:
+    # Replays are flagged for review rather than rejected: a student may
+    # legitimately look the same in two photos taken in the same room
+    ctx.near_duplicates = image_hash_index.find_near_duplicates(
+        ctx.db, ctx.image_hash, exclude_attendance_id=ctx.attendance.attendance_id
+    )
+    return None
+
+
+CHECK_IN_PIPELINE = CheckInPipeline(
+    [
+        Stage("already_checked_in", check_not_already_checked_in, _is_student),
+        Stage("time_window", check_time_window, _is_student, blocking=True),
+        Stage("geofence", check_location, _is_student, blocking=True),
+        Stage("upload", read_upload),
+        Stage("face_template", load_face_template, _is_student, blocking=True),
+        Stage("verification_cache", lookup_cached_verification, _is_student),
+        Stage("decode", decode_image, _needs_single_image_stages, blocking=True),
+        Stage(
+            "image_quality",
+            check_frame_quality,
+            _needs_single_image_stages,
+            blocking=True,
+        ),
+        Stage("face_crop", accept_face_crop, _needs_face_crop_stages),
+        Stage("face_detection", detect_face, _needs_full_frame_stages, blocking=True),
+        Stage("face_size", check_face_size, _needs_full_frame_stages),
+        Stage(
+            "frame_selection", select_burst_frames, _needs_burst_stages, blocking=True
+        ),
+        Stage("recognition", recognise_face, _needs_face_stages),
+        Stage("crop_audit", audit_face_crop, _needs_crop_audit, blocking=True),
+        Stage("replay_check", flag_replayed_photo, _has_image_hash, blocking=True),
+    ]
+)
+
+
+def choose_check_in_upload(
+    image: Optional[UploadFile],
+    face_crop: Optional[UploadFile],
+    burst: Optional[List[UploadFile]] = None,
+) -> Tuple[Optional[UploadFile], str]:
+    """
+    Pick the upload a check-in is verified from.
+
+    A burst of frames takes precedence, since the best frame is picked from it.
+    Otherwise a client-cropped face is preferred because it skips full-frame
+    decoding and Haar detection. When the full frame was also sent, a sample of
+    face-crop check-ins is verified from it instead, and the crop and face_box
+    are compared with the face detected in it to audit client cropping.
+
+    Returns:
+        Tuple of (selected upload, check-in mode); in burst mode the frames are
+        read from the context's `burst` list instead
+    """
+    has_image = image is not None and bool(image.filename)
+    has_face_crop = face_crop is not None and bool(face_crop.filename)
+
+    if burst:
+        mode, upload = MODE_BURST, None
+    elif has_face_crop:
+        if has_image and random.random() < FACE_CROP_AUDIT_RATE:
+            mode, upload = MODE_FULL_FRAME_AUDIT, image
+        else:
+            mode, upload = MODE_FACE_CROP, face_crop
+    else:
+        mode, upload = MODE_FULL_FRAME, image
+
+    metrics.increment("check_in.mode", mode=mode)
+    return upload, mode
+
+
+def save_attendance_image(ctx: CheckInContext) -> str:
+    """
+    Store the uploaded check-in image, replacing the attendance's previous one.
+
+    Returns:
+        Public URL of the stored image
+    """
+    os.makedirs(ATTENDANCE_UPLOAD_DIR, exist_ok=True)
+
+    if ctx.attendance.image_captured_url:
+        old_file_path = ctx.attendance.image_captured_url.replace(
+            "/uploads/", "uploads/"
+        )
+        if os.path.exists(old_file_path):
+            os.remove(old_file_path)
+
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    file_extension = os.path.splitext(ctx.upload.filename)[1]
+    filename = f"attendance_{ctx.attendance.attendance_id}_{timestamp}{file_extension}"
+    with open(os.path.join(ATTENDANCE_UPLOAD_DIR, filename), "wb") as buffer:
+        buffer.write(ctx.content)
+
+    return f"/uploads/attendance_images/{filename}"
+
+
+def build_face_verification_data(ctx: CheckInContext) -> Dict[str, Any]:
+    """Summarise the verification outcome for Attendance.face_verification_data."""
+    verification = ctx.verification or {}
+    return {
+        "verified": verification.get("verified", False),
+        "confidence": verification.get("confidence", 0.0),
+        "predicted_name": verification.get("predicted_name", ""),
+        "predicted_nim": verification.get("predicted_nim", ""),
+        "expected_nim": ctx.current_user.nim,
+        "confidence_threshold": verification.get(
+            "confidence_threshold", CONFIDENCE_THRESHOLD
+        ),
+        "template_version": ctx.template_version,
+        "smile_detected": verification.get("smile_detected", False),
+        "client_smile_detected": ctx.check_in_data.smile_detected,
+        "nim_match": verification.get("nim_match", False),
+        "confidence_ok": verification.get("confidence_ok", False),
+        "face_coords": ctx.face_coords,
+        "mode": ctx.mode,
+        "frame_index": ctx.frame_index,
+        "frame_scores": ctx.frame_scores,
+        "cached": ctx.cache_hit,
+        "quality": ctx.quality,
+        "image_hash": (
+            format_hash(ctx.image_hash) if ctx.image_hash is not None else None
+        ),
+        "replay_suspected": bool(ctx.near_duplicates),
+        "near_duplicates": ctx.near_duplicates,
+        "audited": ctx.mode == MODE_FULL_FRAME_AUDIT,
+        "crop_audit": ctx.crop_audit,
+        "stage_timings": ctx.timings,
+        "timestamp": str(datetime.now()),
+    }
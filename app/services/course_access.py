@@ -0,0 +1,76 @@
+# app/services/course_access.py
+
+import threading
+from typing import Dict, FrozenSet, Optional
+
+from sqlmodel import Session, select
+
+from app.models.instructor_course import InstructorCourse
+from app.services.invalidation_bus import invalidation_bus
+from app.services.metrics import metrics
+
+COURSE_ACCESS_TOPIC = "course_access"
+
+
+class CourseAccessCache:
+    """
+    Per-worker map from instructor ID to the IDs of the courses they teach.
+
+    An instructor's course set is loaded from InstructorCourse on first use
+    and answered from memory afterwards, so course ownership checks cost no
+    SQL in the steady state. The instructor_course CRUD functions invalidate
+    the affected instructors after every write, on every worker through the
+    invalidation bus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._courses: Dict[int, FrozenSet[int]] = {}
+        # Bumped on every invalidation so a load that raced with a write is
+        # not stored
+        self._generation = 0
+
+    def course_ids(self, db: Session, instructor_id: int) -> FrozenSet[int]:
+        with self._lock:
+            course_ids = self._courses.get(instructor_id)
+            generation = self._generation
+        if course_ids is not None:
+            metrics.increment("course_access_cache.hits")
+            return course_ids
+
+        metrics.increment("course_access_cache.misses")
+        course_ids = frozenset(
+            db.exec(
+                select(InstructorCourse.course_id).where(
+                    InstructorCourse.instructor_id == instructor_id
+                )
+            ).all()
+        )
+        with self._lock:
+            if generation == self._generation:
+                self._courses[instructor_id] = course_ids
+        return course_ids
+
+    def can_access(self, db: Session, instructor_id: int, course_id: int) -> bool:
+        return course_id in self.course_ids(db, instructor_id)
+
+    def invalidate(self, *instructor_ids: Optional[int]) -> None:
+        """Drop the given instructors' course sets, or every set if none given."""
+        if not instructor_ids:
+            invalidation_bus.publish(COURSE_ACCESS_TOPIC)
+        for instructor_id in instructor_ids:
+            if instructor_id is not None:
+                invalidation_bus.publish(COURSE_ACCESS_TOPIC, str(instructor_id))
+
+    def _drop(self, key: Optional[str], event_id: Optional[int] = None) -> None:
+        """Invalidation bus handler: key is an instructor ID, or None for all."""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._courses.clear()
+            else:
+                self._courses.pop(int(key), None)
+
+
+course_access = CourseAccessCache()
+invalidation_bus.subscribe(COURSE_ACCESS_TOPIC, course_access._drop)
@@ -0,0 +1,285 @@
+# app/services/enrollment_service.py
+
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.crud.face_template import upsert_face_template
+from app.models.student import Student
+from app.services.face_verification_service import get_face_verification_service
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Photos used per student; extra photos add little to an averaged template
+MAX_PHOTOS_PER_STUDENT = 10
+
+MAX_PHOTO_BYTES = 5 * 1024 * 1024
+
+# Upper bound for a whole-class zip archive
+MAX_ARCHIVE_BYTES = 200 * 1024 * 1024
+
+ENROLLMENT_WORKERS = int(
+    os.getenv("ENROLLMENT_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+# Finished jobs kept in memory for polling
+MAX_TRACKED_JOBS = 100
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def compute_student_template(model_path: str, photos: List[bytes]) -> Dict[str, Any]:
+    """
+    Detect, crop and embed one student's photos and average them into a template.
+
+    Runs inside an enrollment worker process, where the face verification
+    service (and its model) is loaded once and reused across students.
+
+    Returns:
+        Dictionary with the template as float32 bytes (or None if no photo had a
+        usable face), its dimension, the number of photos used and per-photo
+        failures
+    """
+    face_service = get_face_verification_service(model_path)
+    faces = []
+    failures = []
+    for index, content in enumerate(photos):
+        image = face_service.decode_image(content)
+        if image is None or image.ndim != 3:
+            failures.append({"photo": index, "reason": "undecodable_image"})
+            continue
+        face_result = face_service.detect_face(image)
+        if face_result is None:
+            failures.append({"photo": index, "reason": "no_face_detected"})
+            continue
+        faces.append(face_result[0])
+
+    if not faces:
+        return {"template": None, "dim": 0, "photos_used": 0, "failures": failures}
+
+    embeddings = face_service.embed_faces(faces)
+    template = embeddings.mean(axis=0)
+    template /= max(float(np.linalg.norm(template)), 1e-12)
+    return {
+        "template": template.astype(np.float32).tobytes(),
+        "dim": int(template.shape[0]),
+        "photos_used": len(faces),
+        "failures": failures,
+    }
+
+
+@dataclass
+class EnrollmentJob:
+    job_id: str
+    student_ids: List[int]
+    total_photos: int
+    status: str = "queued"
+    processed_students: int = 0
+    enrolled_students: int = 0
+    failures: List[Dict[str, Any]] = field(default_factory=list)
+    unknown_nims: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total_students": len(self.student_ids),
+            "total_photos": self.total_photos,
+            "processed_students": self.processed_students,
+            "enrolled_students": self.enrolled_students,
+            "failures": list(self.failures),
+            "unknown_nims": self.unknown_nims,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class EnrollmentService:
+    """
+    Background face enrollment.
+
+    Photos are grouped per student and each group is embedded in a process
+    pool, so a whole intake is enrolled in parallel on CPU instead of waiting
+    for a model retraining cycle. Jobs are tracked in memory for polling; the
+    resulting templates are written to the FaceTemplate table.
+    """
+
+    def __init__(self, max_workers: int = ENROLLMENT_WORKERS):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, EnrollmentJob]" = OrderedDict()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers avoid inheriting the web process's TensorFlow state
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def create_job(
+        self,
+        photos_by_student: Dict[int, List[bytes]],
+        unknown_nims: Optional[List[str]] = None,
+    ) -> EnrollmentJob:
+        job = EnrollmentJob(
+            job_id=uuid.uuid4().hex,
+            student_ids=list(photos_by_student),
+            total_photos=sum(len(photos) for photos in photos_by_student.values()),
+            unknown_nims=unknown_nims or [],
+        )
+        with self._lock:
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > MAX_TRACKED_JOBS:
+                self._jobs.popitem(last=False)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[EnrollmentJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def run_job(
+        self,
+        job: EnrollmentJob,
+        photos_by_student: Dict[int, List[bytes]],
+        model_path: str,
+        engine,
+    ) -> None:
+        """
+        Embed every student's photos in the process pool and store the templates.
+
+        Intended to run as a background task; progress is visible through the
+        job while it runs.
+        """
+        job.status = "running"
+        model_version = get_face_verification_service(model_path).model_version
+        try:
+            executor = self._get_executor()
+            futures: Dict[Future, int] = {
+                executor.submit(
+                    compute_student_template, model_path, photos
+                ): student_id
+                for student_id, photos in photos_by_student.items()
+            }
+
+            with Session(engine) as db:
+                for future in as_completed(futures):
+                    student_id = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(
+                            f"Enrollment failed for student {student_id}: {e}"
+                        )
+                        result = {"template": None, "failures": [{"reason": str(e)}]}
+
+                    for failure in result["failures"]:
+                        job.failures.append({"student_id": student_id, **failure})
+
+                    if result["template"] is not None:
+                        store_template(db, student_id, result, model_version)
+                        job.enrolled_students += 1
+                    job.processed_students += 1
+
+            job.status = "completed"
+            metrics.increment("enrollment.students", job.enrolled_students)
+        except Exception as e:
+            logger.error(f"Enrollment job {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+
+
+def store_template(
+    db: Session, student_id: int, result: Dict[str, Any], model_version: str
+) -> None:
+    """Write a computed template to the student's FaceTemplate row."""
+    upsert_face_template(
+        db,
+        student_id=student_id,
+        template=np.frombuffer(result["template"], dtype=np.float32),
+        model_id=model_version,
+        photos_used=result["photos_used"],
+    )
+
+
+def group_archive_photos(
+    db: Session, archive: BinaryIO
+) -> Tuple[Dict[int, List[bytes]], List[str]]:
+    """
+    Read a class enrollment zip and group its photos by student.
+
+    Photos are matched by NIM, from the top-level folder (`{nim}/photo.jpg`)
+    when it is a registered NIM and otherwise from the filename prefix
+    (`{nim}_photo.jpg`). Only the photos that are kept are decompressed. Reads
+    the whole archive, so async callers should run it in the threadpool.
+
+    Returns:
+        Tuple of (photos keyed by student ID, NIMs that matched no student)
+
+    Raises:
+        zipfile.BadZipFile: If the archive cannot be read
+    """
+    with zipfile.ZipFile(archive) as zf:
+        # (entry, candidate NIMs in order of preference)
+        entries: List[Tuple[zipfile.ZipInfo, List[str]]] = []
+        for info in zf.infolist():
+            name = info.filename
+            if info.is_dir() or not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            if info.file_size > MAX_PHOTO_BYTES:
+                continue
+
+            parts = name.split("/")
+            candidates = [parts[-1].split("_")[0]]
+            if len(parts) > 1:
+                candidates.insert(0, parts[0])
+            entries.append((info, candidates))
+
+        if not entries:
+            return {}, []
+
+        all_candidates = {nim for _, candidates in entries for nim in candidates}
+        student_ids = dict(
+            db.exec(
+                select(Student.nim, Student.student_id).where(
+                    Student.nim.in_(list(all_candidates))
+                )
+            ).all()
+        )
+
+        photos_by_student: Dict[int, List[bytes]] = {}
+        unknown: Set[str] = set()
+        for info, candidates in entries:
+            nim = next((nim for nim in candidates if nim in student_ids), None)
+            if nim is None:
+                unknown.add(candidates[0])
+                continue
+            photos = photos_by_student.setdefault(student_ids[nim], [])
+            if len(photos) < MAX_PHOTOS_PER_STUDENT:
+                photos.append(zf.read(info))
+
+    return photos_by_student, sorted(unknown)
+
+
+enrollment_service = EnrollmentService()
@@ -3,11 +3,11 @@ import numpy as np
 import base64
 import io
 from PIL import Image
-from keras.models import load_model  # type: ignore
+from keras.models import Model, load_model  # type: ignore
 import os
-import json
-from datetime import datetime
-from typing import Dict, Any, BinaryIO, Union, Tuple, Optional
+import threading
+from functools import lru_cache
+from typing import Dict, Any, BinaryIO, List, Union, Tuple, Optional
 import logging
 
 # Configure logging
@@ -16,6 +16,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Trained recognition model shipped with the service
+DEFAULT_MODEL_PATH = os.path.normpath(
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "model_face_recognition",
+        "model_eksperimen_3.keras",
+    )
+)
+
 
 class FaceVerificationService:
     """
@@ -36,9 +45,17 @@ class FaceVerificationService:
                 cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
             )
 
-            # Load the face recognition model
-            logger.info(f"Loading model from {model_path}")
-            self.model = load_model(model_path)
+            # Smile detection runs on the face ROI found by the face cascade
+            self.smile_cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + "haarcascade_smile.xml"
+            )
+
+            # The face recognition model is loaded on first use so that cheap
+            # stages (decode, face detection) never pay for it
+            self.model_path = model_path
+            self._model = None
+            self._embedding_model = None
+            self._model_lock = threading.Lock()
 
             # UPDATED: Class labels EXACTLY matching Colab version
             self.class_labels = [
@@ -88,6 +105,54 @@ class FaceVerificationService:
             logger.error(f"Error initializing face verification service: {e}")
             raise
 
+    @property
+    def model(self):
+        """
+        The face recognition model, loaded once per process on first access
+
+        Raises:
+            FileNotFoundError: If the model file does not exist
+        """
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    if not os.path.exists(self.model_path):
+                        raise FileNotFoundError(
+                            f"Face recognition model not found at {self.model_path}"
+                        )
+                    logger.info(f"Loading model from {self.model_path}")
+                    self._model = load_model(self.model_path)
+        return self._model
+
+    @property
+    def embedding_model(self):
+        """
+        The recognition model truncated at its penultimate layer
+
+        Its output is used as the face embedding for enrollment templates.
+        """
+        model = self.model
+        if self._embedding_model is None:
+            with self._model_lock:
+                if self._embedding_model is None:
+                    self._embedding_model = Model(
+                        inputs=model.inputs, outputs=model.layers[-2].output
+                    )
+        return self._embedding_model
+
+    @property
+    def model_version(self) -> str:
+        """
+        Identifier of the model file on disk, derived from its size and mtime
+
+        Changes whenever the model file is replaced, without loading the model.
+        """
+        try:
+            stat = os.stat(self.model_path)
+        except OSError:
+            return "missing"
+        return f"{os.path.basename(self.model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
     def extract_nim(self, prediction: str) -> Union[str, None]:
         """
         Extract NIM from the class label
@@ -166,6 +231,34 @@ class FaceVerificationService:
             logger.error(f"Error in face detection: {str(e)}")
             return None
 
+    def detect_smile(self, face: np.ndarray) -> bool:
+        """
+        Detect a smile in a cropped face
+
+        Only the lower half of the face ROI is searched, so no extra decode or
+        face detection pass is needed.
+
+        Args:
+            face: Cropped face image in BGR format
+
+        Returns:
+            True if a smile was detected
+        """
+        try:
+            gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY) if face.ndim == 3 else face
+            mouth_region = gray[gray.shape[0] // 2 :, :]
+            min_side = max(mouth_region.shape[1] // 5, 10)
+            smiles = self.smile_cascade.detectMultiScale(
+                mouth_region,
+                scaleFactor=1.7,
+                minNeighbors=20,
+                minSize=(min_side, min_side // 2),
+            )
+            return len(smiles) > 0
+        except Exception as e:
+            logger.error(f"Error in smile detection: {str(e)}")
+            return False
+
     def preprocess_face_for_model(self, face: np.ndarray) -> np.ndarray:
         """
         Preprocess detected face for model input - EXACTLY SAME AS COLAB
@@ -228,6 +321,216 @@ class FaceVerificationService:
             logger.error(f"Error converting input to image: {str(e)}")
             return None
 
+    def decode_image(
+        self, img_data: Union[str, bytes, BinaryIO]
+    ) -> Optional[np.ndarray]:
+        """
+        Decode input data into a BGR image ready for OpenCV operations
+
+        Args:
+            img_data: Can be a base64 string, a file path, or binary image data
+
+        Returns:
+            Image as numpy array or None if decoding fails
+        """
+        img = self.convert_input_to_image(img_data)
+        if img is None:
+            return None
+        return self.preprocess_image_for_opencv(img)
+
+    def classify_face(
+        self,
+        face: np.ndarray,
+        nim: str,
+        confidence_threshold: float = 0.5,
+    ) -> Dict[str, Any]:
+        """
+        Run the recognition model on a cropped face and compare with the expected NIM
+
+        Args:
+            face: Cropped face image
+            nim: The student NIM to verify against
+            confidence_threshold: Minimum confidence threshold for verification
+
+        Returns:
+            Dict containing verification results (without face coordinates)
+        """
+        return self.classify_faces([face], nim, confidence_threshold)[0]
+
+    def classify_faces(
+        self,
+        faces: List[np.ndarray],
+        nim: str,
+        confidence_threshold: float = 0.5,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the recognition model once on a batch of cropped faces
+
+        Args:
+            faces: Cropped face images of the same person
+            nim: The student NIM to verify against
+            confidence_threshold: Minimum confidence threshold for verification
+
+        Returns:
+            One verification result dict per face, in input order
+        """
+        # Preprocess faces for model - EXACTLY SAME AS COLAB
+        batch = np.concatenate(
+            [self.preprocess_face_for_model(face) for face in faces], axis=0
+        )
+
+        # Get prediction from model - SAME AS COLAB
+        logger.info(f"Running face recognition model inference on {len(faces)} face(s)")
+        predictions = self.model.predict(batch, verbose=0)
+
+        return [
+            self._interpret_prediction(prediction, nim, confidence_threshold)
+            for prediction in predictions
+        ]
+
+    def embed_faces(self, faces: List[np.ndarray]) -> np.ndarray:
+        """
+        Compute L2-normalised embeddings for a batch of cropped faces
+
+        Args:
+            faces: Cropped face images
+
+        Returns:
+            Float32 array of shape (len(faces), embedding_dim)
+        """
+        batch = np.concatenate(
+            [self.preprocess_face_for_model(face) for face in faces], axis=0
+        )
+        embeddings = self.embedding_model.predict(batch, verbose=0)
+        embeddings = embeddings.reshape(len(faces), -1).astype(np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def analyse_faces(
+        self,
+        faces: List[np.ndarray],
+        nim: str,
+        confidence_threshold: float = 0.5,
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify a batch of cropped faces and detect a smile on each of them
+
+        Args:
+            faces: Cropped face images of the same person
+            nim: The student NIM to verify against
+            confidence_threshold: Minimum confidence threshold for verification
+
+        Returns:
+            One verification result dict per face, each with a smile_detected flag
+        """
+        results = self.classify_faces(faces, nim, confidence_threshold)
+        for face, result in zip(faces, results):
+            result["smile_detected"] = self.detect_smile(face)
+        return results
+
+    def match_template(
+        self,
+        faces: List[np.ndarray],
+        template: np.ndarray,
+        nim: str,
+        similarity_threshold: float,
+    ) -> List[Dict[str, Any]]:
+        """
+        Compare a batch of cropped faces with a student's enrolled face template
+
+        The confidence of each result is the cosine similarity between the
+        face's embedding and the template, so the result dicts have the same
+        keys as those of analyse_faces.
+
+        Args:
+            faces: Cropped face images of the same person
+            template: The student's enrolled template (see enrollment_service)
+            nim: The NIM of the student the template belongs to
+            similarity_threshold: Minimum cosine similarity for verification
+
+        Returns:
+            One verification result dict per face, each with a smile_detected flag
+        """
+        template = template / max(float(np.linalg.norm(template)), 1e-12)
+        similarities = self.embed_faces(faces) @ template
+
+        results = []
+        for face, similarity in zip(faces, similarities):
+            similarity = float(similarity)
+            verified = similarity >= similarity_threshold
+            if verified:
+                message = "Face verified successfully"
+            else:
+                message = (
+                    "Face verification failed: Low similarity to the enrolled "
+                    f"face ({similarity:.4f})"
+                )
+
+            logger.info(
+                f"Template match: verified={verified}, similarity={similarity:.4f}, "
+                f"expected_nim={nim}"
+            )
+
+            results.append(
+                {
+                    "verified": verified,
+                    "message": message,
+                    "confidence": similarity,
+                    "predicted_nim": nim if verified else None,
+                    "predicted_name": "",
+                    "confidence_threshold": similarity_threshold,
+                    "nim_match": verified,
+                    "confidence_ok": verified,
+                    "smile_detected": self.detect_smile(face),
+                }
+            )
+        return results
+
+    def _interpret_prediction(
+        self, prediction: np.ndarray, nim: str, confidence_threshold: float
+    ) -> Dict[str, Any]:
+        predicted_class_idx = np.argmax(prediction)
+        confidence = float(prediction[predicted_class_idx])
+        predicted_class = self.class_labels[predicted_class_idx]
+
+        logger.info(
+            f"Model prediction: {predicted_class} with confidence: {confidence:.4f}"
+        )
+
+        # Extract NIM from prediction
+        predicted_nim = self.extract_nim(predicted_class)
+
+        # Check if predicted NIM matches expected NIM AND confidence is above threshold
+        nim_match = bool(predicted_nim and predicted_nim == nim)
+        confidence_ok = confidence >= confidence_threshold
+        verified = nim_match and confidence_ok
+
+        # Create detailed message
+        if not nim_match and not confidence_ok:
+            message = f"Face verification failed: Wrong person (predicted: {predicted_class}) and low confidence ({confidence:.4f})"
+        elif not nim_match:
+            message = f"Face verification failed: Wrong person (predicted: {predicted_class})"
+        elif not confidence_ok:
+            message = f"Face verification failed: Low confidence ({confidence:.4f})"
+        else:
+            message = "Face verified successfully"
+
+        logger.info(
+            f"Face verification result: verified={verified}, confidence={confidence:.4f}, "
+            f"predicted={predicted_class}, expected_nim={nim}, nim_match={nim_match}, confidence_ok={confidence_ok}"
+        )
+
+        return {
+            "verified": verified,
+            "message": message,
+            "confidence": confidence,
+            "predicted_nim": predicted_nim,
+            "predicted_name": predicted_class,
+            "confidence_threshold": confidence_threshold,
+            "nim_match": nim_match,
+            "confidence_ok": confidence_ok,
+        }
+
     def verify_face(
         self,
         img_data: Union[str, bytes, BinaryIO],
@@ -247,8 +550,8 @@ class FaceVerificationService:
             Dict containing verification results
         """
         try:
-            # Convert image data to numpy array
-            img = self.convert_input_to_image(img_data)
+            # Convert image data to a BGR numpy array
+            img = self.decode_image(img_data)
             if img is None:
                 return {
                     "verified": False,
@@ -259,9 +562,6 @@ class FaceVerificationService:
                     "face_coords": None,
                 }
 
-            # Preprocess image for OpenCV operations
-            img = self.preprocess_image_for_opencv(img)
-
             # Detect face - SAME AS COLAB
             face_result = self.detect_face(img)
             if face_result is None:
@@ -275,55 +575,9 @@ class FaceVerificationService:
                 }
 
             face, face_coords = face_result
-
-            # Preprocess face for model - EXACTLY SAME AS COLAB
-            face_processed = self.preprocess_face_for_model(face)
-
-            # Get prediction from model - SAME AS COLAB
-            logger.info("Running face recognition model inference")
-            prediction = self.model.predict(face_processed, verbose=0)
-            predicted_class_idx = np.argmax(prediction)
-            confidence = float(prediction[0][predicted_class_idx])
-            predicted_class = self.class_labels[predicted_class_idx]
-
-            logger.info(
-                f"Model prediction: {predicted_class} with confidence: {confidence:.4f}"
-            )
-
-            # Extract NIM from prediction
-            predicted_nim = self.extract_nim(predicted_class)
-
-            # Check if predicted NIM matches expected NIM AND confidence is above threshold
-            nim_match = predicted_nim and predicted_nim == nim
-            confidence_ok = confidence >= confidence_threshold
-            verified = nim_match and confidence_ok
-
-            # Create detailed message
-            if not nim_match and not confidence_ok:
-                message = f"Face verification failed: Wrong person (predicted: {predicted_class}) and low confidence ({confidence:.4f})"
-            elif not nim_match:
-                message = f"Face verification failed: Wrong person (predicted: {predicted_class})"
-            elif not confidence_ok:
-                message = f"Face verification failed: Low confidence ({confidence:.4f})"
-            else:
-                message = "Face verified successfully"
-
-            logger.info(
-                f"Face verification result: verified={verified}, confidence={confidence:.4f}, "
-                f"predicted={predicted_class}, expected_nim={nim}, nim_match={nim_match}, confidence_ok={confidence_ok}"
-            )
-
-            return {
-                "verified": verified,
-                "message": message,
-                "confidence": confidence,
-                "predicted_nim": predicted_nim,
-                "predicted_name": predicted_class,
-                "face_coords": face_coords,
-                "confidence_threshold": confidence_threshold,
-                "nim_match": nim_match,
-                "confidence_ok": confidence_ok,
-            }
+            result = self.classify_face(face, nim, confidence_threshold)
+            result["face_coords"] = face_coords
+            return result
 
         except Exception as e:
             logger.error(f"Error during face verification: {str(e)}")
@@ -399,119 +653,12 @@ class FaceVerificationService:
         }
 
 
-async def student_check_in_with_verification(
-    db,
-    attendance_id: int,
-    check_in_data,
-    image_file,
-    current_user,
-    model_path="/model_face_recognition/mobilenetv2_model-1a.keras",
-    confidence_threshold: float = 0.5,  # Added configurable threshold
-):
-    """
-    Process student check-in with face verification
-    Only allows check-in if face is verified with improved accuracy
-
-    Args:
-        db: Database session
-        attendance_id: ID of the attendance record
-        check_in_data: Check-in data object
-        image_file: Uploaded image file
-        current_user: Current user object
-        model_path: Path to face recognition model
-        confidence_threshold: Minimum confidence threshold for verification
-
-    Returns:
-        Dict with check-in results
+@lru_cache(maxsize=None)
+def get_face_verification_service(model_path: str) -> FaceVerificationService:
     """
-    try:
-        # Create face verification service
-        face_service = FaceVerificationService(model_path)
-
-        # Get student NIM from current user
-        nim = current_user.nim
-
-        # Read image file
-        content = await image_file.read()
-
-        # Process image for verification with threshold
-        verification_result = face_service.verify_face(
-            content, nim, confidence_threshold
-        )
+    Return the process-wide face verification service for a model path
 
-        # Store comprehensive verification data
-        face_verification_data = json.dumps(
-            {
-                "verified": verification_result["verified"],
-                "confidence": verification_result["confidence"],
-                "predicted_name": verification_result.get("predicted_name", ""),
-                "predicted_nim": verification_result.get("predicted_nim", ""),
-                "expected_nim": nim,
-                "confidence_threshold": confidence_threshold,
-                "nim_match": verification_result.get("nim_match", False),
-                "confidence_ok": verification_result.get("confidence_ok", False),
-                "timestamp": str(datetime.now()),
-            }
-        )
-
-        logger.info(
-            f"Verification result for student {nim}: {verification_result['verified']} "
-            f"(confidence: {verification_result['confidence']:.4f})"
-        )
-
-        # Only proceed with check-in if face verification is successful
-        if verification_result["verified"]:
-            # Save image to uploads directory
-            upload_dir = "uploads/attendance_images"
-            os.makedirs(upload_dir, exist_ok=True)
-
-            # Create filename using attendance_id and timestamp
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            file_extension = os.path.splitext(image_file.filename)[1]
-            filename = f"attendance_{attendance_id}_{timestamp}{file_extension}"
-            file_path = os.path.join(upload_dir, filename)
-
-            # Reset file position for reading again
-            await image_file.seek(0)
-            content = await image_file.read()
-
-            # Save image
-            with open(file_path, "wb") as buffer:
-                buffer.write(content)
-
-            # Set image URL
-            image_url = f"/uploads/attendance_images/{filename}"
-
-            # Update check-in data with verification results
-            check_in_data.face_verification_data = face_verification_data
-
-            # Process check-in
-            from app.crud.attendance import student_check_in
-
-            updated_attendance = student_check_in(
-                db=db,
-                attendance_id=attendance_id,
-                check_in_data=check_in_data,
-                image_captured_url=image_url,
-            )
-
-            return {
-                "success": True,
-                "message": "Check-in successful with face verification",
-                "attendance": updated_attendance,
-                "verification": verification_result,
-            }
-        else:
-            return {
-                "success": False,
-                "message": f"Check-in denied: {verification_result['message']}",
-                "verification": verification_result,
-            }
-
-    except Exception as e:
-        logger.error(f"Error during check-in with verification: {str(e)}")
-        return {
-            "success": False,
-            "message": f"Error during check-in: {str(e)}",
-            "verification": {"verified": False, "message": str(e)},
-        }
+    The Haar cascade is loaded once here and the model on first inference,
+    instead of both being reloaded for every check-in request.
+    """
+    return FaceVerificationService(model_path)
@@ -0,0 +1,309 @@
+# app/services/geofence_service.py
+
+import json
+import math
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.models.room import Room
+from app.services.invalidation_bus import invalidation_bus
+
+# Mean Earth radius in meters (IUGG)
+EARTH_RADIUS_M = 6371008.8
+
+# Grid cell size in degrees (~1.1 km of latitude)
+GRID_CELL_DEGREES = 0.01
+
+# Rings of grid cells searched before falling back to a full vectorised scan
+MAX_GRID_RINGS = 8
+
+# Reported GPS accuracy is added to the room radius, but never more than this
+MAX_ACCURACY_ALLOWANCE_M = 30.0
+
+ROOM_INDEX_TOPIC = "room_index"
+
+
+def haversine_distances(
+    latitude: float,
+    longitude: float,
+    latitudes: Union[np.ndarray, List[float]],
+    longitudes: Union[np.ndarray, List[float]],
+) -> np.ndarray:
+    """
+    Great-circle distances in meters from one point to many points.
+
+    Args:
+        latitude: Latitude of the reference point in degrees
+        longitude: Longitude of the reference point in degrees
+        latitudes: Latitudes of the target points in degrees
+        longitudes: Longitudes of the target points in degrees
+
+    Returns:
+        Array of distances in meters, one per target point
+    """
+    lat1 = np.radians(latitude)
+    lon1 = np.radians(longitude)
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon2 = np.radians(np.asarray(longitudes, dtype=np.float64))
+
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def parse_location(location_data: Any) -> Optional[Tuple[float, float, float]]:
+    """
+    Extract (latitude, longitude, accuracy) from client supplied location data.
+
+    Accepts a dict or a JSON string using either latitude/longitude or
+    lat/lng (lon) keys. Accuracy defaults to 0 when the client omits it.
+
+    Returns:
+        Tuple of (latitude, longitude, accuracy) or None if coordinates are missing
+    """
+    if location_data is None:
+        return None
+
+    if isinstance(location_data, str):
+        try:
+            location_data = json.loads(location_data)
+        except json.JSONDecodeError:
+            return None
+
+    if not isinstance(location_data, dict):
+        return None
+
+    latitude = location_data.get("latitude", location_data.get("lat"))
+    longitude = location_data.get(
+        "longitude", location_data.get("lng", location_data.get("lon"))
+    )
+    accuracy = location_data.get("accuracy") or 0.0
+
+    try:
+        latitude = float(latitude)
+        longitude = float(longitude)
+        accuracy = max(float(accuracy), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        return None
+
+    return latitude, longitude, accuracy
+
+
+class RoomIndex:
+    """
+    In-memory spatial index over all rooms.
+
+    Rooms are bucketed into a uniform latitude/longitude grid so that a
+    nearest-room lookup only computes distances for rooms in the cells around
+    the query point. The index is built lazily from the database and dropped
+    whenever a room is created, updated or deleted.
+    """
+
+    def __init__(self, cell_degrees: float = GRID_CELL_DEGREES):
+        self._cell_degrees = cell_degrees
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._rooms: Dict[int, Dict[str, Any]] = {}
+        self._ids = np.empty(0, dtype=np.int64)
+        self._latitudes = np.empty(0, dtype=np.float64)
+        self._longitudes = np.empty(0, dtype=np.float64)
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._cell_bounds = (0, 0, 0, 0)
+
+    def invalidate(self) -> None:
+        """Drop the index on every worker so lookups reload rooms."""
+        invalidation_bus.publish(ROOM_INDEX_TOPIC)
+
+    def _drop(self, key: Optional[str] = None, event_id: Optional[int] = None):
+        with self._lock:
+            self._loaded = False
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (
+            math.floor(latitude / self._cell_degrees),
+            math.floor(longitude / self._cell_degrees),
+        )
+
+    def _ensure_loaded(self, db: Session) -> None:
+        if self._loaded:
+            return
+
+        rows = db.exec(
+            select(Room.room_id, Room.name, Room.latitude, Room.longitude, Room.radius)
+        ).all()
+
+        self._rooms = {
+            room_id: {
+                "room_id": room_id,
+                "name": name,
+                "latitude": latitude,
+                "longitude": longitude,
+                "radius": radius,
+            }
+            for room_id, name, latitude, longitude, radius in rows
+        }
+        self._ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self._latitudes = np.array([row[2] for row in rows], dtype=np.float64)
+        self._longitudes = np.array([row[3] for row in rows], dtype=np.float64)
+
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for position, (latitude, longitude) in enumerate(
+            zip(self._latitudes, self._longitudes)
+        ):
+            cells.setdefault(self._cell(latitude, longitude), []).append(position)
+        self._cells = cells
+
+        if cells:
+            rows_idx = [cell[0] for cell in cells]
+            cols_idx = [cell[1] for cell in cells]
+            self._cell_bounds = (
+                min(rows_idx),
+                max(rows_idx),
+                min(cols_idx),
+                max(cols_idx),
+            )
+        self._loaded = True
+
+    def get_room(self, db: Session, room_id: int) -> Optional[Dict[str, Any]]:
+        """Return the cached room attributes for a room ID, or None."""
+        with self._lock:
+            self._ensure_loaded(db)
+            return self._rooms.get(room_id)
+
+    def nearest(
+        self, db: Session, latitude: float, longitude: float
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Find the room closest to a point.
+
+        Searches grid cells in growing rings around the query cell and stops as
+        soon as no unvisited ring can hold a closer room.
+
+        Returns:
+            Tuple of (room attributes, distance in meters) or None if no rooms exist
+        """
+        with self._lock:
+            self._ensure_loaded(db)
+            if not self._cells:
+                return None
+
+            center_row, center_col = self._cell(latitude, longitude)
+            min_row, max_row, min_col, max_col = self._cell_bounds
+            max_ring = max(
+                abs(center_row - min_row),
+                abs(center_row - max_row),
+                abs(center_col - min_col),
+                abs(center_col - max_col),
+            )
+            # Shortest side of a grid cell at this latitude, in meters
+            cell_meters = (
+                math.radians(self._cell_degrees)
+                * EARTH_RADIUS_M
+                * max(math.cos(math.radians(abs(latitude) + self._cell_degrees)), 1e-6)
+            )
+
+            best_position = None
+            best_distance = math.inf
+            resolved = False
+            for ring in range(min(max_ring, MAX_GRID_RINGS) + 1):
+                # Every room in this ring or beyond is at least this far away
+                if (
+                    best_position is not None
+                    and best_distance <= (ring - 1) * cell_meters
+                ):
+                    resolved = True
+                    break
+
+                candidates: List[int] = []
+                for row in range(center_row - ring, center_row + ring + 1):
+                    for col in range(center_col - ring, center_col + ring + 1):
+                        if max(abs(row - center_row), abs(col - center_col)) != ring:
+                            continue
+                        candidates.extend(self._cells.get((row, col), ()))
+
+                if not candidates:
+                    continue
+
+                positions = np.asarray(candidates, dtype=np.int64)
+                distances = haversine_distances(
+                    latitude,
+                    longitude,
+                    self._latitudes[positions],
+                    self._longitudes[positions],
+                )
+                closest = int(np.argmin(distances))
+                if distances[closest] < best_distance:
+                    best_distance = float(distances[closest])
+                    best_position = int(positions[closest])
+            else:
+                resolved = max_ring <= MAX_GRID_RINGS
+
+            if not resolved:
+                # The point is far from every room: scan all rooms at once
+                distances = haversine_distances(
+                    latitude, longitude, self._latitudes, self._longitudes
+                )
+                best_position = int(np.argmin(distances))
+                best_distance = float(distances[best_position])
+
+            room = self._rooms[int(self._ids[best_position])]
+            return room, best_distance
+
+
+def check_geofence(room: Dict[str, Any], location_data: Any) -> Dict[str, Any]:
+    """
+    Verify that a reported location lies inside a room's geofence.
+
+    Args:
+        room: Room attributes with latitude, longitude and radius
+        location_data: Client supplied location (dict or JSON string)
+
+    Returns:
+        Dict with the verification outcome, distance and allowed radius
+    """
+    location = parse_location(location_data)
+    if location is None:
+        return {
+            "within_radius": False,
+            "message": "Location data with latitude and longitude is required",
+            "room_id": room["room_id"],
+            "distance_m": None,
+            "allowed_radius_m": room["radius"],
+        }
+
+    latitude, longitude, accuracy = location
+    distance = float(
+        haversine_distances(
+            latitude, longitude, [room["latitude"]], [room["longitude"]]
+        )[0]
+    )
+    allowed_radius = room["radius"] + min(accuracy, MAX_ACCURACY_ALLOWANCE_M)
+    within_radius = distance <= allowed_radius
+
+    if within_radius:
+        message = "Location verified"
+    else:
+        message = (
+            f"You are {distance:.0f} m from {room['name']} "
+            f"(allowed {allowed_radius:.0f} m)"
+        )
+
+    return {
+        "within_radius": within_radius,
+        "message": message,
+        "room_id": room["room_id"],
+        "distance_m": round(distance, 2),
+        "allowed_radius_m": round(allowed_radius, 2),
+    }
+
+
+room_index = RoomIndex()
+invalidation_bus.subscribe(ROOM_INDEX_TOPIC, room_index._drop)
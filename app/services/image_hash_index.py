@@ -0,0 +1,327 @@
+# app/services/image_hash_index.py
+
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from sqlmodel import Session, delete, select
+
+from app.models.attendance import Attendance
+from app.models.attendance_image_hash import AttendanceImageHash
+from app.services.face_verification_service import (
+    DEFAULT_MODEL_PATH,
+    get_face_verification_service,
+)
+from app.services.invalidation_bus import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+# Hashes within this Hamming distance (out of 64 bits) are treated as the same photo
+NEAR_DUPLICATE_MAX_DISTANCE = 6
+
+# At most this many earlier check-ins are reported per near-duplicate match
+MAX_REPORTED_MATCHES = 5
+
+ATTENDANCE_IMAGE_DIR = "uploads/attendance_images"
+
+# Stored check-in images are named attendance_{attendance_id}_{timestamp}.{ext}
+ATTENDANCE_IMAGE_PATTERN = re.compile(r"^attendance_(\d+)_\d+\.\w+$")
+
+IMAGE_HASH_INDEX_TOPIC = "image_hash_index"
+
+
+def dhash(image: np.ndarray, hash_size: int = 8) -> int:
+    """
+    Difference hash of an image.
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale thumbnail
+    and each bit records whether a pixel is brighter than its right neighbour,
+    so re-encoded, resized or slightly recompressed copies of a photo hash to
+    values a few bits apart.
+
+    Args:
+        image: Image in BGR (or grayscale) format
+        hash_size: Side length of the hash grid; 8 gives a 64-bit hash
+
+    Returns:
+        The hash as an unsigned integer
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    thumbnail = cv2.resize(
+        image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA
+    )
+    bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def format_hash(value: int) -> str:
+    return f"{value:016x}"
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes using Hamming distance.
+
+    Each node keeps its children keyed by their distance to it; the triangle
+    inequality lets a radius search skip every subtree whose edge distance is
+    outside [d - radius, d + radius], so lookups touch a small fraction of the
+    stored hashes.
+    """
+
+    def __init__(self):
+        # Node layout: [hash, values, {distance: child}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item: Any) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                # Adding the same item twice is a no-op
+                if item in node[1]:
+                    self._size -= 1
+                else:
+                    node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, Any]]:
+        """Return (distance, item) pairs for every hash within `radius` of `value`."""
+        if self._root is None:
+            return []
+
+        matches = []
+        stack = [self._root]
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = hamming_distance(value, node_value)
+            if distance <= radius:
+                matches.extend((distance, item) for item in items)
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return sorted(matches, key=lambda match: match[0])
+
+
+class ImageHashIndex:
+    """
+    In-memory BK-tree of the perceptual hashes of accepted check-in photos.
+
+    Built lazily from the AttendanceImageHash table and kept up to date as
+    check-ins are recorded on any worker, so a replayed selfie can be flagged
+    without comparing it against the whole image archive.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._tree = BKTree()
+
+    def invalidate(self) -> None:
+        """Drop the index on every worker so lookups reload hashes."""
+        invalidation_bus.publish(IMAGE_HASH_INDEX_TOPIC)
+
+    def _apply(self, key: Optional[str], event_id: Optional[int] = None) -> None:
+        """
+        Invalidation bus handler: key is "attendance_id:student_id:hash" for a
+        recorded photo, or None to drop the whole index.
+        """
+        with self._lock:
+            if key is None:
+                self._loaded = False
+            elif self._loaded:
+                attendance_id, student_id, image_hash = key.split(":")
+                self._tree.add(
+                    int(image_hash, 16), (int(attendance_id), int(student_id))
+                )
+
+    def _ensure_loaded(self, db: Session) -> None:
+        if self._loaded:
+            return
+
+        rows = db.exec(
+            select(
+                AttendanceImageHash.image_hash,
+                AttendanceImageHash.attendance_id,
+                AttendanceImageHash.student_id,
+            ).join(
+                Attendance,
+                Attendance.attendance_id == AttendanceImageHash.attendance_id,
+            )
+        ).all()
+
+        tree = BKTree()
+        for image_hash, attendance_id, student_id in rows:
+            tree.add(int(image_hash, 16), (attendance_id, student_id))
+        self._tree = tree
+        self._loaded = True
+
+    def find_near_duplicates(
+        self,
+        db: Session,
+        image_hash: int,
+        exclude_attendance_id: Optional[int] = None,
+        max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE,
+    ) -> List[Dict[str, int]]:
+        """
+        Find earlier check-in photos that look like the given one.
+
+        Returns:
+            Up to MAX_REPORTED_MATCHES matches, closest first, each with
+            attendance_id, student_id and distance
+        """
+        with self._lock:
+            self._ensure_loaded(db)
+            matches = self._tree.search(image_hash, max_distance)
+
+        return [
+            {
+                "attendance_id": attendance_id,
+                "student_id": student_id,
+                "distance": distance,
+            }
+            for distance, (attendance_id, student_id) in matches
+            if attendance_id != exclude_attendance_id
+        ][:MAX_REPORTED_MATCHES]
+
+    def record(
+        self, db: Session, attendance_id: int, student_id: int, image_hash: int
+    ) -> None:
+        """
+        Add the hash of a check-in photo to every loaded index once db commits.
+        Call before the commit that stores the hash.
+        """
+        invalidation_bus.publish_in(
+            db,
+            IMAGE_HASH_INDEX_TOPIC,
+            f"{attendance_id}:{student_id}:{format_hash(image_hash)}",
+        )
+
+
+image_hash_index = ImageHashIndex()
+invalidation_bus.subscribe(IMAGE_HASH_INDEX_TOPIC, image_hash_index._apply)
+
+
+def _face_region(
+    face_service, image: np.ndarray, verification_data: Optional[dict]
+) -> np.ndarray:
+    """
+    The part of a stored check-in image that the check-in hashed.
+
+    Face-crop uploads were hashed whole; full frames and burst frames at the
+    face coordinates recorded in face_verification_data, or at the detected
+    face for records without them.
+    """
+    # Imported here to avoid circular imports
+    from app.services.check_in_pipeline import MODE_FACE_CROP
+
+    if not isinstance(verification_data, dict):
+        verification_data = {}
+    if verification_data.get("mode") == MODE_FACE_CROP:
+        return image
+
+    coords = verification_data.get("face_coords")
+    if coords and len(coords) == 4:
+        x, y, width, height = (int(value) for value in coords)
+        face = image[y : y + height, x : x + width]
+        if face.size:
+            return face
+
+    face_result = face_service.detect_face(image)
+    return face_result[0] if face_result is not None else image
+
+
+def rebuild_image_hashes(db: Session, directory: str = ATTENDANCE_IMAGE_DIR) -> int:
+    """
+    Recompute the stored hashes from the check-in image archive.
+
+    Scans `directory` for attendance_{id}_{timestamp} images, hashes the face
+    region of the most recent image of every attendance that still exists and
+    replaces the contents of the AttendanceImageHash table. Images are decoded
+    and cropped exactly as the check-in did (see _face_region), so the hashes
+    match those of new check-ins.
+
+    Returns:
+        Number of hashes stored
+    """
+    filenames = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    # Timestamps sort lexicographically, so the last file per attendance wins
+    latest: Dict[int, str] = {}
+    for filename in filenames:
+        match = ATTENDANCE_IMAGE_PATTERN.match(filename)
+        if match:
+            latest[int(match.group(1))] = filename
+
+    owners: Dict[int, Tuple[int, Optional[dict]]] = {}
+    if latest:
+        rows = db.exec(
+            select(
+                Attendance.attendance_id,
+                Attendance.student_id,
+                Attendance.face_verification_data,
+            ).where(Attendance.attendance_id.in_(list(latest)))
+        ).all()
+        owners = {
+            attendance_id: (student_id, verification_data)
+            for attendance_id, student_id, verification_data in rows
+        }
+
+    face_service = get_face_verification_service(DEFAULT_MODEL_PATH)
+    db.exec(delete(AttendanceImageHash))
+    stored = 0
+    for attendance_id, filename in latest.items():
+        if attendance_id not in owners:
+            continue
+        student_id, verification_data = owners[attendance_id]
+
+        with open(os.path.join(directory, filename), "rb") as image_file:
+            image = face_service.decode_image(image_file.read())
+        if image is None or image.ndim != 3:
+            logger.warning(f"Skipping unreadable attendance image {filename}")
+            continue
+
+        face = _face_region(face_service, image, verification_data)
+        db.add(
+            AttendanceImageHash(
+                attendance_id=attendance_id,
+                student_id=student_id,
+                image_hash=format_hash(dhash(face)),
+            )
+        )
+        stored += 1
+
+    db.commit()
+    image_hash_index.invalidate()
+    return stored
+
+
+if __name__ == "__main__":
+    from app.dependencies import create_db_and_tables, engine
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        count = rebuild_image_hashes(session)
+    print(f"Stored {count} attendance image hashes")
@@ -0,0 +1,100 @@
+# app/services/image_quality.py
+
+from typing import Dict, Optional, Sequence
+
+import cv2
+import numpy as np
+
+# Frames are downscaled to this width before scoring so the checks stay cheap
+QUALITY_SAMPLE_WIDTH = 160
+
+# Variance of the Laplacian below this is treated as a blurry photo
+MIN_SHARPNESS = 40.0
+
+# Acceptable mean luminance range (0-255)
+MIN_BRIGHTNESS = 50.0
+MAX_BRIGHTNESS = 220.0
+
+# Detected face box must cover at least this fraction of the frame area
+MIN_FACE_AREA_RATIO = 0.03
+
+
+def _sample_gray(image: np.ndarray) -> np.ndarray:
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    height, width = gray.shape[:2]
+    if width > QUALITY_SAMPLE_WIDTH:
+        scale = QUALITY_SAMPLE_WIDTH / width
+        gray = cv2.resize(
+            gray,
+            (QUALITY_SAMPLE_WIDTH, max(int(height * scale), 1)),
+            interpolation=cv2.INTER_AREA,
+        )
+    return gray
+
+
+def measure_frame(image: np.ndarray) -> Dict[str, float]:
+    """
+    Score sharpness and brightness of a frame on a small grayscale sample.
+
+    Args:
+        image: Image in BGR format
+
+    Returns:
+        Dictionary with sharpness (variance of the Laplacian) and brightness
+        (mean luminance)
+    """
+    gray = _sample_gray(image)
+    return {
+        "sharpness": round(float(cv2.Laplacian(gray, cv2.CV_64F).var()), 2),
+        "brightness": round(float(gray.mean()), 2),
+    }
+
+
+def face_area_ratio(image: np.ndarray, face_coords: Sequence[int]) -> float:
+    """Fraction of the frame area covered by a (x, y, w, h) face box."""
+    frame_height, frame_width = image.shape[:2]
+    _, _, width, height = face_coords
+    return round((width * height) / float(frame_width * frame_height), 4)
+
+
+def frame_quality_problem(scores: Dict[str, float]) -> Optional[str]:
+    """
+    Explain why a frame is unusable for recognition, or None if it is fine.
+
+    Returns:
+        A message the student can act on
+    """
+    if scores["brightness"] < MIN_BRIGHTNESS:
+        return "Photo is too dark; move to a brighter place and try again"
+    if scores["brightness"] > MAX_BRIGHTNESS:
+        return "Photo is overexposed; avoid direct light behind or on the camera"
+    if scores["sharpness"] < MIN_SHARPNESS:
+        return "Photo is blurry; hold the phone steady and try again"
+    return None
+
+
+def frontalness(face: np.ndarray) -> float:
+    """
+    Left-right symmetry of a face crop, from 0 (profile) to 1 (frontal).
+
+    A turned or tilted head breaks the mirror symmetry of a frontal face, so
+    this is a cheap proxy for how usable the crop is for recognition.
+    """
+    gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY) if face.ndim == 3 else face
+    sample = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(
+        np.float32
+    )
+    difference = np.abs(sample - sample[:, ::-1]).mean() / 255.0
+    return round(float(1.0 - difference), 4)
+
+
+def frame_score(scores: Dict[str, float]) -> float:
+    """
+    Rank a burst frame by sharpness, face size and frontalness.
+
+    Sharpness and face size saturate at four times their minimum so that one
+    very sharp frame cannot outweigh a frontal one.
+    """
+    sharpness = min(scores["sharpness"] / (4 * MIN_SHARPNESS), 1.0)
+    face_size = min(scores["face_area_ratio"] / (4 * MIN_FACE_AREA_RATIO), 1.0)
+    return round(sharpness + face_size + scores["frontalness"], 4)
@@ -0,0 +1,293 @@
+# app/services/invalidation_bus.py
+
+import logging
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.invalidation_event import InvalidationEvent
+from app.services.metrics import metrics
+from app.utils.time_utils import get_indonesia_time
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls; other workers see an invalidation within about this
+# delay
+INVALIDATION_POLL_SECONDS = float(os.getenv("INVALIDATION_POLL_SECONDS", "0.5"))
+
+# Events older than this are pruned from the table
+INVALIDATION_RETENTION = timedelta(days=1)
+
+# Prune once every this many polls (about an hour at the default interval)
+INVALIDATION_PRUNE_EVERY = 7200
+
+# Called with the event key (None means "everything") and the event ID (None
+# while the bus is not started)
+Handler = Callable[[Optional[str], Optional[int]], None]
+
+# Session.info key of the events queued by publish_in()
+PENDING_EVENTS = "invalidation_bus.pending"
+
+
+@dataclass
+class _PendingEvent:
+    """An event added to a session, handled locally once the session commits."""
+
+    bus: "InvalidationBus"
+    row: InvalidationEvent
+    topic: str
+    key: Optional[str]
+    # Known once the row is flushed; the commit expires the row itself
+    event_id: Optional[int] = None
+
+
+class InvalidationBus:
+    """
+    Broadcast of cache invalidations between uvicorn worker processes.
+
+    publish() runs the topic's handlers in the calling worker straight away
+    and appends the event to the invalidation_event table in the application
+    database; publish_in() adds the event to a session instead, so that it is
+    stored by the same commit as the change it announces. Each worker polls
+    that table from a background thread and runs the handlers for events
+    published elsewhere. A poll first compares PRAGMA data_version, which only
+    changes when another connection has committed, so an idle poll reads no
+    table. Until start() is called (scripts, single-process runs) events are
+    only handled locally.
+
+    Handlers must be idempotent: a worker may see its own event twice.
+    """
+
+    def __init__(self, poll_seconds: float = INVALIDATION_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        # Topics whose newest event per key is kept and replayed by start()
+        self._replayed: Set[str] = set()
+        self._engine = None
+        self._last_event_id = 0
+        # Events this worker published and already handled
+        self._own: Set[int] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, topic: str, handler: Handler, replay: bool = False) -> None:
+        """
+        Run handler for every event of topic.
+
+        With replay, the newest event of each key survives pruning and is
+        handed to the handler again when the worker starts, for state derived
+        from event IDs.
+        """
+        self._handlers[topic].append(handler)
+        if replay:
+            self._replayed.add(topic)
+
+    def _dispatch(self, topic: str, key: Optional[str], event_id: Optional[int]):
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(key, event_id)
+            except Exception:
+                logger.exception("Invalidation handler for %s failed", topic)
+                metrics.increment("invalidation_bus.handler_errors", topic=topic)
+
+    def publish(self, topic: str, key: Optional[str] = None) -> Optional[int]:
+        """
+        Invalidate topic/key on every worker. Call after the write has been
+        committed.
+
+        Returns:
+            The event ID, or None if the bus is not started or the event could
+            not be stored (the local handlers still run)
+        """
+        event_id = None
+        engine = self._engine
+        if engine is not None:
+            try:
+                with engine.begin() as connection:
+                    event_id = connection.execute(
+                        insert(InvalidationEvent).values(
+                            topic=topic, key=key, created_at=get_indonesia_time()
+                        )
+                    ).inserted_primary_key[0]
+                with self._lock:
+                    self._own.add(event_id)
+            except SQLAlchemyError:
+                logger.exception("Could not publish invalidation %s %s", topic, key)
+                metrics.increment("invalidation_bus.publish_errors", topic=topic)
+
+        metrics.increment("invalidation_bus.published", topic=topic)
+        self._dispatch(topic, key, event_id)
+        return event_id
+
+    def publish_in(self, db: Session, topic: str, key: Optional[str] = None) -> None:
+        """
+        Invalidate topic/key on every worker once db commits.
+
+        The event row joins the session's transaction, so the change and its
+        broadcast are written by one commit; the local handlers run after that
+        commit, and nothing is published if the session rolls back.
+        """
+        row = InvalidationEvent(topic=topic, key=key, created_at=get_indonesia_time())
+        db.add(row)
+        db.info.setdefault(PENDING_EVENTS, []).append(
+            _PendingEvent(bus=self, row=row, topic=topic, key=key)
+        )
+
+    def _flushed(self, pending: _PendingEvent) -> None:
+        # Marked as own before the commit so the poller skips it
+        pending.event_id = pending.row.event_id
+        with self._lock:
+            self._own.add(pending.event_id)
+
+    def _committed(self, pending: _PendingEvent) -> None:
+        metrics.increment("invalidation_bus.published", topic=pending.topic)
+        event_id = pending.event_id if self._engine is not None else None
+        self._dispatch(pending.topic, pending.key, event_id)
+
+    def _rolled_back(self, pending: _PendingEvent) -> None:
+        with self._lock:
+            self._own.discard(pending.event_id)
+
+    def start(self, engine) -> None:
+        """
+        Start polling for events published by other workers.
+
+        The latest event of every key of a replayed topic is handled first,
+        so state derived from event IDs (table versions) matches the other
+        workers. Earlier events of other topics are not handled again.
+        """
+        if self._thread is not None:
+            return
+        self._engine = engine
+
+        with engine.connect() as connection:
+            self._last_event_id = (
+                connection.execute(select(func.max(InvalidationEvent.event_id)))
+                .scalar()
+                or 0
+            )
+            latest = connection.execute(self._latest_replayed()).all()
+        for event_id, topic, key in sorted(latest):
+            self._dispatch(topic, key, event_id)
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="invalidation-bus", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._engine = None
+
+    def _poll(self, connection) -> None:
+        rows = connection.execute(
+            select(
+                InvalidationEvent.event_id,
+                InvalidationEvent.topic,
+                InvalidationEvent.key,
+            )
+            .where(InvalidationEvent.event_id > self._last_event_id)
+            .order_by(InvalidationEvent.event_id)
+        ).all()
+        for event_id, topic, key in rows:
+            self._last_event_id = event_id
+            with self._lock:
+                if event_id in self._own:
+                    self._own.discard(event_id)
+                    continue
+            metrics.increment("invalidation_bus.received", topic=topic)
+            self._dispatch(topic, key, event_id)
+
+    def _latest_replayed(self):
+        return (
+            select(
+                func.max(InvalidationEvent.event_id),
+                InvalidationEvent.topic,
+                InvalidationEvent.key,
+            )
+            .where(InvalidationEvent.topic.in_(sorted(self._replayed)))
+            .group_by(InvalidationEvent.topic, InvalidationEvent.key)
+        )
+
+    def _prune(self, connection) -> None:
+        cutoff = (get_indonesia_time() - INVALIDATION_RETENTION).replace(tzinfo=None)
+        newest = select(func.max(InvalidationEvent.event_id)).scalar_subquery()
+        replayed = select(self._latest_replayed().subquery().c[0])
+        # Kept: the newest event of every key of a replayed topic, so that a
+        # restarted worker derives the same table versions, and the newest
+        # event overall, so SQLite never reuses its ID
+        connection.execute(
+            delete(InvalidationEvent).where(
+                InvalidationEvent.created_at < cutoff,
+                InvalidationEvent.event_id < newest,
+                InvalidationEvent.event_id.not_in(replayed),
+            )
+        )
+
+    def _data_version(self, connection) -> int:
+        cursor = connection.cursor()
+        try:
+            return cursor.execute("PRAGMA data_version").fetchone()[0]
+        finally:
+            cursor.close()
+
+    def _run(self) -> None:
+        # data_version is checked on a raw DBAPI connection kept for the life
+        # of the thread: it only changes when other connections commit, and
+        # raw calls stay out of the engine's statement log
+        connection = self._engine.raw_connection()
+        data_version = None
+        polls = 0
+        try:
+            while not self._stop.wait(self.poll_seconds):
+                try:
+                    current = self._data_version(connection)
+                    if current != data_version:
+                        data_version = current
+                        with self._engine.connect() as events:
+                            self._poll(events)
+
+                    polls += 1
+                    if polls % INVALIDATION_PRUNE_EVERY == 0:
+                        with self._engine.begin() as events:
+                            self._prune(events)
+                except Exception:
+                    logger.exception("Invalidation poll failed")
+                    metrics.increment("invalidation_bus.poll_errors")
+        finally:
+            connection.close()
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _record_flushed_events(session, flush_context) -> None:
+    for pending in session.info.get(PENDING_EVENTS, ()):
+        if pending.event_id is None and pending.row.event_id is not None:
+            pending.bus._flushed(pending)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed_events(session) -> None:
+    for pending in session.info.pop(PENDING_EVENTS, ()):
+        pending.bus._committed(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_events(session) -> None:
+    for pending in session.info.pop(PENDING_EVENTS, ()):
+        pending.bus._rolled_back(pending)
+
+
+invalidation_bus = InvalidationBus()
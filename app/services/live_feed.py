@@ -0,0 +1,149 @@
+# app/services/live_feed.py
+
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Set, Tuple
+
+import pydantic_core
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlmodel import Session
+
+from app.models.attendance import Attendance
+from app.services.metrics import metrics
+
+# Events buffered per connection; a client that falls further behind loses
+# the oldest events
+LIVE_FEED_QUEUE_SIZE = 256
+
+# Seconds between keep-alive comments on an idle stream
+LIVE_FEED_HEARTBEAT_SECONDS = 15.0
+
+# Fields sent for each attendance, both in the snapshot and in deltas
+LIVE_FIELDS = (
+    "attendance_id",
+    "student_id",
+    "status",
+    "check_in_time",
+    "smile_detected",
+)
+
+Subscriber = Tuple[asyncio.AbstractEventLoop, "asyncio.Queue[bytes]"]
+
+
+def attendance_delta(attendance: Attendance) -> Dict[str, Any]:
+    return {name: getattr(attendance, name) for name in LIVE_FIELDS}
+
+
+def _event(name: str, data: Any, event_id: int = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return (
+        f"{head}event: {name}\ndata: ".encode()
+        + pydantic_core.to_json(data)
+        + b"\n\n"
+    )
+
+
+class LiveFeed:
+    """
+    In-process publish/subscribe of attendance changes per schedule.
+
+    The attendance CRUD publishes a compact delta after each check-in or
+    update, and every open /schedules/{id}/live connection receives it as a
+    server-sent event. Publishing is safe from the threadpool that runs sync
+    endpoints. Only connections on the worker that made the change are
+    notified.
+    """
+
+    def __init__(self, queue_size: int = LIVE_FEED_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Set[Subscriber]] = defaultdict(set)
+        self._sequence = 0
+
+    def subscribe(self, schedule_id: int) -> Subscriber:
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            self._subscribers[schedule_id].add(subscriber)
+        metrics.increment("live_feed.connections")
+        return subscriber
+
+    def unsubscribe(self, schedule_id: int, subscriber: Subscriber) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(schedule_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[schedule_id]
+
+    @staticmethod
+    def _deliver(queue: "asyncio.Queue[bytes]", event: bytes) -> None:
+        if queue.full():
+            queue.get_nowait()
+            metrics.increment("live_feed.dropped")
+        queue.put_nowait(event)
+
+    def publish(self, schedule_id: int, delta: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(schedule_id, ()))
+            if not subscribers:
+                return
+            self._sequence += 1
+            event = _event("attendance", delta, self._sequence)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # The subscriber's event loop has been closed
+                self.unsubscribe(schedule_id, (loop, queue))
+        metrics.increment("live_feed.published")
+
+    def publish_attendance(self, attendance: Attendance) -> None:
+        self.publish(attendance.schedule_id, attendance_delta(attendance))
+
+    async def stream(
+        self,
+        schedule_id: int,
+        load_snapshot: Callable[[], List[Dict[str, Any]]],
+        is_disconnected: Callable[[], Awaitable[bool]],
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield a snapshot event followed by attendance delta events.
+
+        The subscription is made before the snapshot is loaded, so no change
+        committed in between is missed; a delta may repeat what the snapshot
+        already shows. The snapshot is loaded in the threadpool.
+        """
+        subscriber = self.subscribe(schedule_id)
+        _, queue = subscriber
+        try:
+            yield _event("snapshot", await run_in_threadpool(load_snapshot))
+            while True:
+                try:
+                    yield await asyncio.wait_for(
+                        queue.get(), timeout=LIVE_FEED_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    yield b": keep-alive\n\n"
+        finally:
+            self.unsubscribe(schedule_id, subscriber)
+
+
+def load_live_snapshot(engine, schedule_id: int) -> List[Dict[str, Any]]:
+    """Current attendance of a schedule, with the fields sent in deltas."""
+    columns = [getattr(Attendance, name) for name in LIVE_FIELDS]
+    with Session(engine) as db:
+        rows = db.execute(
+            select(*columns)
+            .where(Attendance.schedule_id == schedule_id)
+            .order_by(Attendance.attendance_id)
+        ).all()
+    return [row._asdict() for row in rows]
+
+
+live_feed = LiveFeed()
@@ -0,0 +1,68 @@
+# app/services/metrics.py
+
+import threading
+from typing import Any, Dict, Tuple
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry.
+
+    Holds labelled counters and timing summaries (count, total and max seconds)
+    that services update on their hot paths and that the /metrics endpoint
+    exposes as JSON. Values are per worker process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], int]] = {}
+        self._timings: Dict[str, Dict[Tuple[Tuple[str, str], ...], list]] = {}
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def increment(self, name: str, amount: int = 1, **labels: Any) -> None:
+        """Increase a counter, optionally split by labels."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        """Record a duration in a timing summary."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._timings.setdefault(name, {})
+            summary = series.setdefault(key, [0, 0.0, 0.0])
+            summary[0] += 1
+            summary[1] += seconds
+            summary[2] = max(summary[2], seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all counters and timing summaries as plain JSON-able data."""
+        with self._lock:
+            counters = {
+                name: [
+                    {"labels": dict(key), "value": value}
+                    for key, value in series.items()
+                ]
+                for name, series in self._counters.items()
+            }
+            timings = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": count,
+                        "total_seconds": round(total, 6),
+                        "avg_seconds": round(total / count, 6) if count else 0.0,
+                        "max_seconds": round(maximum, 6),
+                    }
+                    for key, (count, total, maximum) in series.items()
+                ]
+                for name, series in self._timings.items()
+            }
+        return {"counters": counters, "timings": timings}
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,301 @@
+# app/services/response_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlmodel import SQLModel
+
+from app.services.metrics import metrics
+from app.services.single_flight import single_flight
+from app.services.table_versions import table_versions
+
+# Maximum number of cached responses per worker (memory backend)
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+
+# Cached responses expire after this many seconds. Writes by other workers
+# normally arrive through the invalidation bus within its poll interval; the
+# TTL bounds staleness when the bus is not running.
+RESPONSE_CACHE_TTL_SECONDS = 30
+
+# "memory" (default) or "sqlite"
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+
+# Database file of the sqlite backend, shared by all workers on the host
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+RESPONSE_CACHE_PATH = os.getenv(
+    "RESPONSE_CACHE_PATH",
+    os.path.join(os.path.abspath(PROJECT_DIR), "response_cache.db"),
+)
+
+# Purge expired rows from the sqlite backend once every this many writes
+SQLITE_PURGE_INTERVAL = 256
+
+
+@dataclass
+class CachedResponse:
+    """Serialised body of a read endpoint and the headers built with it."""
+
+    body: bytes
+    headers: Dict[str, str]
+    status_code: int = 200
+
+
+class CacheBackend(ABC):
+    """
+    Storage for cached responses.
+
+    Implementations must be safe to call from the threadpool that runs sync
+    endpoints and must drop entries once their TTL has passed.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the cached response for a key, or None on a miss."""
+
+    @abstractmethod
+    def set(self, key: str, value: CachedResponse, ttl_seconds: float) -> None:
+        """Store a response for ttl_seconds."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every cached response."""
+
+
+class MemoryBackend(CacheBackend):
+    """Bounded LRU of responses held by the worker process."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = (
+            OrderedDict()
+        )
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                metrics.increment("response_cache.expirations")
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedResponse, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.increment("response_cache.evictions")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Responses stored in a SQLite file that every worker on the host opens.
+
+    Kept apart from the application database so cache writes never contend
+    with attendance writes. Expiry uses wall-clock time, which all processes
+    share.
+    """
+
+    def __init__(self, path: str = RESPONSE_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, body BLOB NOT NULL, headers TEXT NOT NULL, "
+            "expires_at REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT body, headers FROM response_cache "
+                "WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        return CachedResponse(body=row[0], headers=json.loads(row[1]))
+
+    def set(self, key: str, value: CachedResponse, ttl_seconds: float) -> None:
+        connection = self._connection()
+        now = time.time()
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?)",
+                (key, value.body, json.dumps(value.headers), now + ttl_seconds),
+            )
+            self._writes += 1
+            if self._writes % SQLITE_PURGE_INTERVAL == 0:
+                connection.execute(
+                    "DELETE FROM response_cache WHERE expires_at <= ?", (now,)
+                )
+        except sqlite3.OperationalError:
+            # Another worker holds the write lock; the response is simply
+            # not cached this time
+            metrics.increment("response_cache.write_errors")
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM response_cache")
+
+
+def create_backend(name: str = RESPONSE_CACHE_BACKEND) -> CacheBackend:
+    if name == "sqlite":
+        return SQLiteBackend()
+    if name == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unknown response cache backend: {name}")
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialised responses for reference data.
+
+    Keys combine the route, the sorted query parameters, the caller's access
+    scope (e.g. "admin" or "instructor:7", never the token itself) and the
+    version stamp of every table the response is built from. A write bumps
+    the stamp, so entries made before it are never looked up again and age
+    out of the backend.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def key(request: Request, scope: str, *models: type[SQLModel]) -> str:
+        query = "&".join(
+            f"{name}={value}"
+            for name, value in sorted(request.query_params.multi_items())
+        )
+        raw = "\n".join((request.url.path, query, scope, table_versions.stamp(*models)))
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _build(self, key: str, build: Callable[[], Response]) -> CachedResponse:
+        response = build()
+        entry = CachedResponse(
+            body=response.body,
+            headers={
+                name: value
+                for name, value in response.headers.items()
+                if name not in ("content-length", "content-type")
+            },
+            status_code=response.status_code,
+        )
+        if response.status_code == 200:
+            self.backend.set(key, entry, self.ttl_seconds)
+        return entry
+
+    def _lookup(
+        self, request: Request, scope: str, models: Tuple[type[SQLModel], ...]
+    ) -> Tuple[str, str, Optional[CachedResponse]]:
+        route = request.scope.get("route")
+        label = route.path if route is not None else request.url.path
+        key = self.key(request, scope, *models)
+
+        cached = self.backend.get(key)
+        metrics.increment(
+            "response_cache.hits" if cached is not None else "response_cache.misses",
+            route=label,
+        )
+        return key, label, cached
+
+    @staticmethod
+    def _respond(entry: CachedResponse) -> Response:
+        # A fresh Response per caller: entries are shared between requests
+        return Response(
+            content=entry.body,
+            status_code=entry.status_code,
+            media_type="application/json",
+            headers=entry.headers,
+        )
+
+    def fetch(
+        self,
+        request: Request,
+        scope: str,
+        models: Tuple[type[SQLModel], ...],
+        build: Callable[[], Response],
+    ) -> Response:
+        """
+        Return the cached response for this request, or build and cache it.
+
+        build runs the query and returns the JSON response; its headers
+        (such as X-Sync-Timestamp) are cached with the body so a hit answers
+        exactly what was sent the first time. Only 200 responses are cached.
+        Identical requests that miss at the same time share one build.
+        """
+        key, label, cached = self._lookup(request, scope, models)
+        if cached is None:
+            cached = single_flight.do(key, lambda: self._build(key, build), label)
+        return self._respond(cached)
+
+    async def afetch(
+        self,
+        request: Request,
+        scope: str,
+        models: Tuple[type[SQLModel], ...],
+        build: Callable[[], Response],
+    ) -> Response:
+        """fetch() for async endpoints; a build runs in the threadpool."""
+        key, label, cached = self._lookup(request, scope, models)
+        if cached is None:
+            cached = await single_flight.ado(
+                key, lambda: self._build(key, build), label
+            )
+        return self._respond(cached)
+
+
+def access_scope(user_data: Dict) -> str:
+    """Cache scope of a caller: what they may see, not who they are."""
+    user = user_data["user"]
+    user_type = user_data["user_type"]
+    if user_type == "instructor":
+        return f"instructor:{user.instructor_id}"
+    if user_type == "student":
+        return f"student:{user.student_id}"
+    return user_type
+
+
+response_cache = ResponseCache(create_backend())
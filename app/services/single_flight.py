@@ -0,0 +1,100 @@
+# app/services/single_flight.py
+
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.metrics import metrics
+
+# Followers wait at most this long for the leader, then compute the result
+# themselves
+SINGLE_FLIGHT_WAIT_SECONDS = 5.0
+
+T = TypeVar("T")
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+        self.result: Any = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent computations into one.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive with the same key while it runs wait for its result instead of
+    running it again. Nothing is kept once the flight lands, so this is not a
+    cache. A follower whose leader fails or takes longer than wait_seconds
+    runs the function itself. Results are shared between callers and must
+    not be mutated.
+
+    do() is for sync endpoints, which run in the threadpool; ado() is for
+    async endpoints and runs the function in the threadpool so that
+    followers can arrive while it is in flight.
+    """
+
+    def __init__(self, wait_seconds: float = SINGLE_FLIGHT_WAIT_SECONDS):
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        # Only touched from the worker's event loop
+        self._async_flights: Dict[str, "asyncio.Future[Tuple[bool, Any]]"] = {}
+
+    def do(self, key: str, fn: Callable[[], T], label: Optional[str] = None) -> T:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if leader:
+            try:
+                flight.result = fn()
+                flight.ok = True
+                return flight.result
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+
+        metrics.increment("single_flight.shared", route=label)
+        if flight.done.wait(self.wait_seconds) and flight.ok:
+            return flight.result
+        metrics.increment("single_flight.fallbacks", route=label)
+        return fn()
+
+    async def ado(
+        self, key: str, fn: Callable[[], T], label: Optional[str] = None
+    ) -> T:
+        future = self._async_flights.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._async_flights[key] = future
+            outcome: Tuple[bool, Any] = (False, None)
+            try:
+                result = await run_in_threadpool(fn)
+                outcome = (True, result)
+                return result
+            finally:
+                del self._async_flights[key]
+                future.set_result(outcome)
+
+        metrics.increment("single_flight.shared", route=label)
+        try:
+            ok, result = await asyncio.wait_for(
+                asyncio.shield(future), self.wait_seconds
+            )
+            if ok:
+                return result
+        except asyncio.TimeoutError:
+            pass
+        metrics.increment("single_flight.fallbacks", route=label)
+        return await run_in_threadpool(fn)
+
+
+single_flight = SingleFlight()
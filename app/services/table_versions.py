@@ -0,0 +1,52 @@
+# app/services/table_versions.py
+
+import threading
+from typing import Dict, Optional
+
+from sqlmodel import SQLModel
+
+from app.services.invalidation_bus import invalidation_bus
+
+TABLE_TOPIC = "table"
+
+
+class TableVersions:
+    """
+    Write versions per table, bumped by the CRUD layer after each commit.
+
+    Read endpoints derive ETags and response cache keys from the versions of
+    the tables they read, so an unchanged resource is recognised without a
+    query. Every bump goes through the invalidation bus and a table's version
+    is the ID of its latest event, which all workers agree on once they have
+    seen it. While the bus is not started versions are per-process counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+
+    def bump(self, *models: type[SQLModel]) -> None:
+        """Mark tables as changed on every worker. Call after the commit."""
+        for model in models:
+            invalidation_bus.publish(TABLE_TOPIC, model.__tablename__)
+
+    def observe(self, table: Optional[str], event_id: Optional[int]) -> None:
+        """Invalidation bus handler for the table topic."""
+        with self._lock:
+            current = self._versions.get(table, 0)
+            if event_id is None:
+                self._versions[table] = current + 1
+            else:
+                # Events can arrive out of order (own events are handled
+                # before older ones from other workers are polled)
+                self._versions[table] = max(current, event_id)
+
+    def stamp(self, *models: type[SQLModel]) -> str:
+        """Opaque string that changes whenever any of the tables changes."""
+        with self._lock:
+            versions = [self._versions.get(model.__tablename__, 0) for model in models]
+        return ".".join(str(version) for version in versions)
+
+
+table_versions = TableVersions()
+invalidation_bus.subscribe(TABLE_TOPIC, table_versions.observe, replay=True)
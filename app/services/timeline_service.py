@@ -0,0 +1,235 @@
+# app/services/timeline_service.py
+
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from app.models.attendance import Attendance
+from app.models.course import Course
+from app.models.room import Room
+from app.models.schedule import Schedule
+from app.services.invalidation_bus import invalidation_bus
+from app.utils.time_utils import (
+    get_indonesia_time,
+    parse_schedule_time,
+    seconds_since_midnight,
+)
+
+TODAY_TIMELINE_TOPIC = "today_timeline"
+
+
+@dataclass
+class TimelineEntry:
+    """A single session of the day as seen by one student."""
+
+    start_seconds: int
+    end_seconds: int
+    attendance_id: int
+    schedule_id: int
+    course_id: Optional[int]
+    course_name: Optional[str]
+    chapter: Optional[str]
+    room_id: Optional[int]
+    room_name: Optional[str]
+    start_time: str
+    end_time: str
+    status: str
+    check_in_time: Optional[datetime]
+
+    def to_dict(self, now_seconds: int) -> Dict[str, Any]:
+        return {
+            "attendance_id": self.attendance_id,
+            "schedule_id": self.schedule_id,
+            "course_id": self.course_id,
+            "course_name": self.course_name,
+            "chapter": self.chapter,
+            "room_id": self.room_id,
+            "room_name": self.room_name,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "status": self.status,
+            "check_in_time": self.check_in_time,
+            "is_active": self.start_seconds <= now_seconds < self.end_seconds,
+        }
+
+
+class TodayTimeline:
+    """
+    Per-day timeline of every student's sessions.
+
+    The timeline is built with a single joined query the first time it is read
+    on a given day (so effectively once after midnight) and again after a
+    schedule or attendance roster change. Lookups for a student bisect the
+    pre-sorted start times against the current time and never touch the
+    database, which keeps the endpoint polled by every phone cheap.
+
+    Rebuilds and the check-in status applied by record_attendance reach every
+    worker through the invalidation bus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._date: Optional[date] = None
+        self._by_student: Dict[int, Tuple[List[int], List[TimelineEntry]]] = {}
+        self._by_attendance: Dict[int, TimelineEntry] = {}
+        # ID of the last bus event applied to each entry
+        self._applied: Dict[int, int] = {}
+
+    def invalidate(self) -> None:
+        """Drop the current timeline on every worker so lookups rebuild it."""
+        invalidation_bus.publish(TODAY_TIMELINE_TOPIC)
+
+    def _apply(self, key: Optional[str], event_id: Optional[int] = None) -> None:
+        """
+        Invalidation bus handler: key is "attendance_id|status|check_in_time"
+        for a recorded attendance, or None to drop the whole timeline.
+        """
+        with self._lock:
+            if key is None:
+                self._date = None
+                self._by_student = {}
+                self._by_attendance = {}
+                self._applied = {}
+                return
+
+            attendance_id, status, check_in_time = key.split("|", 2)
+            entry = self._by_attendance.get(int(attendance_id))
+            if entry is None:
+                return
+            if event_id is not None:
+                # Events can arrive out of order (own events are handled
+                # before older ones from other workers are polled)
+                if event_id < self._applied.get(entry.attendance_id, 0):
+                    return
+                self._applied[entry.attendance_id] = event_id
+            entry.status = status
+            entry.check_in_time = (
+                datetime.fromisoformat(check_in_time) if check_in_time else None
+            )
+
+    def record_attendance(self, db: Session, attendance: Attendance) -> None:
+        """
+        Apply a check-in or status change to the cached entry on every worker
+        once db commits. Call before the commit that stores the change.
+        """
+        check_in_time = attendance.check_in_time
+        if check_in_time is not None:
+            # Stored without the offset, as the column reads back
+            check_in_time = check_in_time.replace(tzinfo=None)
+        invalidation_bus.publish_in(
+            db,
+            TODAY_TIMELINE_TOPIC,
+            f"{attendance.attendance_id}|{attendance.status}|"
+            f"{check_in_time.isoformat() if check_in_time else ''}",
+        )
+
+    def _build(self, db: Session, today: date) -> None:
+        rows = db.exec(
+            select(
+                Attendance.attendance_id,
+                Attendance.student_id,
+                Attendance.status,
+                Attendance.check_in_time,
+                Schedule.schedule_id,
+                Schedule.start_time,
+                Schedule.end_time,
+                Schedule.chapter,
+                Course.course_id,
+                Course.course_name,
+                Room.room_id,
+                Room.name,
+            )
+            .join(Schedule, Attendance.schedule_id == Schedule.schedule_id)
+            .join(Course, Schedule.course_id == Course.course_id, isouter=True)
+            .join(Room, Schedule.room_id == Room.room_id, isouter=True)
+            .where(Schedule.schedule_date == today)
+        ).all()
+
+        grouped: Dict[int, List[TimelineEntry]] = {}
+        by_attendance: Dict[int, TimelineEntry] = {}
+        for (
+            attendance_id,
+            student_id,
+            status,
+            check_in_time,
+            schedule_id,
+            start_time,
+            end_time,
+            chapter,
+            course_id,
+            course_name,
+            room_id,
+            room_name,
+        ) in rows:
+            entry = TimelineEntry(
+                start_seconds=seconds_since_midnight(parse_schedule_time(start_time)),
+                end_seconds=seconds_since_midnight(parse_schedule_time(end_time)),
+                attendance_id=attendance_id,
+                schedule_id=schedule_id,
+                course_id=course_id,
+                course_name=course_name,
+                chapter=chapter,
+                room_id=room_id,
+                room_name=room_name,
+                start_time=start_time,
+                end_time=end_time,
+                status=status,
+                check_in_time=check_in_time,
+            )
+            grouped.setdefault(student_id, []).append(entry)
+            by_attendance[attendance_id] = entry
+
+        by_student = {}
+        for student_id, entries in grouped.items():
+            entries.sort(key=lambda entry: entry.start_seconds)
+            by_student[student_id] = ([e.start_seconds for e in entries], entries)
+
+        self._date = today
+        self._by_student = by_student
+        self._by_attendance = by_attendance
+        self._applied = {}
+
+    def get_student_day(
+        self, db: Session, student_id: int, now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Return the student's sessions for today with the active and next session.
+
+        Args:
+            db: Database session, only used when the timeline must be rebuilt
+            student_id: ID of the student
+            now: Reference time (defaults to the current Indonesia time)
+
+        Returns:
+            Dict with the date, all sessions and the active/next schedule IDs
+        """
+        now = now or get_indonesia_time()
+        today = now.date()
+        now_seconds = seconds_since_midnight(now.time())
+
+        with self._lock:
+            if self._date != today:
+                self._build(db, today)
+            starts, entries = self._by_student.get(student_id, ([], []))
+
+            index = bisect_right(starts, now_seconds)
+            active = None
+            if index > 0 and now_seconds < entries[index - 1].end_seconds:
+                active = entries[index - 1]
+            upcoming = entries[index] if index < len(entries) else None
+
+            return {
+                "date": today,
+                "now": now,
+                "active_schedule_id": active.schedule_id if active else None,
+                "next_schedule_id": upcoming.schedule_id if upcoming else None,
+                "sessions": [entry.to_dict(now_seconds) for entry in entries],
+            }
+
+
+today_timeline = TodayTimeline()
+invalidation_bus.subscribe(TODAY_TIMELINE_TOPIC, today_timeline._apply)
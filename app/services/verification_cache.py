@@ -0,0 +1,86 @@
+# app/services/verification_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.metrics import metrics
+
+# Maximum number of cached verification results per worker
+VERIFICATION_CACHE_MAX_ENTRIES = 2048
+
+# Cached results expire after this many seconds
+VERIFICATION_CACHE_TTL_SECONDS = 600
+
+CacheKey = Tuple[str, str, str]
+
+
+@dataclass
+class CachedVerification:
+    """Outcome of the face stages for one image, reusable for identical uploads."""
+
+    verification: Dict[str, Any]
+    face_coords: Optional[List[int]]
+    image_hash: Optional[int] = None
+    quality: Optional[Dict[str, float]] = None
+    frame_index: Optional[int] = None
+    rejection_reason: Optional[str] = None
+    rejection_message: Optional[str] = None
+
+
+class VerificationCache:
+    """
+    Bounded LRU cache of face verification results with a TTL.
+
+    Keyed by (SHA-256 of the uploaded bytes, expected NIM, model and template
+    version), so a retried or double-tapped upload of the same photo is
+    answered without decoding it or running the model again. Hits, misses,
+    expirations and evictions are exported through the metrics registry.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = VERIFICATION_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = VERIFICATION_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, Tuple[float, CachedVerification]]" = (
+            OrderedDict()
+        )
+
+    def get(self, key: CacheKey) -> Optional[CachedVerification]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                metrics.increment("verification_cache.misses")
+                return None
+
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                metrics.increment("verification_cache.expirations")
+                metrics.increment("verification_cache.misses")
+                return None
+
+            self._entries.move_to_end(key)
+            metrics.increment("verification_cache.hits")
+            return value
+
+    def put(self, key: CacheKey, value: CachedVerification) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.increment("verification_cache.evictions")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+verification_cache = VerificationCache()
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
+from sqlalchemy.orm import defer
 from sqlmodel import Session
 import os
 from dotenv import load_dotenv
@@ -40,7 +41,13 @@ def authenticate(db: Session, username: str, password: str) -> Tuple[object, str
     from app.models.admin import Admin
 
     # First try student
-    student = db.query(Student).filter(Student.username == username).first()
+    # Face data is not needed to check a password
+    student = (
+        db.query(Student)
+        .options(defer(Student.face_data))
+        .filter(Student.username == username)
+        .first()
+    )
     if student and verify_password(password, student.password):
         return student, "student"
 
@@ -0,0 +1,61 @@
+# app/utils/conditional.py
+
+import hashlib
+
+from fastapi import HTTPException, Request, status
+from sqlmodel import SQLModel
+
+from app.services.metrics import metrics
+from app.services.table_versions import table_versions
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def check_not_modified(request: Request, *models: type[SQLModel]) -> str:
+    """
+    Compute the ETag of a read endpoint and answer 304 if the client has it.
+
+    The tag covers the request path and query string, the caller's
+    credentials (responses differ per role and instructor) and the versions
+    of the tables the endpoint reads, so it is computed without touching the
+    database. Call it after authorisation and before querying.
+
+    Args:
+        request: Incoming request
+        models: Tables whose content the response is built from
+
+    Returns:
+        The ETag to send with the 200 response
+
+    Raises:
+        HTTPException: 304 Not Modified if If-None-Match holds the current tag
+    """
+    digest = hashlib.sha1(
+        "\n".join(
+            (
+                request.url.path,
+                str(request.url.query),
+                request.headers.get("authorization", ""),
+                table_versions.stamp(*models),
+            )
+        ).encode()
+    ).hexdigest()[:20]
+    etag = f'W/"{digest}"'
+
+    route = request.scope.get("route")
+    path = route.path if route is not None else request.url.path
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        metrics.increment("etag.hits", route=path)
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    metrics.increment("etag.misses", route=path)
+    return etag
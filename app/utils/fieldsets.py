@@ -0,0 +1,73 @@
+# app/utils/fieldsets.py
+
+from functools import lru_cache
+from typing import Any, FrozenSet, List, Optional, Type
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+FIELDS_QUERY = Query(
+    None,
+    description=(
+        "Comma-separated list of top-level fields to return, e.g. "
+        "`attendance_id,status,student`. Relations that are not listed are "
+        "neither loaded nor serialised."
+    ),
+)
+
+
+def parse_fields(
+    fields: Optional[str], model: Type[BaseModel]
+) -> Optional[FrozenSet[str]]:
+    """
+    Parse a `?fields=` value against the fields of a response model.
+
+    Returns:
+        The requested field names, or None when every field should be returned
+
+    Raises:
+        HTTPException: 400 if a requested field is not part of the model
+    """
+    if not fields:
+        return None
+
+    requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    return requested or None
+
+
+@lru_cache(maxsize=128)
+def _sparse_list_adapter(
+    model: Type[BaseModel], fields: FrozenSet[str]
+) -> TypeAdapter:
+    sparse_model = create_model(
+        f"{model.__name__}Sparse",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (info.annotation, info)
+            for name, info in model.model_fields.items()
+            if name in fields
+        },
+    )
+    return TypeAdapter(List[sparse_model])
+
+
+def fieldset_response(
+    items: List[Any], model: Type[BaseModel], fields: FrozenSet[str]
+) -> Response:
+    """
+    Serialise list items with only the requested fields of a response model.
+
+    The endpoint's full response_model would reject the partial items, so the
+    response is built here from a cached model holding just those fields.
+    """
+    adapter = _sparse_list_adapter(model, fields)
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(items)),
+        media_type="application/json",
+    )
@@ -0,0 +1,51 @@
+# app/utils/responses.py
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Type
+
+import pydantic_core
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+class TrustedJSONResponse(Response):
+    """
+    JSON response for content that is already shaped like the endpoint's
+    response model.
+
+    Returning a Response makes FastAPI skip response_model validation, so the
+    content is serialised once by pydantic-core instead of being validated
+    into models first. Only use it for dicts the CRUD layer assembles from
+    database columns field by field; anything else should go through
+    response_model.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+@lru_cache(maxsize=64)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def model_list_response(
+    items: List[Any],
+    model: Type[BaseModel],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Serialise list items through a response model, as response_model would.
+
+    For endpoints that need the response body itself, e.g. to cache it.
+    """
+    adapter = _list_adapter(model)
+    return Response(
+        content=adapter.dump_json(
+            adapter.validate_python(items, from_attributes=True)
+        ),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -1,4 +1,4 @@
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, time, timezone, timedelta
 
 indonesia_tz = timezone(timedelta(hours=7))
 
@@ -9,3 +9,18 @@ def get_indonesia_time():
 
 def get_indonesia_date():
     return datetime.now(indonesia_tz).date()
+
+
+def parse_schedule_time(value: str) -> time:
+    """Parse a schedule time string ("HH:MM" or "HH:MM:SS") into a time object."""
+    parts = value.split(":")
+    return time(
+        hour=int(parts[0]),
+        minute=int(parts[1]),
+        second=int(parts[2]) if len(parts) > 2 else 0,
+    )
+
+
+def seconds_since_midnight(value: time) -> int:
+    """Convert a time of day into the number of seconds since midnight."""
+    return value.hour * 3600 + value.minute * 60 + value.second
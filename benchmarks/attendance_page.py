@@ -0,0 +1,139 @@
+# benchmarks/attendance_page.py
+"""
+Response serialisation time for a large GET /attendances/ page.
+
+Seeds a temporary SQLite database, builds one page with get_attendances and
+serialises it two ways: FastAPI's response_model path (validate against
+List[AttendanceWithNestedData], then JSONResponse) and TrustedJSONResponse,
+which serialises the CRUD dicts directly. Both bodies are checked to decode
+to the same JSON.
+
+Usage:
+    python -m benchmarks.attendance_page [--rows 5000] [--rounds 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.crud.attendance import get_attendances
+from app.models import Attendance, Course, Instructor, Room, Schedule, Student
+from app.schemas.attendance import AttendanceWithNestedData
+from app.utils.responses import TrustedJSONResponse
+
+STUDENTS = 250
+
+
+def seed(engine, rows: int) -> None:
+    with Session(engine) as db:
+        db.add(Course(course_name="Pemrograman Web", sks=3))
+        db.add(
+            Instructor(
+                nidn="0001",
+                full_name="Dosen",
+                username="dosen",
+                password="x",
+                email="dosen@example.com",
+                phone_number="0800",
+            )
+        )
+        db.add(Room(name="Lab 1", latitude=3.56, longitude=98.65, radius=50))
+        for index in range(STUDENTS):
+            db.add(
+                Student(
+                    nim=f"{index:08d}",
+                    username=f"student{index}",
+                    password="x",
+                    full_name=f"Student {index}",
+                    major_name="Informatika",
+                    year="2024/2025",
+                )
+            )
+        schedules = rows // STUDENTS + 1
+        for index in range(schedules):
+            db.add(
+                Schedule(
+                    course_id=1,
+                    instructor_id=1,
+                    room_id=1,
+                    schedule_date=date(2025, 1, 1) + timedelta(days=index),
+                    start_time="08:00",
+                    end_time="10:00",
+                )
+            )
+        db.commit()
+
+        for index in range(rows):
+            db.add(
+                Attendance(
+                    student_id=index % STUDENTS + 1,
+                    schedule_id=index // STUDENTS + 1,
+                    date=datetime(2025, 1, 1),
+                    check_in_time=datetime(2025, 1, 1, 8, 5),
+                    status="PRESENT",
+                    location_data={"latitude": 3.56, "longitude": 98.65},
+                    face_verification_data={"verified": True, "confidence": 0.97},
+                    smile_detected=True,
+                )
+            )
+        db.commit()
+
+
+def time_rounds(render, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        render()
+    return (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        seed(engine, args.rows)
+        with Session(engine) as db:
+            items = get_attendances(db, limit=args.rows)
+        engine.dispose()
+
+    field = create_model_field("Response", List[AttendanceWithNestedData])
+
+    def response_model_path() -> bytes:
+        content = asyncio.run(
+            serialize_response(field=field, response_content=items)
+        )
+        return JSONResponse(content).body
+
+    def trusted_path() -> bytes:
+        return TrustedJSONResponse(items).body
+
+    assert json.loads(response_model_path()) == json.loads(trusted_path())
+
+    print(f"GET /attendances/?limit={args.rows} ({len(items)} rows)")
+    for name, render in (
+        ("response_model", response_model_path),
+        ("trusted", trusted_path),
+    ):
+        seconds = time_rounds(render, args.rounds)
+        print(
+            f"  {name:<15} {seconds * 1000:8.1f} ms/page "
+            f"{len(items) / seconds:>10,.0f} rows/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/invalidation_bus.py
+"""
+Cross-process propagation delay of the cache invalidation bus.
+
+Starts several worker processes on a shared temporary SQLite database, each
+running its own invalidation bus the way a uvicorn worker does. The parent
+bumps table versions and publishes events, and every worker reports when it
+handled each one. Checks that every worker saw every event and ends with the
+same table version stamp as the parent.
+
+Usage:
+    python -m benchmarks.invalidation_bus [--workers 4] [--events 50]
+        [--interval 0.05] [--poll 0.5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from sqlmodel import SQLModel, create_engine
+
+from app.models import Course, Room
+from app.services.invalidation_bus import invalidation_bus
+from app.services.table_versions import table_versions
+
+BENCHMARK_TOPIC = "benchmark"
+DONE_TOPIC = "benchmark_done"
+
+
+def create_shared_engine(path: str):
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+
+def worker(path: str, poll_seconds: float, ready, results) -> None:
+    def on_event(key, event_id):
+        results.put(("event", os.getpid(), key, time.time()))
+
+    def on_done(key, event_id):
+        results.put(("done", os.getpid(), table_versions.stamp(Room, Course), None))
+
+    invalidation_bus.poll_seconds = poll_seconds
+    invalidation_bus.subscribe(BENCHMARK_TOPIC, on_event)
+    invalidation_bus.subscribe(DONE_TOPIC, on_done)
+    invalidation_bus.start(create_shared_engine(path))
+    ready.put(os.getpid())
+    # Runs until the parent terminates the process
+    while True:
+        time.sleep(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--poll", type=float, default=0.5)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        engine = create_shared_engine(path)
+        SQLModel.metadata.create_all(engine)
+        invalidation_bus.start(engine)
+
+        ready, results = context.Queue(), context.Queue()
+        processes = [
+            context.Process(
+                target=worker, args=(path, args.poll, ready, results), daemon=True
+            )
+            for _ in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+        for _ in processes:
+            ready.get(timeout=60)
+
+        sent = {}
+        for index in range(args.events):
+            table_versions.bump(Room if index % 2 else Course)
+            sent[str(index)] = time.time()
+            invalidation_bus.publish(BENCHMARK_TOPIC, str(index))
+            time.sleep(args.interval)
+        invalidation_bus.publish(DONE_TOPIC)
+
+        delays = []
+        received = {}
+        stamps = {}
+        deadline = time.time() + max(10.0, args.poll * 10)
+        while len(stamps) < args.workers and time.time() < deadline:
+            kind, pid, value, handled_at = results.get(timeout=deadline - time.time())
+            if kind == "event":
+                received.setdefault(pid, set()).add(value)
+                delays.append(handled_at - sent[value])
+            else:
+                stamps[pid] = value
+
+        for process in processes:
+            process.terminate()
+            process.join()
+        invalidation_bus.stop()
+        engine.dispose()
+
+    expected = table_versions.stamp(Room, Course)
+    missing = {
+        pid: args.events - len(received.get(pid, ())) for pid in stamps
+    }
+    print(
+        f"{args.workers} workers, {args.events} events, poll every {args.poll}s"
+    )
+    delays.sort()
+    print(
+        f"  delay ms: median={statistics.median(delays) * 1000:.1f} "
+        f"p95={delays[int(len(delays) * 0.95) - 1] * 1000:.1f} "
+        f"max={delays[-1] * 1000:.1f}"
+    )
+    print(f"  parent stamp={expected} worker stamps={sorted(set(stamps.values()))}")
+    assert len(stamps) == args.workers, "not every worker finished"
+    assert not any(missing.values()), f"events missed: {missing}"
+    assert set(stamps.values()) == {expected}, "table versions diverged"
+    print("  every worker saw every event and agrees on table versions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# benchmarks/students_list.py
+"""
+Bytes read and rows per second for the student listing (GET /students/).
+
+Seeds a temporary SQLite database with students carrying realistic face data
+and compares loading full rows (the old behaviour, serialised as StudentRead)
+with the column-projected listing (get_students, serialised as
+StudentListRead).
+
+Bytes read are the summed sizes of every column value SQLite returns for the
+statements each variant issues.
+
+Usage:
+    python -m benchmarks.students_list [--students 1000] [--rounds 20]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.crud.student import get_students
+from app.models import Student
+from app.schemas.student import StudentListRead, StudentRead
+
+# Size of the face data document stored per student (embedding-like payload)
+FACE_DATA_VALUES = 512
+
+
+def seed(engine, count: int) -> None:
+    with Session(engine) as db:
+        for index in range(count):
+            db.add(
+                Student(
+                    nim=f"{index:08d}",
+                    username=f"student{index}",
+                    password="$2b$12$" + "x" * 53,
+                    full_name=f"Student {index}",
+                    major_name="Informatika",
+                    face_data={
+                        "embedding": [i * 0.001 for i in range(FACE_DATA_VALUES)]
+                    },
+                    year="2024/2025",
+                    is_approved=True,
+                )
+            )
+        db.commit()
+
+
+def value_size(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    return 8
+
+
+def measure(
+    engine, load: Callable[[Session], list], adapter: TypeAdapter, rounds: int
+):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "after_cursor_execute", record)
+    try:
+        with Session(engine) as db:
+            adapter.dump_json(adapter.validate_python(load(db), from_attributes=True))
+    finally:
+        event.remove(engine, "after_cursor_execute", record)
+
+    bytes_read = 0
+    raw = engine.raw_connection()
+    try:
+        for statement, parameters in statements:
+            for row in raw.cursor().execute(statement, parameters):
+                bytes_read += sum(value_size(value) for value in row)
+    finally:
+        raw.close()
+
+    rows = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        with Session(engine) as db:
+            items = load(db)
+            adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+            rows += len(items)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "queries": len(statements),
+        "bytes_read": bytes_read,
+        "rows_per_second": rows / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        seed(engine, args.students)
+
+        variants = {
+            "full rows": (
+                lambda db: db.exec(select(Student).limit(args.students)).all(),
+                TypeAdapter(List[StudentRead]),
+            ),
+            "projected": (
+                lambda db: get_students(db, limit=args.students),
+                TypeAdapter(List[StudentListRead]),
+            ),
+        }
+
+        print(f"GET /students/?limit={args.students}")
+        for name, (load, adapter) in variants.items():
+            result = measure(engine, load, adapter, args.rounds)
+            print(
+                f"  {name:<10} queries={result['queries']:<3} "
+                f"bytes_read={result['bytes_read']:>10,} "
+                f"rows/s={result['rows_per_second']:>10,.0f}"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
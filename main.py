@@ -6,7 +6,13 @@ import uvicorn
 from app.routers import router
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from app.dependencies import create_db_and_tables, get_db, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.dependencies import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    create_db_and_tables,
+    engine,
+    get_db,
+)
+from app.services.invalidation_bus import invalidation_bus
 import os
 from datetime import timedelta
 
@@ -62,6 +68,13 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
+    # Receive cache invalidations published by the other workers
+    invalidation_bus.start(engine)
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    invalidation_bus.stop()
 
 
 # Define TokenResponse model with user_type field